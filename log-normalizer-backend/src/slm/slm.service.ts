@@ -31,6 +31,9 @@ export class SLMService implements OnModuleInit {
         errorThresholdPercentage: this.config.get('ERROR_THRESHOLD_PERCENTAGE'), // open after 50% failures
         resetTimeout: this.config.get('RESET_TIMEOUT'), // try again after 60s
         volumeThreshold: this.config.get('VOLUME_THRESHOLD'), // need 5 requests before opening
+        // 429 is the SLM queue pushing back, not a failure — don't open on it
+        errorFilter: (err: { response?: { status?: number } }) =>
+          err?.response?.status === 429,
       },
     );
 
@@ -50,10 +53,16 @@ export class SLMService implements OnModuleInit {
   }
 
   private async callSLM(payload: SLMRequest): Promise<SLMResponse> {
+    // Tell the SLM how long we will wait so it can drop the request
+    // instead of generating for a caller that already timed out.
+    const timeout = this.config.get('TIMEOUT');
+    const headers = timeout ? { 'X-Request-Timeout-Ms': String(timeout) } : {};
+
     const { data } = await firstValueFrom(
       this.httpService.post<SLMResponse>(
         `${this.slmUrl}/api/normalize`,
         payload,
+        { headers },
       ),
     );
     return data;
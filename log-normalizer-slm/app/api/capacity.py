@@ -0,0 +1,26 @@
+from fastapi import APIRouter
+
+from app.engine import gateway
+
+router = APIRouter()
+
+
+@router.get('/capacity')
+async def capacity():
+    """Load signal for callers that want to pace themselves
+    instead of waiting for a 429."""
+    status = await gateway.engine.status()
+    sched = status["scheduler"]
+    if sched is None:
+        return {"ready": False, "accepting": False}
+
+    return {
+        "ready": status["ready"],
+        "queue_depth": sched["queue_depth"],
+        "max_queue_depth": sched["max_queue_depth"],
+        "running": sched["running"],
+        "accepting": sched["queue_depth"] < sched["max_queue_depth"],
+        "estimated_wait_seconds": sched["estimated_wait_seconds"],
+        "avg_job_seconds": sched["avg_job_seconds"],
+        "tokens_per_second": status["tokens_per_second"],
+    }
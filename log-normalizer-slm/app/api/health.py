@@ -1,10 +1,10 @@
-import os
+import sys
 import time
 import psutil
-import torch
 
 from fastapi import APIRouter, Response
-from app.models.model_loader import model_manager
+from app.engine import gateway
+from app.engine.drain import drain
 from app.config import settings
 
 router = APIRouter()
@@ -13,19 +13,25 @@ router = APIRouter()
 
 START_TIME = time.time()
 
+# Prime the CPU counter so get_system_metrics() can read it without
+# blocking (interval=None compares against the previous call).
+psutil.cpu_percent(interval=None)
+
 def get_system_metrics() -> dict:
     mem = psutil.virtual_memory()
     metrics = {
         "memory_used_mb": round(mem.used / 1024 / 1024),
         "memory_total_mb": round(mem.total / 1024 / 1024),
         "memory_percent": mem.percent,
-        "cpu_percent": psutil.cpu_percent(interval=0.1),
+        "cpu_percent": psutil.cpu_percent(interval=None),
         "cpu_cores": psutil.cpu_count(),
         "uptime_seconds": int(time.time() - START_TIME),
     }
 
-    
-    if torch.cuda.is_available():
+    # Only report GPU stats once the model load has pulled torch in;
+    # importing it here would put seconds on every cold start.
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
         free, total = torch.cuda.mem_get_info()
         used = total - free
         metrics["gpu_memory_used_mb"] = round(used / 1024 / 1024)
@@ -41,19 +47,29 @@ def get_system_metrics() -> dict:
 
 @router.get('/health')
 async def health(res: Response):
+    engine = await gateway.engine.status()
     status = "loading"
     is_loaded = False
 
-    if model_manager.load_error:
+    if drain.draining:
+        # Out of rotation; in-flight work is finishing.
+        status = "draining"
+        res.status_code = 503
+    elif engine["load_error"] or not engine["reachable"]:
         status = "unhealthy"
         res.status_code = 503
-    elif model_manager.is_ready: 
+    elif engine["ready"]:
         status = "healthy"
         is_loaded = True
 
-    return {
+    body = {
         "status": status, 
         "model_loaded": is_loaded,
         "model_path": settings.base_model_path,
         "system": get_system_metrics()
-    }
\ No newline at end of file
+    }
+    if drain.draining:
+        body["in_flight"] = drain.in_flight
+    if not engine["reachable"]:
+        body["error"] = engine["error"]
+    return body
\ No newline at end of file
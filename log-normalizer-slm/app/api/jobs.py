@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Query
+from fastapi.responses import JSONResponse
+
+from app.jobs.runner import job_runner
+from app.schemas.request import JobSubmitRequest
+from app.schemas.response import JobSubmitResponse, JobStatusResponse
+
+router = APIRouter()
+
+# Upper bound on a single long-poll so proxies don't cut the connection.
+_MAX_WAIT_SECONDS = 60.0
+
+
+@router.post("/jobs", response_model=JobSubmitResponse, status_code=202)
+async def submit_jobs(req: JobSubmitRequest):
+    callback_url = str(req.callback_url) if req.callback_url else None
+    job_ids = job_runner.submit(req.items, callback_url=callback_url)
+    return JobSubmitResponse(job_ids=job_ids)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, wait: float = Query(default=0.0, ge=0.0)):
+    """`wait` > 0 long-polls until the job finishes or that many seconds pass."""
+    record = await job_runner.wait(job_id, min(wait, _MAX_WAIT_SECONDS))
+    if record is None:
+        return JSONResponse(status_code=404, content={"error": f"Job {job_id} not found"})
+    return record.to_dict()
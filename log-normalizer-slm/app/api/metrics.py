@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+
+from app.engine import gateway
+
+router = APIRouter()
+
+
+@router.get('/metrics')
+async def metrics():
+    status = await gateway.engine.status()
+    return {"scheduler": status["scheduler"]}
@@ -1,100 +1,163 @@
-import asyncio
-import json
 import time
 import logging
+from typing import Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Body, Header
 from fastapi.responses import JSONResponse
-
-from app.models.model_loader import model_manager
-from app.utils.prompt_builder import build_prompt
-from app.utils.ocsf_parser import extract_json
-from app.scoring.confidence import compute_confidence
-from app.ocsf.validator import validate_ocsf
+from pydantic import ValidationError
+
+from app.config import settings
+from app.engine import gateway
+from app.engine.drain import Drained, Draining
+from app.engine.protocol import EngineUnavailable
+from app.scheduler.scheduler import DeadlineExceeded, QueueFull
+from app.scheduler.capacity import retry_after_seconds
+from app.ocsf.batch_validation import validate_cached, validate_many
 from app.schemas.request import NormalizeRequest, ValidateRequest
-from app.schemas.response import NormalizeResponse
+from app.schemas.response import NormalizeResponse, BatchNormalizeResponse
+from app.utils.serialization import NegotiatedRoute, negotiated_response, shallow_dump
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
-
-_gpu_semaphore = asyncio.Semaphore(1)
-
-
-def _sync_normalize(req: NormalizeRequest) -> NormalizeResponse:
-    start_time = time.time()
-    try:
-        prompt = build_prompt(req.raw_log, req.source, req.format, examples=None)
-        raw_output = model_manager.generate(prompt)
-        ocsf = extract_json(raw_output)
-
-        if ocsf is None:
-            processing_time_ms = int((time.time() - start_time) * 1000)
-            return NormalizeResponse(
-                ocsf=ocsf,
-                decision="reject",
-                confidence=0.0,
-                processing_time_ms=processing_time_ms,
-                error="JSON extraction failed",
-            )
-
-        validation = validate_ocsf(ocsf, source=req.source)
-        clean_ocsf = validation.cleaned if validation.valid else ocsf
-
-        try:
-            raw_dict = json.loads(req.raw_log)
-            if not isinstance(raw_dict, dict):
-                raw_dict = {"raw": req.raw_log}
-        except (json.JSONDecodeError, ValueError):
-            raw_dict = {"raw": req.raw_log}
-
-        
-        result = compute_confidence(
-            raw_dict, clean_ocsf, req.source,
-            validation_errors=validation.errors,
-            validation_warnings=validation.warnings,
-        )
-        processing_time_ms = int((time.time() - start_time) * 1000)
-
-        logger.info(
-            "source=%s confidence=%.3f decision=%s time_ms=%d",
-            req.source, result.score, result.decision, processing_time_ms,
-        )
+router = APIRouter(route_class=NegotiatedRoute)
 
-        return NormalizeResponse(
-            ocsf=clean_ocsf,
-            decision=result.decision,
-            confidence=result.score,
-            processing_time_ms=processing_time_ms,
-            breakdown=result.breakdown,
-            validation_errors=result.validation_errors if result.validation_errors else None,
-        )
 
-    except Exception as err:
-        processing_time_ms = int((time.time() - start_time) * 1000)
-        logger.error("Normalize error: %s", err, exc_info=True)
-        return NormalizeResponse(
-            ocsf=None,
-            decision="reject",
-            confidence=0.0,
-            processing_time_ms=processing_time_ms,
-            error=str(err),
-        )
+def _resolve_deadline(*timeouts_ms: Optional[int]) -> Optional[float]:
+    """Earliest of the given budgets (body field, header), else the
+    configured default, as an absolute time.monotonic() value."""
+    budgets = [ms for ms in timeouts_ms if ms and ms > 0]
+    if not budgets and settings.default_timeout_ms:
+        budgets.append(settings.default_timeout_ms)
+    if not budgets:
+        return None
+    return time.monotonic() + min(budgets) / 1000
 
 
 @router.post("/normalize", response_model=NormalizeResponse)
-async def normalize(req: NormalizeRequest):
-    if not model_manager.is_ready:
-        return JSONResponse(status_code=503, content={"error": "Model loading, try again"})
+async def normalize(
+    req: NormalizeRequest,
+    x_request_timeout_ms: Optional[int] = Header(default=None),
+    accept: Optional[str] = Header(default=None),
+):
+    deadline = _resolve_deadline(req.timeout_ms, x_request_timeout_ms)
+    try:
+        result = await gateway.normalize(req, deadline)
+        return negotiated_response(shallow_dump(result), accept)
+    except Drained as err:
+        logger.warning("source=%s cut off by shutdown: %s", req.source, err)
+        return _unavailable(Draining())
+    except EngineUnavailable as err:
+        return _unavailable(err)
+    except QueueFull as err:
+        return _queue_full(err)
+    except DeadlineExceeded as err:
+        logger.warning("source=%s dropped: %s", req.source, err)
+        return JSONResponse(status_code=504, content={"error": str(err)})
+
+
+@router.post("/normalize/batch", response_model=BatchNormalizeResponse)
+async def normalize_batch(
+    items: list[dict] = Body(...),
+    x_request_timeout_ms: Optional[int] = Header(default=None),
+    accept: Optional[str] = Header(default=None),
+):
+    """
+    Normalize many alerts with one batched generate. Each item is a
+    /normalize body. Results are in input order; an item that fails
+    validation gets its own error without failing the rest.
+    """
+    if len(items) > settings.max_batch_items:
+        return JSONResponse(
+            status_code=413,
+            content={"error": f"Batch of {len(items)} exceeds max_batch_items={settings.max_batch_items}"},
+        )
 
-    if _gpu_semaphore.locked():
-        return JSONResponse(status_code=503, content={"error": "GPU busy"})
+    results: list[Optional[NormalizeResponse]] = [None] * len(items)
+    valid: list[tuple[int, NormalizeRequest]] = []
+    for i, item in enumerate(items):
+        try:
+            valid.append((i, NormalizeRequest(**item)))
+        except ValidationError as err:
+            results[i] = _invalid_item(err)
 
-    async with _gpu_semaphore:
-        result = await asyncio.get_event_loop().run_in_executor(None, _sync_normalize, req)
-        return result
+    if valid:
+        reqs = [req for _, req in valid]
+        deadline = _resolve_deadline(x_request_timeout_ms, *(req.timeout_ms for req in reqs))
+        try:
+            outputs = await gateway.normalize_batch(reqs, deadline)
+        except Drained as err:
+            logger.warning("batch of %d cut off by shutdown: %s", len(reqs), err)
+            return _unavailable(Draining())
+        except EngineUnavailable as err:
+            return _unavailable(err)
+        except QueueFull as err:
+            return _queue_full(err)
+        except DeadlineExceeded as err:
+            logger.warning("batch of %d dropped: %s", len(reqs), err)
+            return JSONResponse(status_code=504, content={"error": str(err)})
+
+        for (i, _), output in zip(valid, outputs):
+            results[i] = output
+
+    return negotiated_response(shallow_dump(BatchNormalizeResponse(results=results)), accept)
+
+
+def _unavailable(err: EngineUnavailable) -> JSONResponse:
+    if err.retry_after is None:
+        return JSONResponse(status_code=503, content={"error": str(err)})
+    return JSONResponse(
+        status_code=503,
+        content={"error": str(err)},
+        headers={"Retry-After": str(retry_after_seconds(err.retry_after))},
+    )
+
+
+def _invalid_item(err: ValidationError) -> NormalizeResponse:
+    errors = [f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" for e in err.errors()]
+    return NormalizeResponse(
+        ocsf=None,
+        decision="reject",
+        confidence=0.0,
+        processing_time_ms=0,
+        error="Invalid request: " + "; ".join(errors),
+    )
+
+
+def _queue_full(err: QueueFull) -> JSONResponse:
+    retry_after = retry_after_seconds(err.retry_after)
+    return JSONResponse(
+        status_code=429,
+        content={"error": "Queue full", "retry_after_seconds": retry_after},
+        headers={"Retry-After": str(retry_after)},
+    )
 
 
 @router.post("/validate")
 def validate(request: ValidateRequest):
-    result = validate_ocsf(request.ocsf)
-    return {"valid": result.valid, "errors": result.errors}
+    return validate_cached(request.ocsf)
+
+
+@router.post("/validate/batch")
+def validate_batch(items: list[dict] = Body(...)):
+    """
+    Validate many /validate bodies in one call. Results are in input order,
+    each {"valid", "errors", "warnings"}; warnings list fields validation
+    stripped.
+    """
+    if len(items) > settings.max_validate_items:
+        return JSONResponse(
+            status_code=413,
+            content={"error": f"Batch of {len(items)} exceeds max_validate_items={settings.max_validate_items}"},
+        )
+
+    results: list[Optional[dict]] = [None] * len(items)
+    objects: list[tuple[int, dict]] = []
+    for i, item in enumerate(items):
+        ocsf = item.get("ocsf")
+        if isinstance(ocsf, dict):
+            objects.append((i, ocsf))
+        else:
+            results[i] = {"valid": False, "errors": ["ocsf: Input should be a valid dictionary"], "warnings": []}
+
+    for (i, _), result in zip(objects, validate_many([ocsf for _, ocsf in objects])):
+        results[i] = result
+    return {"results": results}
@@ -0,0 +1,126 @@
+"""
+NDJSON bulk ingestion.
+
+POST /api/normalize/stream with one /normalize body per line. Lines are
+fed to the scheduler as they arrive and results are written back as NDJSON
+in completion order:
+
+    {"line": 3, "result": {...NormalizeResponse}}
+    {"line": 7, "error": "..."}
+
+At most `stream_max_in_flight` lines are queued or running (or waiting to
+be written) at once. Reading the upload pauses while that window is full,
+so memory stays flat however large the upload is.
+"""
+
+import asyncio
+import json
+import logging
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import ValidationError
+
+from app.config import settings
+from app.engine import gateway
+from app.engine.drain import Drained, Draining
+from app.engine.protocol import EngineUnavailable
+from app.jobs.runner import job_runner
+from app.scheduler.scheduler import QueueFull
+from app.schemas.request import NormalizeRequest
+from app.utils.ndjson import iter_lines, LineTooLong
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+_EOF = object()
+
+
+class _FullDuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse that doesn't listen for disconnect on `receive`.
+
+    The stock implementation (ASGI < 2.4) consumes `receive` messages in a
+    background task, which would swallow the request body we're still
+    reading while results stream out. Disconnects surface through
+    Request.stream() instead.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+
+
+@router.post("/normalize/stream")
+async def normalize_stream(request: Request):
+    status = await gateway.engine.status()
+    if not status["ready"]:
+        error = status["load_error"] or status.get("error") or "Model loading, try again"
+        return JSONResponse(status_code=503, content={"error": error})
+
+    return _FullDuplexStreamingResponse(
+        _stream_results(request, settings.stream_max_in_flight),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _stream_results(request: Request, max_in_flight: int):
+    window = asyncio.Semaphore(max_in_flight)
+    results: asyncio.Queue = asyncio.Queue()
+    tasks: set[asyncio.Task] = set()
+    launched = 0
+
+    async def read_upload() -> None:
+        nonlocal launched
+        try:
+            async for line_no, line in iter_lines(request.stream()):
+                await window.acquire()
+                task = asyncio.create_task(_run_line(line_no, line, results))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                launched += 1
+        finally:
+            await results.put(_EOF)
+
+    reader = asyncio.create_task(read_upload())
+    reading = True
+    written = 0
+    try:
+        while reading or written < launched:
+            item = await results.get()
+            if item is _EOF:
+                reading = False
+                continue
+            window.release()
+            written += 1
+            yield json.dumps(item) + "\n"
+    finally:
+        reader.cancel()
+        for task in list(tasks):
+            task.cancel()
+
+
+async def _run_line(line_no: int, line, results: asyncio.Queue) -> None:
+    try:
+        if isinstance(line, LineTooLong):
+            raise line
+        req = NormalizeRequest(**json.loads(line))
+        while True:
+            try:
+                response = await gateway.normalize(req)
+                break
+            except (Drained, Draining):
+                # Shutting down: the line continues as a job in the next process.
+                job_id = job_runner.defer([req])[0]
+                await results.put({"line": line_no, "job_id": job_id})
+                return
+            except QueueFull as err:
+                await asyncio.sleep(err.retry_after)
+            except EngineUnavailable as err:
+                if err.retry_after is None:
+                    raise
+                await asyncio.sleep(err.retry_after)
+        await results.put({"line": line_no, "result": response.model_dump()})
+    except (json.JSONDecodeError, ValidationError, LineTooLong) as err:
+        await results.put({"line": line_no, "error": str(err)})
+    except Exception as err:
+        logger.error("stream line %d failed: %s", line_no, err, exc_info=True)
+        await results.put({"line": line_no, "error": str(err)})
@@ -10,6 +10,9 @@ from typing import Optional
 from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+QUANTIZATION_MODES = ("none", "8bit", "4bit-nf4", "4bit-fp4")
+COMPUTE_DTYPES = ("bfloat16", "float16", "float32")
+
 
 class Settings(BaseSettings):
 
@@ -19,12 +22,103 @@ class Settings(BaseSettings):
     base_model_path: str = "fdtn-ai/Foundation-Sec-1.1-8B-Instruct"
     adapter_path: str = "foundation-sec-finetuned" 
     device: str = "auto"
+    # Defaults match training/config/training_config.yaml (nf4, double quant,
+    # bf16 compute) so the adapter is served at the precision it was trained in.
+    quantization: str = "4bit-nf4"          # none | 8bit | 4bit-nf4 | 4bit-fp4
+    compute_dtype: str = "bfloat16"         # bfloat16 | float16 | float32
+    double_quant: bool = True               # 4-bit only
+    attn_implementation: Optional[str] = None  # eager | sdpa | flash_attention_2; None = transformers default
     temperature: float = 0.1
     max_new_tokens: int = 4700
+    # Seed the assistant turn with the constant OCSF header (ASSISTANT_PREFIX)
+    # so generation starts after it. Turn off for adapters trained without it.
+    assistant_prefill: bool = True
+    # When a single-request generation hits max_new_tokens mid-object, resume
+    # from its KV cache with this many more tokens (0 = reject as before).
+    continuation_tokens: int = 1024
+    max_continuations: int = 1
+    # Prompts generated together by /api/normalize/batch; bounded by GPU memory.
+    generation_batch_size: int = 4
+    # Send CEF/LEEF/syslog/CSV logs to the model as parsed key=value lines
+    # rather than the raw text. Off = raw text (scoring still uses the fields).
+    # Off by default: the adapter was trained on raw text, and the rendering
+    # is not shorter (scripts/benchmark_log_formats.py).
+    structured_prompts: bool = False
+
+    # -- Static cache settings ---------
+    # Opt-in: preallocated KV caches per prompt-length bucket plus a
+    # torch.compile'd forward, reused across single-request generations.
+    # Each cache holds its prompt length plus max_new_tokens.
+    static_cache: bool = False
+    static_cache_buckets: list[int] = [1024, 2048, 4096]
+    # None picks "reduce-overhead" on CUDA and "default" on CPU.
+    compile_mode: Optional[str] = None
+
+    # -- Engine settings ---------
+    # Unix socket of a separate inference engine process (app.engine.server).
+    # Unset = load the model in this process.
+    engine_socket: Optional[str] = None
+
+    # -- Scheduling settings ---------
+    # Applied when a request carries no deadline of its own. None = wait forever.
+    default_timeout_ms: Optional[int] = None
+    # Requests waiting for the GPU beyond this are refused with 429 + Retry-After.
+    max_queue_depth: int = 32
+    # Upper bound on items in one /api/normalize/batch call.
+    max_batch_items: int = 64
+    # Lines from one /api/normalize/stream upload queued or running at once.
+    stream_max_in_flight: int = 4
+    # Share of the GPU per source under contention (weighted fair queuing).
+    # Sources not listed get default_source_weight.
+    source_weights: dict[str, float] = {}
+    default_source_weight: float = 1.0
+    # Cost of a request, in generated tokens: the output length predicted for
+    # its source (this until observed) plus prompt_token_cost per prompt token.
+    default_output_tokens: int = 1200
+    prompt_token_cost: float = 0.05
+    # Shorter jobs overtake a queued one for at most this many times its own
+    # estimated run time (0 = arrival order).
+    cost_aging_factor: float = 1.0
+    # Prompts longer than this wait in a separate lane with its own bound and
+    # share, so a few huge alerts can't hold up the rest.
+    oversized_prompt_tokens: int = 8192
+    oversized_lane_weight: float = 0.25
+    max_oversized_queue_depth: int = 4
+    # Estimate each alert's severity from the raw log and serve a source's
+    # higher severities first. Off = every request at the same priority
+    # unless pinned.
+    severity_priority: bool = True
+
+    # On SIGTERM, seconds queued and running work gets to finish before
+    # what is left is stopped: /normalize calls get 503 + Retry-After,
+    # jobs go back to the store for the next process.
+    shutdown_grace_seconds: float = 30.0
+
+    # -- Validation settings ---------
+    # Objects accepted in one /api/validate/batch call.
+    max_validate_items: int = 1000
+    # Processes validating a large batch; 0 = validate in the request thread.
+    validate_workers: int = 2
+    # Validation results kept, keyed on the canonical-JSON hash of the object.
+    validate_cache_size: int = 4096
+
+    # -- Job settings ---------
+    job_store_path: str = "jobs.sqlite3"
+    job_workers: int = 2
+    job_callback_batch_size: int = 20
+    job_callback_interval_seconds: float = 2.0
 
     # -- Confidence settings --------- 
     accept_threshold: float = 0.85
     review_threshold: float = 0.60
+    # Record the log-probability of each generated token (single requests)
+    # and score how sure the model was about each OCSF value.
+    token_logprobs: bool = False
+    # Share of the composite given to that signal when it is available.
+    logprob_weight: float = 0.15
+    # Values whose least likely token falls below this probability are
+    # listed as uncertain.
+    logprob_flag_threshold: float = 0.5
 
     # -- App settings ---------
     log_level: str = "INFO"
@@ -38,6 +132,40 @@ class Settings(BaseSettings):
         typo like 2.0 doesn't crash the whole service on startup."""
         return max(0.0, min(1.0, v))
 
+    @field_validator("quantization")
+    @classmethod
+    def check_quantization(cls, v: str) -> str:
+        if v not in QUANTIZATION_MODES:
+            raise ValueError(f"quantization must be one of {', '.join(QUANTIZATION_MODES)}")
+        return v
+
+    @field_validator("compute_dtype")
+    @classmethod
+    def check_compute_dtype(cls, v: str) -> str:
+        if v not in COMPUTE_DTYPES:
+            raise ValueError(f"compute_dtype must be one of {', '.join(COMPUTE_DTYPES)}")
+        return v
+
+    @field_validator("source_weights")
+    @classmethod
+    def check_source_weights(cls, v: dict[str, float]) -> dict[str, float]:
+        bad = [source for source, weight in v.items() if weight <= 0]
+        if bad:
+            raise ValueError(f"source_weights must be positive, got {', '.join(bad)}")
+        return v
+
+    @field_validator("default_source_weight", "oversized_lane_weight")
+    @classmethod
+    def check_default_source_weight(cls, v: float) -> float:
+        if v <= 0:
+            raise ValueError("lane weights must be positive")
+        return v
+
+    @field_validator("logprob_weight", "logprob_flag_threshold")
+    @classmethod
+    def clamp_unit_interval(cls, v: float) -> float:
+        return max(0.0, min(1.0, v))
+
 
 
 
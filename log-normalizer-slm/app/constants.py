@@ -1,3 +1,5 @@
+import json
+
 SYSTEM_PROMPT = f"""You are a security log normalizer. You convert raw vendor security alerts into OCSF v1.1.0 Detection Finding (class_uid: 2004) format.
 
 Rules:
@@ -14,3 +16,21 @@ Rules:
 - Omit fields with no value. No nulls, no empty strings, no placeholders.
             """
 
+
+# Fixed Detection Finding header, same keys and order as _OCSF_BASE in
+# data/labeling/vendors/base.py. Every label starts with it, so the
+# assistant turn is seeded with it (serving and training alike) and the
+# model continues from the next key instead of regenerating constants.
+OCSF_HEADER = {
+    "activity_id": 1,
+    "activity_name": "Create",
+    "category_uid": 2,
+    "category_name": "Findings",
+    "class_uid": 2004,
+    "class_name": "Detection Finding",
+    "type_uid": 200401,
+}
+
+# `{\n  "activity_id": 1,\n ... "type_uid": 200401,\n` as json.dumps(indent=2)
+# writes it in the training data.
+ASSISTANT_PREFIX = json.dumps(OCSF_HEADER, indent=2)[:-2] + ",\n"
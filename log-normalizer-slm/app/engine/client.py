@@ -0,0 +1,147 @@
+"""
+Client side of the engine socket, used by each HTTP worker.
+
+Same interface as LocalEngine, so the gateway doesn't care which one it
+has. One connection per worker carries every in-flight request; a reader
+task matches replies to waiting callers by id. The connection is opened
+on first use and again after it drops.
+"""
+
+import asyncio
+import itertools
+import logging
+import time
+from typing import Optional
+
+from app.engine.protocol import (
+    DEADLINE, QUEUE_FULL, UNAVAILABLE,
+    EngineUnavailable, ProtocolError, encode_message, read_message,
+)
+from app.scheduler.priority import UNKNOWN_PRIORITY
+from app.scheduler.scheduler import DEFAULT_SOURCE, DeadlineExceeded, QueueFull
+
+logger = logging.getLogger(__name__)
+
+# Suggested retry when the engine process can't be reached (restarting).
+_UNREACHABLE_RETRY_AFTER = 5
+# The engine enforces deadlines itself; this only covers an engine that
+# stopped answering.
+_DEADLINE_GRACE_SECONDS = 1.0
+
+
+class RemoteEngine:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._pending: dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+
+    def start(self) -> None:
+        pass  # connects on first call
+
+    async def stop(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+
+    async def generate(self, prompt: list[dict], deadline: Optional[float] = None,
+                       source: str = DEFAULT_SOURCE, priority: int = UNKNOWN_PRIORITY) -> dict:
+        args = {"prompt": prompt, "source": source, "priority": priority}
+        return await self._call("generate", args, deadline)
+
+    async def generate_batch(self, prompts: list[list[dict]], deadline: Optional[float] = None,
+                             source: str = DEFAULT_SOURCE, priority: int = UNKNOWN_PRIORITY) -> list[str]:
+        args = {"prompts": prompts, "source": source, "priority": priority}
+        return await self._call("generate_batch", args, deadline)
+
+    async def status(self) -> dict:
+        try:
+            return await self._call("status", {}, None)
+        except EngineUnavailable as err:
+            return {"ready": False, "reachable": False, "error": str(err), "load_error": None,
+                    "tokens_per_second": None, "scheduler": None}
+
+    async def _call(self, op: str, args: dict, deadline: Optional[float]):
+        timeout = None
+        if deadline is not None:
+            args["timeout"] = max(0.0, deadline - time.monotonic())
+            timeout = args["timeout"] + _DEADLINE_GRACE_SECONDS
+
+        writer = await self._connection()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            writer.write(encode_message({"id": request_id, "op": op, "args": args}))
+            await writer.drain()
+            reply = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._cancel(request_id)
+            raise DeadlineExceeded("Deadline exceeded waiting for the inference engine")
+        except asyncio.CancelledError:
+            self._cancel(request_id)
+            raise
+        except ConnectionError as err:
+            raise EngineUnavailable(f"Lost connection to the inference engine: {err}",
+                                    retry_after=_UNREACHABLE_RETRY_AFTER)
+        finally:
+            self._pending.pop(request_id, None)
+
+        error = reply.get("error")
+        if error is None:
+            return reply["result"]
+        if error == QUEUE_FULL:
+            raise QueueFull(reply["retry_after"])
+        if error == DEADLINE:
+            raise DeadlineExceeded(reply["message"])
+        if error == UNAVAILABLE:
+            raise EngineUnavailable(reply["message"], retry_after=reply.get("retry_after"))
+        raise RuntimeError(reply["message"])
+
+    def _cancel(self, request_id: int) -> None:
+        """Tell the engine nobody is waiting, so a queued job is skipped."""
+        if self._writer is not None and not self._writer.is_closing():
+            self._writer.write(encode_message({"id": 0, "op": "cancel", "args": {"id": request_id}}))
+
+    async def _connection(self) -> asyncio.StreamWriter:
+        if self._writer is not None and not self._writer.is_closing():
+            return self._writer
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return self._writer
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except OSError as err:
+                raise EngineUnavailable(f"Inference engine not reachable at {self.path}: {err}",
+                                        retry_after=_UNREACHABLE_RETRY_AFTER)
+            self._writer = writer
+            self._reader_task = asyncio.create_task(self._read_replies(reader, writer))
+            return writer
+
+    async def _read_replies(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                reply = await read_message(reader)
+                future = self._pending.get(reply.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except (asyncio.IncompleteReadError, ConnectionError) as err:
+            logger.warning("Inference engine connection closed: %s", err)
+        except ProtocolError as err:
+            logger.error("Dropping inference engine connection, bad reply: %s", err)
+        finally:
+            writer.close()
+            if self._writer is writer:
+                self._writer = None
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(EngineUnavailable(
+                        "Lost connection to the inference engine", retry_after=_UNREACHABLE_RETRY_AFTER))
@@ -0,0 +1,150 @@
+"""
+Graceful shutdown: stop taking work, finish what is in flight, hand the
+rest to the job store.
+
+On SIGTERM (or SIGINT) the process starts draining instead of exiting:
+/health reports "draining" so the load balancer stops sending traffic,
+new requests get 503 with Retry-After so the caller tries another
+instance, and everything already queued or generating gets up to
+shutdown_grace_seconds to finish. Whatever is still waiting when the
+grace period ends is cancelled out of the scheduler (a generation already
+running is told to stop at its next token) and its caller gets
+Drained: /normalize answers 503 with Retry-After (the backend retries
+its pending logs elsewhere), and jobs and stream lines go back to the
+job store for the next process. Only then does the server's own signal
+handler run and the usual shutdown begin. A second signal skips the wait.
+"""
+
+import asyncio
+import logging
+import signal
+import time
+from typing import Any, Awaitable, Optional
+
+from app.engine.protocol import EngineUnavailable
+
+logger = logging.getLogger(__name__)
+
+# Suggested retry for requests refused while draining; another instance
+# can take them right away.
+DRAINING_RETRY_AFTER = 1
+_POLL_SECONDS = 0.1
+# Time given to cancelled requests to reach the job store.
+_HANDOFF_SECONDS = 1.0
+
+
+class Draining(EngineUnavailable):
+    """Refused at admission: the process is shutting down."""
+
+    def __init__(self):
+        super().__init__("Shutting down, retry on another instance", retry_after=DRAINING_RETRY_AFTER)
+
+
+class Drained(Exception):
+    """Admitted work not finished within the shutdown grace period."""
+
+
+class Drain:
+
+    def __init__(self):
+        self.draining = False
+        # Grace period over; work still in flight is being handed off.
+        self.expired = False
+        self._active: set[asyncio.Task] = set()
+        self._signals: dict[int, Any] = {}
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._active)
+
+    def check(self) -> None:
+        """Raise Draining if new work should be refused."""
+        if self.draining:
+            raise Draining()
+
+    async def run(self, awaitable: Awaitable) -> Any:
+        """
+        Await engine work as in-flight work: drain() waits for it, and if
+        the grace period runs out first it is cancelled and Drained raised.
+        """
+        task = asyncio.current_task()
+        self._active.add(task)
+        try:
+            return await awaitable
+        except asyncio.CancelledError:
+            if not self.expired:
+                raise
+            task.uncancel()
+            raise Drained("Shutdown grace period over before inference finished")
+        except EngineUnavailable:
+            if not self.draining:
+                raise
+            # The engine process went down first during a shutdown.
+            raise Drained("Inference engine stopped during shutdown")
+        finally:
+            self._active.discard(task)
+
+    async def drain(self, grace_seconds: float) -> None:
+        """Refuse new work and wait up to `grace_seconds` for in-flight work."""
+        if self.expired:
+            return
+        self.draining = True
+        deadline = time.monotonic() + grace_seconds
+        if self._active:
+            logger.info("Draining %d in-flight requests (up to %.0fs)", len(self._active), grace_seconds)
+        while self._active and time.monotonic() < deadline:
+            await asyncio.sleep(_POLL_SECONDS)
+
+        self.expired = True
+        if self._active:
+            logger.warning("Shutdown grace period over; handing %d requests to the job store",
+                           len(self._active))
+        for task in list(self._active):
+            task.cancel()
+        # Let the cancelled handlers store their requests before shutdown goes on.
+        handoff_deadline = time.monotonic() + _HANDOFF_SECONDS
+        while self._active and time.monotonic() < handoff_deadline:
+            await asyncio.sleep(0)
+
+    def install_signal_handlers(self, grace_seconds: float) -> None:
+        """Drain on SIGTERM/SIGINT, then pass the signal to whatever handler
+        was installed before (uvicorn's, which starts the shutdown)."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            previous = signal.getsignal(sig)
+            try:
+                loop.add_signal_handler(sig, self._on_signal, sig, grace_seconds)
+            except (NotImplementedError, RuntimeError, ValueError):
+                return  # not the main thread, or no signal support
+            self._signals[sig] = previous
+
+    def _on_signal(self, sig: int, grace_seconds: float) -> None:
+        if self.draining:
+            self._exit(sig)
+            return
+        logger.info("Received %s, draining before shutdown", signal.Signals(sig).name)
+        asyncio.get_running_loop().create_task(self._drain_then_exit(sig, grace_seconds))
+
+    async def _drain_then_exit(self, sig: int, grace_seconds: float) -> None:
+        await self.drain(grace_seconds)
+        self._exit(sig)
+
+    def _exit(self, sig: int) -> None:
+        if not self._signals:
+            return  # already handed over (a second signal beat the drain)
+        loop = asyncio.get_running_loop()
+        previous: Optional[Any] = None
+        for installed, handler in self._signals.items():
+            loop.remove_signal_handler(installed)
+            signal.signal(installed, handler)
+            if installed == sig:
+                previous = handler
+        self._signals = {}
+        if callable(previous):
+            previous(sig, None)
+        else:
+            signal.raise_signal(sig)
+
+
+# instance to import
+drain = Drain()
@@ -0,0 +1,92 @@
+"""
+What the API calls to normalize: prompt building and post-processing
+here, generation in the engine.
+
+With settings.engine_socket unset the engine is LocalEngine (model in
+this process). With it set, each HTTP worker talks to the engine server
+over that socket, and parsing, validation and scoring run in the workers,
+which scale across cores while the model is loaded once.
+
+The GPU slot is held only for generation; post-processing runs in the
+default executor after it is released.
+
+While the process drains for shutdown (app.engine.drain), new calls raise
+Draining and calls still generating when the grace period ends raise
+Drained.
+"""
+
+import asyncio
+import time
+from functools import partial
+from typing import Optional
+
+from app.config import settings
+from app.engine.client import RemoteEngine
+from app.engine.drain import Drained, drain
+from app.engine.local import LocalEngine
+from app.engine.protocol import EngineUnavailable
+from app.normalizer import error_response, postprocess, postprocess_batch
+from app.scheduler.priority import request_priority
+from app.scheduler.scheduler import DeadlineExceeded, QueueFull
+from app.schemas.request import NormalizeRequest
+from app.schemas.response import NormalizeResponse
+from app.utils.prompt_builder import build_prompt
+
+# Scheduler source of a batch whose items come from several sources; not
+# a valid request source, so no real source shares its queue.
+MIXED_SOURCE = "(mixed)"
+
+
+async def normalize(req: NormalizeRequest, deadline: Optional[float] = None) -> NormalizeResponse:
+    """
+    Raises QueueFull, DeadlineExceeded, EngineUnavailable (Draining) and
+    Drained for the caller to map to HTTP; any other failure becomes an
+    error response.
+    """
+    drain.check()
+    start_time = time.time()
+    try:
+        prompt = build_prompt(req.raw, req.source, req.format, examples=None)
+        output = await drain.run(engine.generate(prompt, deadline, req.source, request_priority(req)))
+    except (QueueFull, DeadlineExceeded, EngineUnavailable, Drained):
+        raise
+    except Exception as err:
+        return error_response(err, start_time)
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(_postprocess, req, output, start_time))
+
+
+async def normalize_batch(reqs: list[NormalizeRequest],
+                          deadline: Optional[float] = None) -> list[NormalizeResponse]:
+    """
+    Results in input order; same exceptions as normalize(). The batch is
+    queued under its source when all items share one, at the priority of
+    its most urgent item.
+    """
+    drain.check()
+    start_time = time.time()
+    sources = {req.source for req in reqs}
+    source = sources.pop() if len(sources) == 1 else MIXED_SOURCE
+    try:
+        prompts = [build_prompt(req.raw, req.source, req.format, examples=None) for req in reqs]
+        priority = max(request_priority(req) for req in reqs)
+        outputs = await drain.run(engine.generate_batch(prompts, deadline, source, priority))
+    except (QueueFull, DeadlineExceeded, EngineUnavailable, Drained):
+        raise
+    except Exception as err:
+        return [error_response(err, start_time) for _ in reqs]
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(postprocess_batch, reqs, outputs, start_time))
+
+
+def _postprocess(req: NormalizeRequest, output: dict, start_time: float) -> NormalizeResponse:
+    try:
+        return postprocess(req, output["text"], start_time, output["logprobs"], output["token_offsets"])
+    except Exception as err:
+        return error_response(err, start_time)
+
+
+# instance to import
+engine = RemoteEngine(settings.engine_socket) if settings.engine_socket else LocalEngine()
@@ -0,0 +1,81 @@
+"""
+The model and the scheduler in this process.
+
+This is the whole engine when the API runs as a single process, and what
+the engine server (app.engine.server) wraps when HTTP workers are split
+off. Every call goes through the EDF scheduler, so admission, deadlines
+and the queue bound apply the same way in both setups.
+"""
+
+import asyncio
+import threading
+from functools import partial
+from typing import Optional
+
+from app.engine.protocol import EngineUnavailable
+from app.config import settings
+from app.models.model_loader import model_manager
+from app.normalizer import generate_output
+from app.scheduler.cost import cost_model, prompt_chars
+from app.scheduler.priority import UNKNOWN_PRIORITY
+from app.scheduler.scheduler import DEFAULT_SOURCE, scheduler
+
+# Model load takes tens of seconds; don't have callers hammer us meanwhile.
+LOADING_RETRY_AFTER = 30
+
+
+class LocalEngine:
+
+    def __init__(self):
+        self._load_task: Optional[asyncio.Future] = None
+
+    def start(self) -> None:
+        """Load the model in the background; calls answer 'loading' until then."""
+        if self._load_task is None:
+            self._load_task = asyncio.get_running_loop().run_in_executor(None, model_manager.load)
+
+    async def stop(self) -> None:
+        pass
+
+    async def generate(self, prompt: list[dict], deadline: Optional[float] = None,
+                       source: str = DEFAULT_SOURCE, priority: int = UNKNOWN_PRIORITY) -> dict:
+        """{"text", "logprobs", "token_offsets", "prompt_tokens", "output_tokens"} for one prompt."""
+        self._check_ready()
+        prompt_tokens = cost_model.prompt_tokens(prompt)
+        cancel = threading.Event()
+        output = await scheduler.submit(
+            partial(generate_output, prompt, deadline, cancel), deadline=deadline, source=source,
+            cost=cost_model.estimate(prompt_tokens, source),
+            oversized=prompt_tokens > settings.oversized_prompt_tokens, priority=priority,
+            cancel=cancel,
+        )
+        cost_model.observe(source, output["output_tokens"], prompt_chars(prompt), output["prompt_tokens"])
+        return output
+
+    async def generate_batch(self, prompts: list[list[dict]], deadline: Optional[float] = None,
+                             source: str = DEFAULT_SOURCE, priority: int = UNKNOWN_PRIORITY) -> list[str]:
+        self._check_ready()
+        prompt_tokens = [cost_model.prompt_tokens(prompt) for prompt in prompts]
+        cancel = threading.Event()
+        return await scheduler.submit(
+            partial(model_manager.generate_batch, prompts, deadline, cancel), deadline=deadline, source=source,
+            cost=sum(cost_model.estimate(n, source) for n in prompt_tokens),
+            oversized=max(prompt_tokens) > settings.oversized_prompt_tokens, priority=priority,
+            cancel=cancel,
+        )
+
+    async def status(self) -> dict:
+        tokens_per_second = model_manager.tokens_per_second.value
+        return {
+            "ready": model_manager.is_ready,
+            "reachable": True,
+            "load_error": model_manager.load_error,
+            "tokens_per_second": round(tokens_per_second, 1) if tokens_per_second else None,
+            "scheduler": {**scheduler.snapshot(), "predicted_output_tokens": cost_model.snapshot()},
+        }
+
+    def _check_ready(self) -> None:
+        if model_manager.load_error:
+            raise EngineUnavailable(model_manager.load_error)
+        if not model_manager.is_ready:
+            raise EngineUnavailable("Model loading, try again", retry_after=LOADING_RETRY_AFTER)
@@ -0,0 +1,69 @@
+"""
+Wire format between the HTTP workers and the inference engine.
+
+Each message is a 4-byte big-endian length followed by a msgpack map,
+sent over a Unix socket. Requests carry an `id` chosen by the client, and
+the reply with the same `id` either has a `result` or an `error` code:
+
+    {"id": 7, "op": "generate", "args": {"prompt": [...], "timeout": 12.5}}
+    {"id": 7, "result": {"text": "...", "logprobs": null, "token_offsets": null}}
+    {"id": 8, "error": "queue_full", "message": "...", "retry_after": 4.2}
+
+Replies can arrive in any order, so one connection per worker carries
+all of its requests. Deadlines travel as remaining seconds (`timeout`),
+not as clock values.
+"""
+
+import asyncio
+import struct
+from typing import Optional
+
+import msgpack
+
+# Error codes in replies.
+QUEUE_FULL = "queue_full"
+DEADLINE = "deadline"
+UNAVAILABLE = "unavailable"
+FAILED = "failed"
+
+# A batch of long prompts with logprobs stays well below this.
+MAX_MESSAGE_BYTES = 256 * 2**20
+
+_HEADER = struct.Struct(">I")
+
+
+class ProtocolError(Exception):
+    """Malformed or oversized message."""
+
+
+async def read_message(reader: asyncio.StreamReader) -> dict:
+    """Next message; raises asyncio.IncompleteReadError at EOF and
+    ProtocolError for anything that isn't a msgpack map."""
+    header = await reader.readexactly(_HEADER.size)
+    (length,) = _HEADER.unpack(header)
+    if length > MAX_MESSAGE_BYTES:
+        raise ProtocolError(f"Message of {length} bytes exceeds {MAX_MESSAGE_BYTES}")
+    body = await reader.readexactly(length)
+    try:
+        message = msgpack.unpackb(body)
+    except (ValueError, TypeError, msgpack.UnpackException) as err:
+        raise ProtocolError(f"Undecodable message: {err or type(err).__name__}") from err
+    if not isinstance(message, dict):
+        raise ProtocolError(f"Expected a map, got {type(message).__name__}")
+    return message
+
+
+def encode_message(message: dict) -> bytes:
+    body = msgpack.packb(message)
+    if len(body) > MAX_MESSAGE_BYTES:
+        raise ProtocolError(f"Message of {len(body)} bytes exceeds {MAX_MESSAGE_BYTES}")
+    return _HEADER.pack(len(body)) + body
+
+
+class EngineUnavailable(Exception):
+    """The engine can't take work: model still loading (retry_after set),
+    failed to load (retry_after None), or not reachable."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -0,0 +1,163 @@
+"""
+Inference engine server: the one process that owns the model.
+
+Run it next to the HTTP workers when they are split off:
+
+    ENGINE_SOCKET=/run/lognorm/engine.sock python -m app.engine.server
+    ENGINE_SOCKET=/run/lognorm/engine.sock uvicorn app.main:app --workers 4
+
+The workers parse requests, build prompts, validate and score; this
+process only generates. Requests from all workers share one scheduler,
+so the queue bound, EDF order and deadlines are global. A request whose
+worker cancels it (or disconnects) is abandoned in the queue as it would
+be in-process.
+
+On SIGTERM the engine keeps serving for up to shutdown_grace_seconds, or
+until nothing is in flight, so the workers (draining themselves) can
+finish their generations before the model goes away. Generations still
+running after that are stopped, not waited for.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import time
+
+from app.config import settings
+from app.engine.local import LocalEngine
+from app.engine.protocol import (
+    DEADLINE, FAILED, QUEUE_FULL, UNAVAILABLE,
+    EngineUnavailable, ProtocolError, encode_message, read_message,
+)
+from app.logger import setup_logger
+from app.scheduler.priority import UNKNOWN_PRIORITY
+from app.scheduler.scheduler import DEFAULT_SOURCE, DeadlineExceeded, QueueFull
+
+logger = logging.getLogger(__name__)
+
+
+class EngineServer:
+
+    def __init__(self, engine, path: str):
+        self.engine = engine
+        self.path = path
+        self._server: asyncio.AbstractServer | None = None
+        self._in_flight: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # left over from a previous run
+        self._server = await asyncio.start_unix_server(self._serve_connection, path=self.path)
+        os.chmod(self.path, 0o660)
+        logger.info("Inference engine listening on %s", self.path)
+
+    async def drain(self, grace_seconds: float) -> None:
+        """Wait up to `grace_seconds` for in-flight calls to finish, then
+        cancel the rest; a running generation stops at its next token."""
+        deadline = time.monotonic() + grace_seconds
+        while self._in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+        if self._in_flight:
+            logger.warning("Stopping with %d engine calls in flight", len(self._in_flight))
+            for task in list(self._in_flight):
+                task.cancel()
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tasks: dict[int, asyncio.Task] = {}
+        try:
+            while True:
+                message = await read_message(reader)
+                request_id = message.get("id")
+                if message.get("op") == "cancel":
+                    task = tasks.get(message.get("args", {}).get("id"))
+                    if task is not None:
+                        task.cancel()
+                    continue
+                task = asyncio.create_task(self._reply(writer, request_id, message))
+                tasks[request_id] = task
+                self._in_flight.add(task)
+                task.add_done_callback(lambda _, i=request_id: tasks.pop(i, None))
+                task.add_done_callback(self._in_flight.discard)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ProtocolError as err:
+            logger.warning("Dropping worker connection: %s", err)
+        finally:
+            # The worker is gone; nobody will read these results.
+            for task in list(tasks.values()):
+                task.cancel()
+            writer.close()
+
+    async def _reply(self, writer: asyncio.StreamWriter, request_id: int, message: dict) -> None:
+        try:
+            reply = {"id": request_id, "result": await self._call(message.get("op"), message.get("args") or {})}
+        except QueueFull as err:
+            reply = {"id": request_id, "error": QUEUE_FULL, "message": str(err), "retry_after": err.retry_after}
+        except DeadlineExceeded as err:
+            reply = {"id": request_id, "error": DEADLINE, "message": str(err)}
+        except EngineUnavailable as err:
+            reply = {"id": request_id, "error": UNAVAILABLE, "message": str(err), "retry_after": err.retry_after}
+        except Exception as err:
+            logger.error("Engine call %s failed: %s", message.get("op"), err, exc_info=True)
+            reply = {"id": request_id, "error": FAILED, "message": str(err)}
+
+        if writer.is_closing():
+            return
+        writer.write(encode_message(reply))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _call(self, op: str, args: dict):
+        timeout = args.get("timeout")
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        source = args.get("source", DEFAULT_SOURCE)
+        priority = args.get("priority", UNKNOWN_PRIORITY)
+        if op == "generate":
+            return await self.engine.generate(args["prompt"], deadline, source, priority)
+        if op == "generate_batch":
+            return await self.engine.generate_batch(args["prompts"], deadline, source, priority)
+        if op == "status":
+            return await self.engine.status()
+        raise ValueError(f"Unknown engine op: {op!r}")
+
+
+async def serve(path: str) -> None:
+    engine = LocalEngine()
+    engine.start()
+    server = EngineServer(engine, path)
+    await server.start()
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stopping.set)
+    try:
+        await stopping.wait()
+        logger.info("Received SIGTERM, draining")
+        await server.drain(settings.shutdown_grace_seconds)
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    setup_logger()
+    if not settings.engine_socket:
+        raise SystemExit("Set engine_socket (ENGINE_SOCKET) to the Unix socket path to listen on")
+    try:
+        asyncio.run(serve(settings.engine_socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Batched callback delivery for finished jobs.
+
+Results are buffered per callback URL and POSTed as
+    {"jobs": [{id, status, result, error, ...}, ...]}
+once a batch fills up or the flush interval elapses. A job is marked
+notified only after its batch was accepted (2xx); anything undelivered
+is picked up again from the store on the next start.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# In-memory retries per batch before leaving it to the next restart.
+_MAX_ATTEMPTS = 5
+
+
+class CallbackNotifier:
+
+    def __init__(self, store, batch_size: int, interval_seconds: float):
+        self.store = store
+        self.batch_size = batch_size
+        self.interval_seconds = interval_seconds
+        self._pending: dict[str, list[dict]] = defaultdict(list)
+        self._attempts: dict[str, int] = defaultdict(int)
+        self._task: Optional[asyncio.Task] = None
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def start(self) -> None:
+        self._client = httpx.AsyncClient(timeout=10.0)
+        self._task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        await self.flush_all()
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    def add(self, url: str, job: dict) -> None:
+        self._pending[url].append(job)
+        if len(self._pending[url]) >= self.batch_size and self._client:
+            asyncio.create_task(self.flush(url))
+
+    async def flush_all(self) -> None:
+        for url in list(self._pending):
+            await self.flush(url)
+
+    async def flush(self, url: str) -> None:
+        if self._client is None or not self._pending.get(url):
+            return
+        batch = self._pending.pop(url)
+
+        try:
+            res = await self._client.post(url, json={"jobs": batch})
+            res.raise_for_status()
+        except httpx.HTTPError as err:
+            self._attempts[url] += 1
+            if self._attempts[url] < _MAX_ATTEMPTS:
+                logger.warning("Callback to %s failed (%s), will retry %d jobs", url, err, len(batch))
+                self._pending[url][:0] = batch
+            else:
+                logger.error("Callback to %s failed %d times, giving up on %d jobs until restart",
+                             url, self._attempts[url], len(batch))
+                self._attempts.pop(url, None)
+            return
+
+        self._attempts.pop(url, None)
+        self.store.mark_notified([job["id"] for job in batch])
+        logger.info("Delivered %d job results to %s", len(batch), url)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.flush_all()
@@ -0,0 +1,209 @@
+"""
+Runs stored jobs through the inference scheduler.
+
+A fixed number of workers pull job ids off an in-memory queue and submit
+them to the scheduler one at a time each, so a backfill of thousands of
+jobs never holds more than `job_workers` slots in the scheduler queue and
+interactive /normalize calls still get admitted. The queue is rebuilt from
+the store on start, which is what makes jobs survive a restart.
+
+While the process drains for shutdown, jobs are stored but not started,
+and a job cut off by the end of the grace period goes back to queued for
+the next process.
+"""
+
+import asyncio
+import fcntl
+import logging
+import time
+from typing import Optional
+
+from app.config import settings
+from app.jobs.callbacks import CallbackNotifier
+from app.jobs.store import JobStore, JobRecord
+from app.engine import gateway
+from app.engine.drain import Drained, Draining, drain
+from app.engine.protocol import EngineUnavailable
+from app.scheduler.scheduler import QueueFull
+from app.schemas.request import NormalizeRequest
+
+logger = logging.getLogger(__name__)
+
+# How often a worker re-checks a model that is still loading.
+_MODEL_POLL_SECONDS = 1.0
+# How often a long-poll re-reads the store, for jobs another HTTP worker runs.
+_WAIT_POLL_SECONDS = 0.5
+
+
+class JobRunner:
+
+    def __init__(self, store_path: str, workers: int):
+        self.store_path = store_path
+        self.workers = workers
+        self._store: Optional[JobStore] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+        self._waiters: dict[str, asyncio.Event] = {}
+        self.notifier: Optional[CallbackNotifier] = None
+        self._recovery_lock = None
+
+    @property
+    def store(self) -> JobStore:
+        # Opened on first use so importing the app doesn't create a database file.
+        if self._store is None:
+            self._store = JobStore(self.store_path)
+        return self._store
+
+    @property
+    def started(self) -> bool:
+        return bool(self._tasks) and not all(t.done() for t in self._tasks)
+
+    def start(self) -> None:
+        """Start workers and resume anything left over from a previous run."""
+        if self.started:
+            return
+
+        self._queue = asyncio.Queue()
+        self.notifier = CallbackNotifier(
+            self.store,
+            batch_size=settings.job_callback_batch_size,
+            interval_seconds=settings.job_callback_interval_seconds,
+        )
+        self.notifier.start()
+
+        # With several HTTP workers on one store, only one of them picks up
+        # what the previous run left behind.
+        if self._claim_recovery():
+            resumed = self.store.unfinished()
+            for job_id in resumed:
+                self._queue.put_nowait(job_id)
+            if resumed:
+                logger.info("Resuming %d unfinished jobs", len(resumed))
+            for record in self.store.unnotified():
+                self.notifier.add(record.callback_url, record.to_dict())
+
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    def _claim_recovery(self) -> bool:
+        """Exclusive lock next to the store, held for the life of the process."""
+        if self._recovery_lock is None:
+            lock = open(self.store_path + ".lock", "w")
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                lock.close()
+                return False
+            self._recovery_lock = lock
+        return True
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        if self.notifier:
+            await self.notifier.stop()
+
+    def submit(self, requests: list[NormalizeRequest], callback_url: Optional[str] = None) -> list[str]:
+        if drain.draining:
+            return self.defer(requests, callback_url)
+        self.start()
+        job_ids = self.defer(requests, callback_url)
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+        return job_ids
+
+    def defer(self, requests: list[NormalizeRequest], callback_url: Optional[str] = None) -> list[str]:
+        """Store jobs without starting them; the next start() resumes them."""
+        return self.store.create_many(
+            [req.model_dump(mode="json", exclude_none=True) for req in requests],
+            callback_url=callback_url,
+        )
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[JobRecord]:
+        """
+        Long-poll: return once the job finishes or `timeout` elapses.
+
+        A job run by this process wakes the wait as soon as it finishes.
+        With several HTTP workers on one store the job may be running in
+        another one, so the store is re-read every _WAIT_POLL_SECONDS too.
+        """
+        record = self.store.get(job_id)
+        if record is None or record.finished or timeout <= 0:
+            return record
+
+        deadline = time.monotonic() + timeout
+        event = self._waiters.setdefault(job_id, asyncio.Event())
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return record
+            try:
+                await asyncio.wait_for(event.wait(), min(remaining, _WAIT_POLL_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+            record = self.store.get(job_id)
+            if record is None or record.finished:
+                self._waiters.pop(job_id, None)
+                return record
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            if drain.draining:
+                self._queue.task_done()
+                continue  # stays queued in the store
+            try:
+                await self._run(job_id)
+            except Exception as err:
+                logger.error("[job %s] failed: %s", job_id, err, exc_info=True)
+                self.store.fail(job_id, str(err))
+                self._finish(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        record = self.store.get(job_id)
+        if record is None or record.finished:
+            return
+
+        req = NormalizeRequest(**record.request)
+
+        while True:
+            status = await gateway.engine.status()
+            if status["ready"]:
+                break
+            if status["load_error"]:
+                raise RuntimeError(status["load_error"])
+            await asyncio.sleep(_MODEL_POLL_SECONDS)
+
+        self.store.mark_running(job_id)
+        while True:
+            try:
+                result = await gateway.normalize(req)
+                break
+            except (Drained, Draining):
+                logger.info("[job %s] requeued for the next process", job_id)
+                self.store.requeue(job_id)
+                return
+            except QueueFull as err:
+                await asyncio.sleep(err.retry_after)
+            except EngineUnavailable as err:
+                if err.retry_after is None:
+                    raise RuntimeError(str(err))
+                await asyncio.sleep(err.retry_after)
+
+        self.store.complete(job_id, result.model_dump())
+        self._finish(job_id)
+
+    def _finish(self, job_id: str) -> None:
+        event = self._waiters.pop(job_id, None)
+        if event:
+            event.set()
+
+        record = self.store.get(job_id)
+        if record and record.callback_url and self.notifier:
+            self.notifier.add(record.callback_url, record.to_dict())
+
+
+# instance to import
+job_runner = JobRunner(settings.job_store_path, settings.job_workers)
@@ -0,0 +1,158 @@
+"""
+Durable job store for asynchronous normalization.
+
+SQLite in WAL mode: readers (long-polling GETs) never block the writer,
+and a job that was queued or running when the process died is still here
+on the next start, so it can be resumed.
+
+Status lifecycle: queued -> running -> done | failed
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           TEXT PRIMARY KEY,
+    status       TEXT NOT NULL,
+    request      TEXT NOT NULL,
+    result       TEXT,
+    error        TEXT,
+    callback_url TEXT,
+    notified     INTEGER NOT NULL DEFAULT 0,
+    created_at   REAL NOT NULL,
+    updated_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+"""
+
+
+class JobRecord:
+    def __init__(self, row: sqlite3.Row):
+        self.id = row["id"]
+        self.status = row["status"]
+        self.request = json.loads(row["request"])
+        self.result = json.loads(row["result"]) if row["result"] else None
+        self.error = row["error"]
+        self.callback_url = row["callback_url"]
+        self.notified = bool(row["notified"])
+        self.created_at = row["created_at"]
+        self.updated_at = row["updated_at"]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class JobStore:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def create_many(self, requests: list[dict], callback_url: Optional[str] = None) -> list[str]:
+        now = time.time()
+        rows = [
+            (uuid.uuid4().hex, QUEUED, json.dumps(req), callback_url, now, now)
+            for req in requests
+        ]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO jobs (id, status, request, callback_url, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute("COMMIT")
+        return [row[0] for row in rows]
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return JobRecord(row) if row else None
+
+    def get_many(self, job_ids: list[str]) -> list[JobRecord]:
+        if not job_ids:
+            return []
+        marks = ",".join("?" * len(job_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM jobs WHERE id IN ({marks})", job_ids
+            ).fetchall()
+        return [JobRecord(row) for row in rows]
+
+    def mark_running(self, job_id: str) -> None:
+        self._update(job_id, status=RUNNING)
+
+    def complete(self, job_id: str, result: dict) -> None:
+        self._update(job_id, status=DONE, result=json.dumps(result))
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._update(job_id, status=FAILED, error=error)
+
+    def requeue(self, job_id: str) -> None:
+        self._update(job_id, status=QUEUED)
+
+    def unfinished(self) -> list[str]:
+        """Jobs to resume after a restart, oldest first. A job left in
+        `running` was interrupted mid-generation and starts over."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN (?, ?) ORDER BY created_at",
+                (QUEUED, RUNNING),
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def unnotified(self) -> list[JobRecord]:
+        """Finished jobs whose callback has not been delivered yet."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE callback_url IS NOT NULL AND notified = 0 "
+                "AND status IN (?, ?) ORDER BY updated_at",
+                (DONE, FAILED),
+            ).fetchall()
+        return [JobRecord(row) for row in rows]
+
+    def mark_notified(self, job_ids: list[str]) -> None:
+        if not job_ids:
+            return
+        marks = ",".join("?" * len(job_ids))
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET notified = 1 WHERE id IN ({marks})", job_ids)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?",
+                (*fields.values(), job_id),
+            )
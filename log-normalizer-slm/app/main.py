@@ -1,30 +1,41 @@
-import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
 from app.logger import setup_logger
-from app.api import normalize, health
-from app.models.model_loader import model_manager
+from app.api import normalize, health, metrics, capacity, jobs, stream
+from app.config import settings
+from app.engine.drain import drain
+from app.engine.gateway import engine
+from app.jobs.runner import job_runner
+from app.ocsf import batch_validation
 
 
 setup_logger()
 
 
-async def _load_model_background():
-    loop = asyncio.get_event_loop()
-    await loop.run_in_executor(None, model_manager.load)
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    asyncio.create_task(_load_model_background())
+    # Loads the model in the background, or (engine_socket set) just
+    # connects to the engine process on first use.
+    engine.start()
+    job_runner.start()
+    # SIGTERM drains (up to shutdown_grace_seconds) before the server exits.
+    drain.install_signal_handlers(settings.shutdown_grace_seconds)
     yield
+    await drain.drain(settings.shutdown_grace_seconds)
+    await job_runner.stop()
+    await engine.stop()
+    batch_validation.shutdown()
 
 
 app = FastAPI(title="LogNormalizer SLM Service", version="1.0.0", lifespan=lifespan)
 app.include_router(normalize.router, prefix="/api")
+app.include_router(jobs.router, prefix="/api")
+app.include_router(stream.router, prefix="/api")
 app.include_router(health.router)
+app.include_router(metrics.router)
+app.include_router(capacity.router)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,27 @@
+"""
+Shape buckets for the static KV cache (app.models.static_cache).
+
+Kept apart from the cache itself so choosing a bucket doesn't need torch.
+"""
+
+from typing import Optional
+
+
+class Bucket:
+    def __init__(self, prompt_len: int, output_len: int):
+        self.prompt_len = prompt_len
+        self.output_len = output_len
+
+    def __repr__(self) -> str:
+        return f"Bucket({self.prompt_len}+{self.output_len})"
+
+
+def select_bucket(buckets: list[Bucket], prompt_len: int, output_len: int) -> Optional[Bucket]:
+    """
+    The smallest bucket holding both the prompt and the full output budget,
+    or None (generate with the dynamic cache instead). A bucket with room
+    for the prompt but not the output is never used: it would cut the
+    output short, and static-cache generations can't be continued.
+    """
+    fitting = [b for b in buckets if prompt_len <= b.prompt_len and output_len <= b.output_len]
+    return min(fitting, key=lambda b: (b.prompt_len + b.output_len, b.prompt_len), default=None)
@@ -1,29 +1,296 @@
+import time
+from contextlib import nullcontext
+from typing import Optional
+
 import torch
+from transformers import LogitsProcessor, LogitsProcessorList, StoppingCriteria, StoppingCriteriaList
 
-def run_inference(model, tokenizer, prompt: list[dict], settings) -> str:
+from app.constants import ASSISTANT_PREFIX
+
+
+class GenerationResult:
+    def __init__(self, text: str, prompt_tokens: int, output_tokens: int,
+                 elapsed_seconds: float, truncated: bool = False, state=None,
+                 logprobs: Optional[list[float]] = None, token_offsets: Optional[list[int]] = None):
+        self.text = text
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+        self.elapsed_seconds = elapsed_seconds
+        # Stopped by the token budget rather than EOS or the deadline.
+        self.truncated = truncated
+        # (sequences, past_key_values, prompt_length, prefill) of a truncated
+        # generation, so continue_inference can resume without re-encoding.
+        self.state = state
+        # With logprobs on: the log-probability of each generated token, and
+        # token boundaries in `text` (token i is text[offsets[i]:offsets[i+1]]).
+        self.logprobs = logprobs
+        self.token_offsets = token_offsets
+
+    def release(self) -> None:
+        """Drop the KV cache held for continuation."""
+        self.state = None
+
+
+class DeadlineCriteria(StoppingCriteria):
+    """Stop decoding once the caller's deadline (time.monotonic()) has passed.
+    Nobody is waiting for the rest of the output."""
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return time.monotonic() >= self.deadline
+
+
+class CancelCriteria(StoppingCriteria):
+    """Stop decoding once `event` (a threading.Event) is set: the caller gave
+    up, e.g. the shutdown grace period ended, and the GPU is needed elsewhere."""
+
+    def __init__(self, event):
+        self.event = event
+
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self.event.is_set()
+
+
+def stopping_criteria(deadline: Optional[float], cancel=None) -> Optional[StoppingCriteriaList]:
+    criteria = []
+    if deadline is not None:
+        criteria.append(DeadlineCriteria(deadline))
+    if cancel is not None:
+        criteria.append(CancelCriteria(cancel))
+    return StoppingCriteriaList(criteria) if criteria else None
 
-    model_inputs = tokenizer.apply_chat_template(
-        prompt, tokenize=False, add_generation_prompt=True
-    )
+
+class TokenLogprobs(LogitsProcessor):
+    """
+    Records the log-probability of each sampled token from the logits
+    generate() already computes, so no second forward pass is needed.
+
+    A processor runs before sampling, so step t keeps its log-softmax and
+    step t+1 looks up the token that was drawn from it. Only one vocab-sized
+    row is held at a time, not one per step (as output_scores would). Runs
+    before temperature is applied, so these are the model's own
+    probabilities. Batch size 1.
+    """
+
+    def __init__(self):
+        self._previous = None
+        self._picked: list[torch.Tensor] = []
+
+    def __call__(self, input_ids, scores):
+        if self._previous is not None:
+            self._picked.append(self._previous[input_ids[0, -1]])
+        self._previous = torch.log_softmax(scores[0].float(), dim=-1)
+        return scores
+
+    def finish(self, sequences) -> list[float]:
+        """Per-token logprobs once generation is done (one sync)."""
+        if self._previous is not None:
+            self._picked.append(self._previous[sequences[0, -1]])
+            self._previous = None
+        return torch.stack(self._picked).tolist() if self._picked else []
+
+
+def render_prompt(tokenizer, prompt: list[dict], settings) -> tuple[str, str]:
+    """Chat-template the prompt and seed the assistant turn with the OCSF
+    header. Returns (text to encode, prefill to put back in front of the
+    decoded output). The prefill is appended to the rendered string rather
+    than passed as an assistant message because chat templates may trim
+    its trailing newline."""
+    text = tokenizer.apply_chat_template(prompt, tokenize=False, add_generation_prompt=True)
+    prefill = ASSISTANT_PREFIX if settings.assistant_prefill else ""
+    return text + prefill, prefill
+
+
+def run_inference(model, tokenizer, prompt: list[dict], settings,
+                  deadline: Optional[float] = None, cache_pool=None,
+                  logprobs: bool = False, cancel=None) -> GenerationResult:
+
+    model_inputs, prefill = render_prompt(tokenizer, prompt, settings)
 
     inputs = tokenizer(model_inputs, return_tensors="pt", add_special_tokens=False)
 
+    input_length = inputs["input_ids"].shape[1]
+    max_new_tokens = settings.max_new_tokens
+
+    criteria = stopping_criteria(deadline, cancel)
+
+    # Static cache path: reuse a preallocated cache and the compiled forward
+    # when a bucket holds the prompt and the whole output budget; otherwise
+    # plain dynamic generation.
+    bucket = cache_pool.bucket_for(input_length, max_new_tokens) if cache_pool is not None else None
+    cache_kwargs = {}
+    if bucket is not None:
+        inputs = cache_pool.pad_to_bucket(inputs, bucket, tokenizer.pad_token_id)
+        cache_kwargs = {"past_key_values": cache_pool.cache_for(bucket), "disable_compile": True}
+
     inputs = {k: v.to(model.device) for k, v in inputs.items()}
+    padded_length = inputs["input_ids"].shape[1]
 
-    input_length = inputs["input_ids"].shape[1]
+    recorder = TokenLogprobs() if logprobs else None
 
+    start = time.monotonic()
+    with torch.no_grad(), (cache_pool.compiled() if bucket is not None else nullcontext()):
+        output = model.generate(
+            **inputs,
+            do_sample=True,
+            temperature=settings.temperature,
+            max_new_tokens=max_new_tokens,
+            pad_token_id=tokenizer.eos_token_id,
+            stopping_criteria=criteria,
+            logits_processor=LogitsProcessorList([recorder]) if recorder else None,
+            return_dict_in_generate=True,
+            **cache_kwargs,
+        )
+
+
+    new_tokens = output.sequences[0][padded_length:]
+    truncated = _hit_budget(new_tokens, max_new_tokens, tokenizer)
+
+    # A pooled static cache is sized to its bucket and reused by the next
+    # request, so only a dynamic cache is kept for continuation.
+    state = None
+    if truncated and bucket is None:
+        state = (output.sequences, output.past_key_values, padded_length, prefill)
+
+    result = GenerationResult(
+        text=prefill + tokenizer.decode(new_tokens, skip_special_tokens=True),
+        prompt_tokens=input_length,
+        output_tokens=len(new_tokens),
+        elapsed_seconds=time.monotonic() - start,
+        truncated=truncated,
+        state=state,
+    )
+    if recorder is not None:
+        result.logprobs = recorder.finish(output.sequences)
+        result.token_offsets = token_offsets(tokenizer, new_tokens, len(prefill))
+    return result
+
+
+def continue_inference(model, tokenizer, result: GenerationResult, settings,
+                       max_new_tokens: int, deadline: Optional[float] = None,
+                       cancel=None) -> GenerationResult:
+    """
+    Resume a truncated generation for up to max_new_tokens more tokens.
+
+    The cache already holds every position but the last sampled token, so
+    generate() only runs that token through the model before decoding on;
+    the prompt is not re-encoded. The returned result covers the whole
+    output (first part + continuation) and consumes `result.state`.
+    """
+    sequences, past_key_values, prompt_length, prefill = result.state
+    result.release()
+
+    criteria = stopping_criteria(deadline, cancel)
+
+    recorder = TokenLogprobs() if result.logprobs is not None else None
 
+    start = time.monotonic()
     with torch.no_grad():
-        output_ids = model.generate(
-            **inputs,
+        output = model.generate(
+            input_ids=sequences,
+            attention_mask=torch.ones_like(sequences),
+            past_key_values=past_key_values,
             do_sample=True,
             temperature=settings.temperature,
-            max_new_tokens=settings.max_new_tokens,
+            max_new_tokens=max_new_tokens,
             pad_token_id=tokenizer.eos_token_id,
+            stopping_criteria=criteria,
+            logits_processor=LogitsProcessorList([recorder]) if recorder else None,
+            return_dict_in_generate=True,
         )
 
+    continuation = output.sequences[0][sequences.shape[1]:]
+    truncated = _hit_budget(continuation, max_new_tokens, tokenizer)
+    # Decode from the prompt end so a character split across the two
+    # generations is decoded whole.
+    all_new = output.sequences[0][prompt_length:]
+
+    resumed = GenerationResult(
+        text=prefill + tokenizer.decode(all_new, skip_special_tokens=True),
+        prompt_tokens=result.prompt_tokens,
+        output_tokens=len(all_new),
+        elapsed_seconds=time.monotonic() - start,
+        truncated=truncated,
+        state=(output.sequences, output.past_key_values, prompt_length, prefill) if truncated else None,
+    )
+    if recorder is not None:
+        resumed.logprobs = result.logprobs + recorder.finish(output.sequences)
+        resumed.token_offsets = token_offsets(tokenizer, all_new, len(prefill))
+    return resumed
+
+
+def token_offsets(tokenizer, token_ids, offset: int = 0) -> list[int]:
+    """
+    Token boundaries in the decoded text: `offset`, then where each token
+    ends.
+
+    Tokens are decoded one by one. A character split over two byte-level
+    tokens decodes as a replacement character per piece, so offsets can
+    drift by a character after non-ASCII output; OCSF output is mostly
+    ASCII.
+    """
+    offsets, position = [offset], offset
+    for piece in tokenizer.batch_decode([[int(t)] for t in token_ids], skip_special_tokens=True):
+        position += len(piece)
+        offsets.append(position)
+    return offsets
+
+
+def _hit_budget(new_tokens, max_new_tokens: int, tokenizer) -> bool:
+    return len(new_tokens) >= max_new_tokens and int(new_tokens[-1]) != tokenizer.eos_token_id
+
+
+def run_inference_batch(model, tokenizer, prompts: list[list[dict]], settings,
+                        deadline: Optional[float] = None, cancel=None) -> list[GenerationResult]:
+    """
+    Generate for many prompts with as little padding as possible.
+
+    Prompts are sorted by token length and cut into micro-batches of
+    `settings.generation_batch_size`, so each batch holds prompts of similar
+    length. Results come back in the original order.
+    """
+    rendered = [render_prompt(tokenizer, p, settings) for p in prompts]
+    encoded = [tokenizer(text, add_special_tokens=False)["input_ids"] for text, _ in rendered]
+    order = sorted(range(len(encoded)), key=lambda i: len(encoded[i]))
+
+    criteria = stopping_criteria(deadline, cancel)
+
+    results: list[Optional[GenerationResult]] = [None] * len(prompts)
+    batch_size = max(1, settings.generation_batch_size)
+
+    for offset in range(0, len(order), batch_size):
+        chunk = order[offset:offset + batch_size]
+        # Decoder-only models need left padding so every row ends at the
+        # same position and generation continues from the real last token.
+        inputs = tokenizer.pad(
+            {"input_ids": [encoded[i] for i in chunk]},
+            padding=True, padding_side="left", return_tensors="pt",
+        )
+        inputs = {k: v.to(model.device) for k, v in inputs.items()}
+        padded_length = inputs["input_ids"].shape[1]
 
-    new_tokens = output_ids[0][input_length:]
+        start = time.monotonic()
+        with torch.no_grad():
+            output_ids = model.generate(
+                **inputs,
+                do_sample=True,
+                temperature=settings.temperature,
+                max_new_tokens=settings.max_new_tokens,
+                pad_token_id=tokenizer.eos_token_id,
+                stopping_criteria=criteria,
+            )
+        elapsed = time.monotonic() - start
 
+        for row, i in enumerate(chunk):
+            new_tokens = output_ids[row][padded_length:]
+            output_tokens = int((new_tokens != tokenizer.eos_token_id).sum())
+            results[i] = GenerationResult(
+                text=rendered[i][1] + tokenizer.decode(new_tokens, skip_special_tokens=True),
+                prompt_tokens=len(encoded[i]),
+                output_tokens=output_tokens,
+                elapsed_seconds=elapsed,
+            )
 
-    return tokenizer.decode(new_tokens, skip_special_tokens=True)
\ No newline at end of file
+    return results
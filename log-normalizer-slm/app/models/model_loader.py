@@ -1,33 +1,67 @@
+"""
+Owns the model and tokenizer.
+
+torch, transformers and peft are imported inside load(), which runs in a
+background thread after the server is up. Importing this module (and so
+the whole HTTP layer) stays cheap: /health and /validate answer while
+the ML stack is still loading.
+"""
+
 import os
-import torch
-from transformers import AutoTokenizer, AutoModelForCausalLM, BitsAndBytesConfig
-from peft import PeftModel
+import time
 from pathlib import Path
 
 from typing import Optional
-from app.models.inference import run_inference
+from app.scheduler.capacity import Ewma
 from app.config import settings
 
 import logging
 logger = logging.getLogger(__name__)
 
+def precision_kwargs(quantization: str, compute_dtype: str, double_quant: bool = True,
+                     attn_implementation: Optional[str] = None) -> dict:
+    """from_pretrained() kwargs for a quantization / compute dtype / attention
+    combination. Unquantized weights are loaded directly in compute_dtype."""
+    import torch
+    from transformers import BitsAndBytesConfig
+
+    dtype = getattr(torch, compute_dtype)
+    kwargs = {}
+    if quantization == "none":
+        kwargs["torch_dtype"] = dtype
+    elif quantization == "8bit":
+        kwargs["quantization_config"] = BitsAndBytesConfig(load_in_8bit=True)
+        kwargs["torch_dtype"] = dtype
+    else:
+        kwargs["quantization_config"] = BitsAndBytesConfig(
+            load_in_4bit=True,
+            bnb_4bit_quant_type=quantization.split("-", 1)[1],
+            bnb_4bit_compute_dtype=dtype,
+            bnb_4bit_use_double_quant=double_quant,
+        )
+    if attn_implementation:
+        kwargs["attn_implementation"] = attn_implementation
+    return kwargs
+
+
 class ModelManager: 
     def __init__(self):
         self.model = None
         self.tokenizer = None
         self.is_ready = False
         self.load_error: Optional[str] = None
+        self.tokens_per_second = Ewma()
+        self.cache_pool = None
 
     def load(self):
 
         path = settings.base_model_path
         try: 
             logger.info(f"Loading model from {path}...")
-            
-            quantization_config = BitsAndBytesConfig(
-            load_in_4bit=True,
-            bnb_4bit_compute_dtype=torch.float16
-            )
+
+            import torch
+            from transformers import AutoTokenizer, AutoModelForCausalLM
+            from peft import PeftModel
 
             tokenizer = AutoTokenizer.from_pretrained(path)
             tokenizer.pad_token = tokenizer.eos_token
@@ -36,13 +70,16 @@ class ModelManager:
 
             model = AutoModelForCausalLM.from_pretrained(
             path,
-            quantization_config=quantization_config,
             device_map=settings.device,
             trust_remote_code=True,
+            **precision_kwargs(settings.quantization, settings.compute_dtype,
+                               settings.double_quant, settings.attn_implementation),
             )
             self.model = model
 
-            logger.info(f"Model loaded on {self.model.device}")
+            logger.info(f"Model loaded on {self.model.device} "
+                        f"({settings.quantization}, {settings.compute_dtype}, "
+                        f"attn={settings.attn_implementation or 'default'})")
             
             path = Path(__file__).parent / settings.adapter_path
             has_adapter = os.path.exists(os.path.join(path, "adapter_config.json"))
@@ -53,6 +90,14 @@ class ModelManager:
                 logger.info(f"LoRA adapter loaded from {path}")
             
 
+            if settings.static_cache and settings.static_cache_buckets:
+                from app.models.static_cache import StaticCachePool
+
+                buckets = [(p, settings.max_new_tokens) for p in settings.static_cache_buckets]
+                self.cache_pool = StaticCachePool(self.model, buckets, settings.compile_mode)
+                self.cache_pool.warmup(self.tokenizer)
+                logger.info("Static cache ready: %s", self.cache_pool.buckets)
+
             torch.cuda.empty_cache()
             self.is_ready = True
             logger.info("Model ready for inference")
@@ -62,7 +107,7 @@ class ModelManager:
             self.load_error = f"Model not found at {path}"
         except RuntimeError as err:
             if "CUDA out of memory" in str(err):
-                self.load_error = "GPU OOM. Try load_in_8bit=True or use smaller model."
+                self.load_error = "GPU OOM. Try quantization=4bit-nf4 or use smaller model."
             else:
                 self.load_error = f"Runtime error: {str(err)}"
         except Exception as err:
@@ -74,11 +119,52 @@ class ModelManager:
 
 
 
-    def generate(self, prompt: list[dict]): 
+    def generate(self, prompt: list[dict], deadline: Optional[float] = None, cancel=None):
+        """GenerationResult for one prompt. If it is `truncated`, it holds
+        the KV cache for continue_generation() until released. Decoding
+        stops early at `deadline` or once the `cancel` event is set."""
         if not self.is_ready: 
             raise RuntimeError("Model not loaded")
         
-        return run_inference(self.model, self.tokenizer, prompt, settings)
+        from app.models.inference import run_inference
+
+        result = run_inference(self.model, self.tokenizer, prompt, settings,
+                               deadline=deadline, cache_pool=self.cache_pool,
+                               logprobs=settings.token_logprobs, cancel=cancel)
+        self._record_throughput(result)
+        return result
+
+    def continue_generation(self, result, deadline: Optional[float] = None, cancel=None):
+        """Resume a truncated GenerationResult with settings.continuation_tokens more tokens."""
+        from app.models.inference import continue_inference
+
+        generated_before = result.output_tokens
+        result = continue_inference(self.model, self.tokenizer, result, settings,
+                                    settings.continuation_tokens, deadline=deadline, cancel=cancel)
+        self._record_throughput(result, result.output_tokens - generated_before)
+        return result
+
+    def _record_throughput(self, result, output_tokens: Optional[int] = None) -> None:
+        output_tokens = result.output_tokens if output_tokens is None else output_tokens
+        if result.elapsed_seconds > 0 and output_tokens:
+            self.tokens_per_second.observe(output_tokens / result.elapsed_seconds)
+
+    def generate_batch(self, prompts: list[list[dict]], deadline: Optional[float] = None,
+                       cancel=None) -> list[str]:
+        if not self.is_ready:
+            raise RuntimeError("Model not loaded")
+
+        from app.models.inference import run_inference_batch
+
+        start = time.monotonic()
+        results = run_inference_batch(self.model, self.tokenizer, prompts, settings,
+                                      deadline=deadline, cancel=cancel)
+        elapsed = time.monotonic() - start
+        output_tokens = sum(r.output_tokens for r in results)
+        if elapsed > 0 and output_tokens:
+            self.tokens_per_second.observe(output_tokens / elapsed)
+
+        return [r.text for r in results]
 
 
 
@@ -0,0 +1,98 @@
+"""
+Static KV cache + compiled forward for steady-state single-request decoding.
+
+With the default dynamic cache every generate() call grows its KV tensors
+token by token and runs the decode loop in eager mode. Here a fixed set of
+(prompt_len, output_len) buckets each get one preallocated StaticCache that
+is reset and reused across requests. Prompts are left-padded up to their
+bucket, so the compiled forward always sees the same shapes per bucket and
+never recompiles after warmup.
+
+Works on CUDA and CPU. On CUDA the default compile mode is
+"reduce-overhead" (CUDA graphs); on CPU it is "default".
+
+Only the single-request path uses this. Batched generation, and requests
+no bucket holds both the prompt and the output budget of, fall back to
+the dynamic cache in eager mode.
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Optional
+
+import torch
+from transformers import StaticCache
+
+from app.models.buckets import Bucket, select_bucket
+
+logger = logging.getLogger(__name__)
+
+
+class StaticCachePool:
+
+    def __init__(self, model, buckets: list[tuple[int, int]], compile_mode: Optional[str] = None):
+        self.model = model
+        self.buckets = [Bucket(p, o) for p, o in sorted(buckets)]
+        self._caches: dict[tuple[int, int], StaticCache] = {}
+
+        # LoRA layers are injected into the base model's modules, so compiling
+        # the base forward covers the adapter too.
+        self._target = model.get_base_model() if hasattr(model, "get_base_model") else model
+        self._eager_forward = self._target.forward
+        if compile_mode is None:
+            compile_mode = "reduce-overhead" if model.device.type == "cuda" else "default"
+        self._compiled_forward = torch.compile(self._eager_forward, mode=compile_mode, dynamic=False)
+
+    def bucket_for(self, prompt_len: int, output_len: int) -> Optional[Bucket]:
+        return select_bucket(self.buckets, prompt_len, output_len)
+
+    def cache_for(self, bucket: Bucket) -> StaticCache:
+        key = (bucket.prompt_len, bucket.output_len)
+        cache = self._caches.get(key)
+        if cache is None:
+            cache = StaticCache(config=self.model.config, max_cache_len=bucket.prompt_len + bucket.output_len)
+            self._caches[key] = cache
+        else:
+            cache.reset()
+        return cache
+
+    def pad_to_bucket(self, inputs: dict, bucket: Bucket, pad_token_id: int) -> dict:
+        """Left-pad input_ids/attention_mask to exactly bucket.prompt_len."""
+        pad = bucket.prompt_len - inputs["input_ids"].shape[1]
+        if pad <= 0:
+            return inputs
+        ids = inputs["input_ids"]
+        mask = inputs.get("attention_mask", torch.ones_like(ids))
+        return {
+            "input_ids": torch.cat([ids.new_full((ids.shape[0], pad), pad_token_id), ids], dim=1),
+            "attention_mask": torch.cat([mask.new_zeros((mask.shape[0], pad)), mask], dim=1),
+        }
+
+    @contextmanager
+    def compiled(self):
+        """Swap in the compiled forward for the duration of one generate().
+        Generation is serialized by the scheduler, so the swap is not shared."""
+        self._target.forward = self._compiled_forward
+        try:
+            yield
+        finally:
+            self._target.forward = self._eager_forward
+
+    def warmup(self, tokenizer) -> None:
+        """Compile every bucket up front so the first real request per bucket
+        doesn't pay for tracing."""
+        pad_id = tokenizer.pad_token_id if tokenizer.pad_token_id is not None else tokenizer.eos_token_id
+        for bucket in self.buckets:
+            ids = torch.full((1, bucket.prompt_len), pad_id, dtype=torch.long, device=self.model.device)
+            mask = torch.ones_like(ids)
+            logger.info("Warming up static cache %s", bucket)
+            with torch.no_grad(), self.compiled():
+                self.model.generate(
+                    input_ids=ids,
+                    attention_mask=mask,
+                    past_key_values=self.cache_for(bucket),
+                    max_new_tokens=4,
+                    do_sample=False,
+                    pad_token_id=tokenizer.eos_token_id,
+                    disable_compile=True,
+                )
@@ -0,0 +1,132 @@
+"""
+The normalize pipeline: prompt -> generate -> extract -> validate -> score.
+
+generate_output() is the part that needs the model; the engine runs it
+through the scheduler. postprocess() is the part that doesn't, and runs
+wherever the request came in (app.engine.gateway), so with a separate
+inference engine process the HTTP workers do it.
+"""
+
+import time
+import logging
+from typing import Optional
+
+from app.config import settings
+from app.models.model_loader import model_manager
+from app.utils.ocsf_parser import parse_output
+from app.scoring.confidence import compute_confidence
+from app.scoring.token_confidence import leaf_logprobs
+from app.ocsf.validator import validate_ocsf
+from app.schemas.request import NormalizeRequest
+from app.schemas.response import NormalizeResponse
+
+logger = logging.getLogger(__name__)
+
+
+def generate_output(prompt: list[dict], deadline: Optional[float] = None, cancel=None) -> dict:
+    """
+    Generate, continue a truncated output, and return what postprocess()
+    needs as plain values (text, logprobs, token_offsets) that can be
+    sent from the engine process to an HTTP worker, plus prompt_tokens and
+    output_tokens for the scheduler's cost model. Setting the `cancel` event (a
+    threading.Event) stops generation at the next token.
+    """
+    generation = model_manager.generate(prompt, deadline=deadline, cancel=cancel)
+    try:
+        generation = _continue_truncated(generation, deadline, cancel)
+        return {
+            "text": generation.text,
+            "logprobs": generation.logprobs,
+            "token_offsets": generation.token_offsets,
+            "prompt_tokens": generation.prompt_tokens,
+            "output_tokens": generation.output_tokens,
+        }
+    finally:
+        generation.release()
+
+
+def _continue_truncated(generation, deadline: Optional[float], cancel=None):
+    """Resume generation that ran out of tokens while the object was still
+    open. Output that already holds a complete object is left alone."""
+    for _ in range(settings.max_continuations):
+        if settings.continuation_tokens <= 0 or generation.state is None:
+            break
+        parsed = parse_output(generation.text)
+        if parsed is not None and not parsed.repaired:
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        if cancel is not None and cancel.is_set():
+            break
+        logger.info("Output truncated at %d tokens, continuing for up to %d more",
+                    generation.output_tokens, settings.continuation_tokens)
+        generation = model_manager.continue_generation(generation, deadline=deadline, cancel=cancel)
+    return generation
+
+
+def postprocess_batch(reqs: list[NormalizeRequest], raw_outputs: list[str],
+                      start_time: float) -> list[NormalizeResponse]:
+    results = []
+    for req, raw_output in zip(reqs, raw_outputs):
+        try:
+            results.append(postprocess(req, raw_output, start_time))
+        except Exception as err:
+            results.append(error_response(err, start_time))
+    return results
+
+
+def postprocess(req: NormalizeRequest, raw_output: str, start_time: float,
+                logprobs: Optional[list[float]] = None,
+                token_offsets: Optional[list[int]] = None) -> NormalizeResponse:
+    """Extract, validate and score one model output. CPU only."""
+    parsed = parse_output(raw_output)
+    ocsf = parsed.data if parsed and isinstance(parsed.data, dict) else None
+
+    if ocsf is None:
+        processing_time_ms = int((time.time() - start_time) * 1000)
+        return NormalizeResponse(
+            ocsf=ocsf,
+            decision="reject",
+            confidence=0.0,
+            processing_time_ms=processing_time_ms,
+            error="JSON extraction failed",
+        )
+
+    validation = validate_ocsf(ocsf, source=req.source)
+    clean_ocsf = validation.cleaned if validation.valid else ocsf
+
+    raw = req.raw
+    result = compute_confidence(
+        raw.data, clean_ocsf, req.source,
+        validation_errors=validation.errors,
+        validation_warnings=validation.warnings,
+        repaired=parsed.repaired,
+        leaf_logprobs=leaf_logprobs(raw_output, token_offsets, logprobs) if logprobs is not None else None,
+    )
+    processing_time_ms = int((time.time() - start_time) * 1000)
+
+    logger.info(
+        "source=%s confidence=%.3f decision=%s repaired=%s time_ms=%d",
+        req.source, result.score, result.decision, parsed.repaired, processing_time_ms,
+    )
+
+    return NormalizeResponse(
+        ocsf=clean_ocsf,
+        decision=result.decision,
+        confidence=result.score,
+        processing_time_ms=processing_time_ms,
+        breakdown=result.breakdown,
+        validation_errors=result.validation_errors if result.validation_errors else None,
+    )
+
+
+def error_response(err: Exception, start_time: float) -> NormalizeResponse:
+    processing_time_ms = int((time.time() - start_time) * 1000)
+    logger.error("Normalize error: %s", err, exc_info=True)
+    return NormalizeResponse(
+        ocsf=None,
+        decision="reject",
+        confidence=0.0,
+        processing_time_ms=processing_time_ms,
+        error=str(err),
+    )
@@ -0,0 +1,153 @@
+"""
+validate_ocsf for many objects at once, behind a result cache.
+
+The review UI re-validates the same corrected payloads over and over, so
+results are kept in an LRU keyed on the SHA-256 of the object's canonical
+JSON (sorted keys, compact): the same object with its keys in a different
+order hits the same entry. Only valid/errors/warnings are cached, not the
+cleaned dict.
+
+Misses are deduplicated within the call. Enough of them are fanned out
+over a process pool, since validation is CPU-bound Python and threads
+would share one GIL; a handful are validated inline, where pickling to a
+worker would cost more than it saves.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Optional
+
+import orjson
+
+from app.config import settings
+from app.ocsf.validator import validate_ocsf
+
+logger = logging.getLogger(__name__)
+
+# Fewer misses than this are validated in the calling thread.
+_POOL_MIN_ITEMS = 8
+
+
+class ValidationCache:
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[bytes, tuple] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(ocsf: Any) -> bytes:
+        return hashlib.sha256(orjson.dumps(ocsf, option=orjson.OPT_SORT_KEYS)).digest()
+
+    def get(self, key: bytes) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: bytes, entry: tuple) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def validate_cached(ocsf: Any) -> dict:
+    """One object through the cache: {"valid", "errors", "warnings"}."""
+    return validate_many([ocsf])[0]
+
+
+def validate_many(objects: list[Any]) -> list[dict]:
+    """{"valid", "errors", "warnings"} per object, in order."""
+    keys: list[Optional[bytes]] = []
+    entries: dict[bytes, tuple] = {}
+    missing: dict[bytes, Any] = {}
+    for ocsf in objects:
+        try:
+            key = validation_cache.key(ocsf)
+        except (TypeError, orjson.JSONEncodeError):
+            keys.append(None)  # not JSON-serializable: validate, don't cache
+            continue
+        keys.append(key)
+        if key in entries or key in missing:
+            continue
+        entry = validation_cache.get(key)
+        if entry is None:
+            missing[key] = ocsf
+        else:
+            entries[key] = entry
+
+    if missing:
+        for key, entry in zip(missing, _validate_all(list(missing.values()))):
+            validation_cache.put(key, entry)
+            entries[key] = entry
+
+    results = []
+    for ocsf, key in zip(objects, keys):
+        entry = entries[key] if key is not None else _validate(ocsf)
+        valid, errors, warnings = entry
+        results.append({"valid": valid, "errors": list(errors), "warnings": list(warnings)})
+    return results
+
+
+def shutdown() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _validate(ocsf: Any) -> tuple:
+    result = validate_ocsf(ocsf, source="validate")
+    return result.valid, tuple(result.errors), tuple(result.warnings)
+
+
+def _validate_chunk(objects: list[Any]) -> list[tuple]:
+    return [_validate(ocsf) for ocsf in objects]
+
+
+def _validate_all(objects: list[Any]) -> list[tuple]:
+    workers = settings.validate_workers
+    if workers <= 0 or len(objects) < _POOL_MIN_ITEMS:
+        return _validate_chunk(objects)
+    # One chunk per worker keeps pickling round trips to a minimum.
+    size = -(-len(objects) // workers)
+    chunks = [objects[i:i + size] for i in range(0, len(objects), size)]
+    results = []
+    for chunk_results in _get_pool().map(_validate_chunk, chunks):
+        results.extend(chunk_results)
+    return results
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the API process has threads (and maybe a model).
+            _pool = ProcessPoolExecutor(max_workers=settings.validate_workers,
+                                        mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+# instance to import
+validation_cache = ValidationCache(settings.validate_cache_size)
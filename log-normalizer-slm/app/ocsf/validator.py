@@ -1,18 +1,22 @@
 import logging
-from pydantic import ValidationError
+import types
+import typing
+from pydantic import BaseModel, TypeAdapter, ValidationError
 from app.ocsf.events.detection_finding import DetectionFinding
 
 logger = logging.getLogger(__name__)
 
+# Built once per process. The validated model is dumped straight away and
+# not kept on the result.
+_ADAPTER = TypeAdapter(DetectionFinding)
+
 
 class ValidationResult:
     def __init__(self, valid: bool, errors: list[str] = None,
-                 warnings: list[str] = None, model: DetectionFinding = None,
-                 cleaned: dict = None):
+                 warnings: list[str] = None, cleaned: dict = None):
         self.valid = valid
         self.errors = errors or []
         self.warnings = warnings or []
-        self.model = model
         self.cleaned = cleaned
 
 
@@ -29,19 +33,18 @@ def validate_ocsf(data: dict, source: str = "unknown") -> ValidationResult:
         return ValidationResult(valid=False, errors=[msg])
 
     try:
-        model = DetectionFinding(**data)
-        cleaned = model.model_dump(exclude_none=True)
+        cleaned = _ADAPTER.dump_python(_ADAPTER.validate_python(data), exclude_none=True)
 
-        # Detect what Pydantic stripped
-        warnings = _find_stripped_fields(data, cleaned)
+        # A separate walk over the input, not folded into validation: it
+        # doesn't descend lists and costs about 1% of validate + dump, while
+        # collecting the paths in model wrap validators (one Python call
+        # per model instance, list items included) costs more than it saves.
+        warnings = _find_stripped_fields(data, _FIELDS)
         if warnings:
             logger.info("[%s] Stripped %d extra fields: %s",
                         source, len(warnings), warnings[:5])
 
-        return ValidationResult(
-            valid=True, model=model,
-            cleaned=cleaned, warnings=warnings,
-        )
+        return ValidationResult(valid=True, cleaned=cleaned, warnings=warnings)
 
     except ValidationError as e:
         errors = [f"{err['loc']}: {err['msg']}" for err in e.errors()]
@@ -55,13 +58,54 @@ def validate_ocsf(data: dict, source: str = "unknown") -> ValidationResult:
         return ValidationResult(valid=False, errors=[msg])
 
 
-def _find_stripped_fields(original: dict, cleaned: dict, prefix: str = "") -> list[str]:
-    """Recursively finds fields in original that aren't in cleaned output."""
+def _find_stripped_fields(data: dict, fields: dict, prefix: str = "") -> list[str]:
+    """
+    Paths in data that the cleaned output won't have: keys the model doesn't
+    declare (extra="ignore") and None values (exclude_none).
+
+    Checked against the field tables rather than by diffing against the
+    dumped output. Descends into nested objects but not into lists of them,
+    where a stray key would be reported once per item.
+    """
     stripped = []
-    for key in original:
-        path = f"{prefix}.{key}" if prefix else key
-        if key not in cleaned:
-            stripped.append(path)
-        elif isinstance(original[key], dict) and isinstance(cleaned.get(key), dict):
-            stripped.extend(_find_stripped_fields(original[key], cleaned[key], path))
-    return stripped
\ No newline at end of file
+    for key, value in data.items():
+        if value is None or key not in fields:
+            stripped.append(prefix + key)
+            continue
+        nested = fields[key]
+        if nested is not None and type(value) is dict:
+            stripped.extend(_find_stripped_fields(value, nested, f"{prefix}{key}."))
+    return stripped
+
+
+def _field_table(model: type[BaseModel], tables: dict | None = None) -> dict:
+    """
+    Accepted input keys of a model -> the nested model's table for fields
+    holding a single object, None for everything else. Tables are shared
+    per model, so recursive models (Process.parent_process) refer back.
+    """
+    tables = {} if tables is None else tables
+    if model in tables:
+        return tables[model]
+    table = tables[model] = {}
+    by_name = model.model_config.get("populate_by_name", False)
+    for name, field in model.model_fields.items():
+        nested = _nested_model(field.annotation)
+        value = _field_table(nested, tables) if nested else None
+        table[field.alias or name] = value
+        if by_name:
+            table[name] = value
+    return table
+
+
+def _nested_model(annotation) -> type[BaseModel] | None:
+    """The model class behind `Model` or `Optional[Model]`, else None."""
+    if typing.get_origin(annotation) in (typing.Union, types.UnionType):
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        annotation = args[0] if len(args) == 1 else None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+_FIELDS = _field_table(DetectionFinding)
@@ -0,0 +1,29 @@
+"""
+Throughput measurement used for backpressure.
+
+Exponentially weighted moving averages so the estimates follow the current
+load (prompt sizes drift with whatever vendor is flooding us) without
+keeping per-request history.
+"""
+
+import math
+import threading
+from typing import Optional
+
+
+class Ewma:
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.value: Optional[float] = None
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, x: float) -> None:
+        with self._lock:
+            self.value = x if self.value is None else self.alpha * x + (1 - self.alpha) * self.value
+            self.count += 1
+
+
+def retry_after_seconds(estimated_wait: float) -> int:
+    """Retry-After is whole seconds; never tell a caller to retry immediately."""
+    return max(1, math.ceil(estimated_wait))
@@ -0,0 +1,63 @@
+"""
+What a request will cost the GPU, estimated before it is queued.
+
+Cost is in generated-token equivalents: the output length predicted for
+the source (a running average of what its alerts actually produced) plus
+the prompt tokens at prompt_token_cost each, since prefill processes the
+prompt in parallel and is far cheaper per token than decoding. The
+scheduler turns this into seconds with its measured seconds per unit.
+
+Prompt tokens are estimated from the prompt's length in characters, not
+by tokenizing: that would run on the event loop for every request, and
+generation tokenizes the prompt anyway. The characters per token are
+calibrated from the token counts generation reports.
+"""
+
+import threading
+
+from app.config import settings
+from app.scheduler.capacity import Ewma
+
+# Used until a generation has reported its prompt's token count.
+_CHARS_PER_TOKEN = 4
+
+
+class CostModel:
+
+    def __init__(self, default_output_tokens: int, prompt_token_cost: float):
+        self.default_output_tokens = default_output_tokens
+        self.prompt_token_cost = prompt_token_cost
+        self._output_tokens: dict[str, Ewma] = {}
+        self.chars_per_token = Ewma()
+        self._lock = threading.Lock()
+
+    def prompt_tokens(self, prompt: list[dict]) -> int:
+        return int(prompt_chars(prompt) / (self.chars_per_token.value or _CHARS_PER_TOKEN))
+
+    def output_tokens(self, source: str) -> float:
+        observed = self._output_tokens.get(source)
+        if observed is None or observed.value is None:
+            return self.default_output_tokens
+        return observed.value
+
+    def estimate(self, prompt_tokens: int, source: str) -> float:
+        return self.output_tokens(source) + self.prompt_token_cost * prompt_tokens
+
+    def observe(self, source: str, output_tokens: int, prompt_chars: int = 0, prompt_tokens: int = 0) -> None:
+        with self._lock:
+            observed = self._output_tokens.setdefault(source, Ewma())
+        observed.observe(output_tokens)
+        if prompt_chars and prompt_tokens:
+            self.chars_per_token.observe(prompt_chars / prompt_tokens)
+
+    def snapshot(self) -> dict:
+        return {source: round(ewma.value, 1) for source, ewma in self._output_tokens.items()
+                if ewma.value is not None}
+
+
+def prompt_chars(prompt: list[dict]) -> int:
+    return sum(len(message["content"]) for message in prompt)
+
+
+# instance to import
+cost_model = CostModel(settings.default_output_tokens, settings.prompt_token_cost)
@@ -0,0 +1,79 @@
+"""
+Scheduling priority of a request, from the raw alert, before inference.
+
+The vendor severity is looked up where each vendor keeps it and mapped to
+an OCSF severity_id (1 Informational .. 5 Critical) with the same mappers
+the labeler uses, so the priority agrees with the severity the model is
+trained to produce. It is a dict lookup, not a parse of the alert: the
+raw log is already parsed once per request (RawLog) and scoring reuses it.
+
+Alerts whose severity can't be found are scheduled as Medium: the model
+may well find a Critical in them, so they shouldn't sink to the bottom.
+A request can pin its priority (0-5) instead.
+"""
+
+from typing import Any, Callable, Optional
+
+from app.config import settings
+from app.schemas.request import NormalizeRequest
+from data.labeling.utils.severity import (
+    map_crowdstrike_severity, map_logrhythm_severity, map_string_severity,
+)
+
+# Priority of an alert without a recognizable severity, and of every
+# request when severity_priority is off.
+UNKNOWN_PRIORITY = 3
+
+_Extractor = tuple[Callable[[Any], tuple], tuple[tuple[str, ...], ...]]
+
+_STRING_SEVERITY: _Extractor = (map_string_severity, (("severity",),))
+
+# Keyed on the source with hyphens and underscores removed, so "palo-alto",
+# "palo_alto" and "paloalto" all match.
+_EXTRACTORS: dict[str, _Extractor] = {
+    "crowdstrike": (map_crowdstrike_severity, (("severity",),)),
+    "splunk": (map_string_severity, (("urgency",), ("severity",))),
+    "paloalto": _STRING_SEVERITY,
+    "microsoft": _STRING_SEVERITY,
+    "microsoftdefender": _STRING_SEVERITY,
+    "defender": _STRING_SEVERITY,
+    "sentinel": (map_string_severity, (("properties", "severity"),)),
+    "trendmicro": _STRING_SEVERITY,
+    "expel": (map_string_severity, (("attributes", "analyst_severity"),)),
+    "logrhythm": (map_logrhythm_severity, (("alarmDetails", "rbpMax"), ("rbpMax",))),
+}
+
+_FALLBACK: _Extractor = (map_string_severity, (("severity",), ("urgency",), ("priority",)))
+
+
+def estimate_severity(data: dict, source: str) -> int:
+    """OCSF severity_id 1-5 found in the alert, or 0 if there is none."""
+    alert = data.get("alert", data)
+    if not isinstance(alert, dict):
+        return 0
+    mapper, paths = _EXTRACTORS.get(source.replace("-", "").replace("_", ""), _FALLBACK)
+    for path in paths:
+        value = _lookup(alert, path)
+        if value is None:
+            continue
+        severity_id, _ = mapper(value)
+        if 1 <= severity_id <= 5:
+            return severity_id
+    return 0
+
+
+def request_priority(req: NormalizeRequest) -> int:
+    """Pinned priority if the request has one, else the estimated severity."""
+    if req.priority is not None:
+        return req.priority
+    if not settings.severity_priority:
+        return UNKNOWN_PRIORITY
+    return estimate_severity(req.raw.data, req.source) or UNKNOWN_PRIORITY
+
+
+def _lookup(data: dict, path: tuple[str, ...]) -> Optional[Any]:
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
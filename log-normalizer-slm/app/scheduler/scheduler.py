@@ -0,0 +1,393 @@
+"""
+Inference scheduler.
+
+Every call that needs the GPU goes through here. Each source has its own
+queue, and the queues share the GPU by weighted fair queuing: a source
+with weight 2 gets twice the GPU time of a source with weight 1 while
+both have work waiting, and a storm from one vendor only delays its own
+alerts, whatever their severity.
+
+Jobs have a priority (the alert's estimated severity,
+app.scheduler.priority), applied within a source's queue: a source's
+Critical alert never waits behind its own Informational ones. Only
+deadlines bound how long its low priorities wait under a sustained run
+of high ones.
+
+Jobs carry an estimated cost (app.scheduler.cost), converted to seconds
+with the measured seconds per unit of cost. Within a queue, short jobs go
+first with aging: a job is due to start by its arrival time plus
+aging_factor times its estimated run time, or by its deadline if that is
+earlier, and the job due first runs first. Since nothing arriving later
+can be due before it arrived, a long job waits at most aging_factor times
+its own run time for shorter ones. Jobs without a cost are assumed to take
+the average job time. A job whose deadline has already passed when it
+reaches the front of its queue is dropped instead of being sent to the
+model.
+
+Oversized jobs (very long alerts) wait in a lane of their own with its
+own depth bound and a small fair share, so they neither fill the queue
+nor hold up the alerts behind them for long.
+
+The queue is bounded in total. When it is full, a job from a source using
+more than its share pushes out the newest job of the longest queue
+(relative to weight); otherwise submit() raises QueueFull with an estimate
+of how long the current backlog will take to clear.
+
+No background task is needed: the queue is drained from the submitting
+coroutine and from the completion callback of the job that just finished.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Optional
+
+from app.config import settings
+from app.scheduler.capacity import Ewma
+
+logger = logging.getLogger(__name__)
+
+
+# Service time assumed before the first job has been measured.
+_INITIAL_JOB_SECONDS = 10.0
+# Seconds per unit of cost (a generated token) assumed until measured.
+_INITIAL_SECONDS_PER_COST = 0.01
+
+# Source of jobs submitted without one, and the queue of oversized jobs.
+# Neither is a valid request source, so a real source can't share them.
+DEFAULT_SOURCE = "(default)"
+OVERSIZED_LANE = "(oversized)"
+
+
+class DeadlineExceeded(Exception):
+    """The caller's deadline passed before a result was available."""
+
+
+class QueueFull(Exception):
+    """Admission refused; `retry_after` is the estimated wait in seconds."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Queue full, retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class Job:
+    def __init__(self, fn: Callable[[], Any], deadline: Optional[float], seq: int,
+                 source: str = DEFAULT_SOURCE, cost: Optional[float] = None,
+                 seconds: float = _INITIAL_JOB_SECONDS, aging_factor: float = 1.0,
+                 priority: int = 0, cancel: Optional[threading.Event] = None):
+        self.fn = fn
+        # Set when the caller stops waiting for a running job, so `fn` can
+        # stop early instead of holding the GPU for a result nobody reads.
+        self.cancel = cancel
+        self.deadline = deadline
+        self.seq = seq
+        self.source = source
+        self.priority = priority
+        # Queue the job waits in: its source, or OVERSIZED_LANE.
+        self.lane = source
+        self.cost = cost
+        # Estimated run time, fixed at submit so the heap order is stable.
+        self.seconds = seconds
+        self.enqueued_at = time.monotonic()
+        self.due = self.enqueued_at + aging_factor * seconds
+        if deadline is not None:
+            self.due = min(self.due, deadline)
+        self.started_at: Optional[float] = None
+        self.started = False
+        self.abandoned = False
+        self.future: Optional[asyncio.Future] = None
+
+    def sort_key(self) -> tuple:
+        return (-self.priority, self.due, self.seq)
+
+    def __lt__(self, other: "Job") -> bool:
+        return self.sort_key() < other.sort_key()
+
+    def expired(self, now: float) -> bool:
+        return self.deadline is not None and now >= self.deadline
+
+
+class SourceQueue:
+    """One source's jobs (heap by priority, then due time) and its place
+    in the fair share."""
+
+    def __init__(self, source: str, weight: float):
+        self.source = source
+        self.weight = weight
+        self.heap: list[Job] = []
+        # Virtual time at which this source's last dispatched job finished.
+        self.finish = 0.0
+        self.wait_time = Ewma()
+        self.dispatched = 0
+
+    @property
+    def depth(self) -> int:
+        return sum(1 for job in self.heap if not job.abandoned)
+
+    def head(self) -> Optional[Job]:
+        while self.heap and self.heap[0].abandoned:
+            heapq.heappop(self.heap)
+        return self.heap[0] if self.heap else None
+
+    def snapshot(self, now: float) -> dict:
+        waiting = [now - job.enqueued_at for job in self.heap if not job.abandoned]
+        return {
+            "weight": self.weight,
+            "queue_depth": len(waiting),
+            "oldest_wait_seconds": round(max(waiting), 3) if waiting else 0.0,
+            "avg_wait_seconds": self.wait_time.value,
+            "dispatched": self.dispatched,
+        }
+
+
+class InferenceScheduler:
+
+    def __init__(self, max_concurrency: int = 1, max_queue_depth: int = 32,
+                 weights: Optional[dict[str, float]] = None, default_weight: float = 1.0,
+                 aging_factor: float = 1.0, oversized_weight: float = 0.25,
+                 max_oversized_depth: int = 4):
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.weights = weights or {}
+        self.default_weight = default_weight
+        self.aging_factor = aging_factor
+        self.max_oversized_depth = max_oversized_depth
+        self.service_time = Ewma()
+        self.seconds_per_cost = Ewma()
+        self._oversized = SourceQueue(OVERSIZED_LANE, oversized_weight)
+        self._queues: dict[str, SourceQueue] = {OVERSIZED_LANE: self._oversized}
+        self._active: set[Job] = set()
+        self._vtime = 0.0
+        self._seq = itertools.count()
+        self._running = 0
+        self.stats = {
+            "submitted": 0,
+            "rejected": 0,
+            "displaced": 0,
+            "completed": 0,
+            "failed": 0,
+            "expired": 0,
+            "late": 0,
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(queue.depth for queue in self._queues.values())
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def estimated_wait(self) -> float:
+        """Seconds until a job submitted now would start."""
+        queued = sum(job.seconds for queue in self._queues.values()
+                     for job in queue.heap if not job.abandoned)
+        running = sum(job.seconds for job in self._active)
+        return (queued + running) / self.max_concurrency
+
+    def estimate_seconds(self, cost: Optional[float]) -> float:
+        """Run time of a job of `cost`; the average job if it has none."""
+        if cost is None:
+            return self.service_time.value or _INITIAL_JOB_SECONDS
+        return cost * (self.seconds_per_cost.value or _INITIAL_SECONDS_PER_COST)
+
+    async def submit(self, fn: Callable[[], Any], deadline: Optional[float] = None,
+                     source: str = DEFAULT_SOURCE, cost: Optional[float] = None,
+                     oversized: bool = False, priority: int = 0,
+                     cancel: Optional[threading.Event] = None) -> Any:
+        """
+        Queue `fn` to run in the default executor and wait for its result.
+
+        `deadline` is an absolute time.monotonic() value. Raises
+        DeadlineExceeded if it passes before `fn` has produced a result,
+        and QueueFull if the queue is at capacity (or the job was pushed
+        out of it by a source with less than its share). `oversized` jobs
+        go to their own lane, bounded by max_oversized_depth. Higher
+        `priority` jobs run first. `cancel` is set if the caller stops
+        waiting (deadline, cancellation) while `fn` is running.
+        """
+        if oversized:
+            queue = self._oversized
+            full = queue.depth >= self.max_oversized_depth
+        else:
+            queue = self._queue(source)
+            full = (self.queue_depth - self._oversized.depth >= self.max_queue_depth
+                    and not self._displace_for(queue, priority))
+        if full:
+            self.stats["rejected"] += 1
+            raise QueueFull(self.estimated_wait())
+
+        loop = asyncio.get_running_loop()
+        job = Job(fn, deadline, next(self._seq), source, cost,
+                  self.estimate_seconds(cost), self.aging_factor, priority, cancel)
+        job.lane = queue.source
+        job.future = loop.create_future()
+        self.stats["submitted"] += 1
+
+        heapq.heappush(queue.heap, job)
+        self._dispatch(loop)
+
+        timeout = None
+        if deadline is not None:
+            timeout = max(0.0, deadline - time.monotonic())
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), timeout)
+        except asyncio.TimeoutError:
+            self._abandon(job)
+            raise DeadlineExceeded("Deadline exceeded while waiting for inference")
+        except asyncio.CancelledError:
+            self._abandon(job)
+            raise
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "running": self._running,
+            "max_concurrency": self.max_concurrency,
+            "avg_job_seconds": self.service_time.value,
+            "seconds_per_cost": self.seconds_per_cost.value,
+            "estimated_wait_seconds": round(self.estimated_wait(), 3),
+            **self.stats,
+            "sources": {name: queue.snapshot(now) for name, queue in self._queues.items()},
+            "priorities": self._priority_depths(),
+        }
+
+    def _priority_depths(self) -> dict[str, int]:
+        # String keys: the snapshot crosses the engine socket as msgpack,
+        # which only unpacks str/bytes map keys, and /health renders JSON.
+        depths: dict[int, int] = {}
+        for queue in self._queues.values():
+            for job in queue.heap:
+                if not job.abandoned:
+                    depths[job.priority] = depths.get(job.priority, 0) + 1
+        return {str(priority): n for priority, n in sorted(depths.items(), reverse=True)}
+
+    def _queue(self, source: str) -> SourceQueue:
+        queue = self._queues.get(source)
+        if queue is None:
+            weight = self.weights.get(source, self.default_weight)
+            queue = self._queues[source] = SourceQueue(source, weight)
+        return queue
+
+    def _displace_for(self, queue: SourceQueue, priority: int) -> bool:
+        """Make room for one job of `queue` by dropping the lowest-priority,
+        newest job of the source furthest over its share, unless that job
+        outranks the newcomer. False if `queue` is itself at least as far
+        over, in which case the newcomer is the one refused."""
+        longest = max((q for q in self._queues.values() if q is not self._oversized),
+                      key=lambda q: q.depth / q.weight)
+        if longest is queue or (queue.depth + 1) / queue.weight >= longest.depth / longest.weight:
+            return False
+        victim = min((job for job in longest.heap if not job.abandoned),
+                     key=lambda job: (job.priority, -job.seq))
+        if victim.priority > priority:
+            return False
+        victim.abandoned = True
+        self.stats["displaced"] += 1
+        if not victim.future.done():
+            victim.future.set_exception(QueueFull(self.estimated_wait()))
+        return True
+
+    def _next_job(self) -> Optional[Job]:
+        """
+        Pop the queue head whose job would finish first in virtual time.
+        Priority has already ordered each queue, so it never lets one
+        source take another's share. A job advances its source's virtual
+        clock by its estimated seconds over the source's weight, and a
+        source that was idle starts from the current virtual time rather
+        than cashing in the turns it didn't use.
+        """
+        best = None
+        for queue in self._queues.values():
+            job = queue.head()
+            if job is None:
+                continue
+            start = max(self._vtime, queue.finish)
+            finish = start + job.seconds / queue.weight
+            if best is None or (finish, job.seq) < (best[0], best[3].seq):
+                best = (finish, start, queue, job)
+        if best is None:
+            return None
+        finish, start, queue, job = best
+        heapq.heappop(queue.heap)
+        queue.finish = finish
+        self._vtime = start
+        return job
+
+    def _abandon(self, job: Job) -> None:
+        """The caller stopped waiting. A queued job is skipped at dispatch;
+        a running one is told to stop through its cancel event, if it has
+        one, and its result is discarded."""
+        if job.abandoned:
+            return
+        job.abandoned = True
+        if not job.started:
+            self.stats["expired"] += 1
+        elif job.cancel is not None:
+            job.cancel.set()
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        while self._running < self.max_concurrency:
+            job = self._next_job()
+            if job is None:
+                return
+
+            if job.expired(time.monotonic()):
+                self.stats["expired"] += 1
+                job.abandoned = True
+                if not job.future.done():
+                    job.future.set_exception(
+                        DeadlineExceeded("Deadline passed before inference started")
+                    )
+                continue
+
+            job.started = True
+            job.started_at = time.monotonic()
+            queue = self._queues[job.lane]
+            queue.wait_time.observe(job.started_at - job.enqueued_at)
+            queue.dispatched += 1
+            self._running += 1
+            self._active.add(job)
+            task = loop.run_in_executor(None, job.fn)
+            task.add_done_callback(lambda t, j=job: self._on_done(loop, j, t))
+
+    def _on_done(self, loop: asyncio.AbstractEventLoop, job: Job, task: asyncio.Future) -> None:
+        self._running -= 1
+        self._active.discard(job)
+        elapsed = time.monotonic() - job.started_at
+        self.service_time.observe(elapsed)
+        if job.cost and task.exception() is None:
+            self.seconds_per_cost.observe(elapsed / job.cost)
+
+        if task.exception() is not None:
+            self.stats["failed"] += 1
+        else:
+            self.stats["completed"] += 1
+            if job.expired(time.monotonic()):
+                self.stats["late"] += 1
+
+        if not job.abandoned and not job.future.done():
+            if task.exception() is not None:
+                job.future.set_exception(task.exception())
+            else:
+                job.future.set_result(task.result())
+
+        self._dispatch(loop)
+
+
+# instance to import
+scheduler = InferenceScheduler(
+    max_queue_depth=settings.max_queue_depth,
+    weights=settings.source_weights,
+    default_weight=settings.default_source_weight,
+    aging_factor=settings.cost_aging_factor,
+    oversized_weight=settings.oversized_lane_weight,
+    max_oversized_depth=settings.max_oversized_queue_depth,
+)
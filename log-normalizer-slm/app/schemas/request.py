@@ -5,7 +5,10 @@ Request schema for the normalize endpoint.
 import re
 from enum import Enum
 import json
-from pydantic import BaseModel, field_validator
+from typing import Optional
+from pydantic import BaseModel, HttpUrl, PrivateAttr, field_validator, model_validator
+
+from app.utils.raw_log import RawLog
 
 
 class LogFormat(str, Enum):
@@ -23,6 +26,29 @@ class NormalizeRequest(BaseModel):
     raw_log: str
     source: str
     format: LogFormat = LogFormat.UNKNOWN
+    timeout_ms: Optional[int] = None
+    # Scheduling priority on the OCSF severity_id scale (0-5, 5 = Critical).
+    # Unset = estimated from the severity in the raw log.
+    priority: Optional[int] = None
+
+    _raw: Optional[RawLog] = PrivateAttr(default=None)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def keep_parsed_raw_log(cls, data, handler):
+        """raw_log sent as an object is serialized once by raw_log_not_empty;
+        keep the object too so nothing has to parse that string back."""
+        parsed = data.get("raw_log") if isinstance(data, dict) else None
+        req = handler(data)
+        if isinstance(parsed, dict):
+            req._raw = RawLog(req.raw_log, parsed, LogFormat.JSON.value)
+        return req
+
+    @property
+    def raw(self) -> RawLog:
+        if self._raw is None:
+            self._raw = RawLog(self.raw_log, format=self.format.value)
+        return self._raw
 
     @field_validator("raw_log", mode="before")
     @classmethod
@@ -61,6 +87,44 @@ class NormalizeRequest(BaseModel):
             return v.strip().lower()
         return v
 
+    @field_validator("timeout_ms")
+    @classmethod
+    def timeout_is_positive(cls, v: Optional[int]) -> Optional[int]:
+        """Budget the caller is willing to wait, in milliseconds."""
+        if v is not None and v <= 0:
+            raise ValueError("timeout_ms must be positive")
+        return v
+
+    @field_validator("priority")
+    @classmethod
+    def priority_in_range(cls, v: Optional[int]) -> Optional[int]:
+        if v is not None and not 0 <= v <= 5:
+            raise ValueError("priority must be between 0 and 5")
+        return v
+
 
 class ValidateRequest(BaseModel):
     ocsf: dict
+
+
+class JobSubmitRequest(BaseModel):
+    """One alert (same body as /normalize) or many under `items`."""
+
+    items: list[NormalizeRequest]
+    callback_url: Optional[HttpUrl] = None
+
+    @model_validator(mode="before")
+    @classmethod
+    def wrap_single_alert(cls, data):
+        if isinstance(data, dict) and "raw_log" in data:
+            callback_url = data.get("callback_url")
+            item = {k: v for k, v in data.items() if k != "callback_url"}
+            return {"items": [item], "callback_url": callback_url}
+        return data
+
+    @field_validator("items")
+    @classmethod
+    def items_not_empty(cls, v: list[NormalizeRequest]) -> list[NormalizeRequest]:
+        if not v:
+            raise ValueError("items must not be empty")
+        return v
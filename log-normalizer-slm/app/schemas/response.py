@@ -29,4 +29,21 @@ class NormalizeResponse(BaseModel):
     @field_validator("confidence")
     @classmethod
     def clamp_confidence(cls, v: float) -> float:
-        return max(0.0, min(1.0, float(v)))  
\ No newline at end of file
+        return max(0.0, min(1.0, float(v)))
+
+
+class BatchNormalizeResponse(BaseModel):
+    results: list[NormalizeResponse]
+
+
+class JobSubmitResponse(BaseModel):
+    job_ids: list[str]
+
+
+class JobStatusResponse(BaseModel):
+    id: str
+    status: str
+    result: Optional[NormalizeResponse] = None
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
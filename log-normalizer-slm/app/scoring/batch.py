@@ -0,0 +1,198 @@
+"""
+Confidence scoring for many records at once (offline evaluation, backfills).
+
+Scoring is split in two:
+
+  - features(): the per-record Python work, done once. A boolean presence
+    matrix over every tier path (records x paths, with and without None
+    leaves), value_consistency hit counts, error/warning counts, and the
+    token_confidence of records that have per-value logprobs.
+  - score_features(): everything else as array operations over the whole
+    set, reading COVERAGE_WEIGHTS, the tiers and thresholds at call time,
+    so a changed weight or threshold re-scores without redoing features().
+
+Results are identical to compute_confidence() record for record, the
+logprob blend included: the float operations run in the same order, and
+the final rounding uses Python's round() rather than np.round, which can
+differ in the last digit.
+"""
+
+import math
+from typing import Any, Optional
+
+import numpy as np
+
+from app.config import settings
+from app.ocsf.ocsf_constants import COVERAGE_WEIGHTS
+from app.scoring.confidence import (
+    _REPAIR_NOTE, _REPAIR_PENALTY, _TIERS, ConfidenceResult, _low_confidence_note, extract_leaf_values,
+)
+from app.scoring.field_trie import FieldTrie
+from app.scoring.token_confidence import token_confidence, uncertain_fields
+from app.scoring.value_index import ValueIndex
+
+_COVERAGE_TIERS = ("required", "recommended", "richness")
+
+
+class ScoringFeatures:
+    def __init__(self, trie: FieldTrie, present: np.ndarray, valued: np.ndarray,
+                 consistent: np.ndarray, checked: np.ndarray, errors: list[list[str]],
+                 warnings: list[list[str]], repaired: np.ndarray,
+                 token_score: np.ndarray, uncertain: list[list[str]]):
+        self.trie = trie
+        # records x trie.paths: key present / key present with a non-None value
+        self.present = present
+        self.valued = valued
+        # value_consistency: output values found in the raw input / checked
+        self.consistent = consistent
+        self.checked = checked
+        self.errors = errors
+        self.warnings = warnings
+        self.repaired = repaired
+        # token_confidence per record, NaN where there are no logprobs;
+        # values below logprob_flag_threshold, for the note.
+        self.token_score = token_score
+        self.uncertain = uncertain
+
+    def __len__(self) -> int:
+        return len(self.errors)
+
+
+class BatchScores:
+    def __init__(self, features: ScoringFeatures, score: np.ndarray, schema: np.ndarray,
+                 coverage: np.ndarray, consistency: np.ndarray, decision: np.ndarray):
+        self.features = features
+        # Unrounded, as compared against the thresholds.
+        self.score = score
+        self.schema = schema
+        self.coverage = coverage
+        self.consistency = consistency
+        self.decision = decision
+
+    def results(self) -> list[ConfidenceResult]:
+        """One ConfidenceResult per record, as compute_confidence() returns it."""
+        f = self.features
+        out = []
+        columns = zip(self.score.tolist(), self.schema.tolist(), self.coverage.tolist(),
+                      self.consistency.tolist(), self.decision.tolist(), f.repaired.tolist(),
+                      f.token_score.tolist())
+        for i, (score, schema, coverage, consistency, decision, repaired, token) in enumerate(columns):
+            breakdown = {
+                "schema_validity": round(schema, 3),
+                "field_coverage": round(coverage, 3),
+                "value_consistency": round(consistency, 3),
+            }
+            notes = []
+            if not math.isnan(token):
+                breakdown["token_confidence"] = round(token, 3)
+                if f.uncertain[i]:
+                    notes.append(_low_confidence_note(f.uncertain[i]))
+            if repaired:
+                breakdown["repair_penalty"] = _REPAIR_PENALTY
+                notes.append(_REPAIR_NOTE)
+            out.append(ConfidenceResult(
+                score=round(score, 3),
+                breakdown=breakdown,
+                decision=decision,
+                validation_errors=f.errors[i] + f.warnings[i] + notes,
+            ))
+        return out
+
+
+def features(
+    raw_inputs: list[dict],
+    ocsf_outputs: list[dict],
+    validation_errors: Optional[list[Optional[list[str]]]] = None,
+    validation_warnings: Optional[list[Optional[list[str]]]] = None,
+    repaired: Optional[list[bool]] = None,
+    leaf_logprobs: Optional[list[Optional[dict[str, tuple[float, float]]]]] = None,
+    token_scores: Optional[list[Optional[float]]] = None,
+    trie: FieldTrie = _TIERS,
+) -> ScoringFeatures:
+    """
+    Arguments are parallel lists, one entry per compute_confidence() call.
+    `token_scores` are already computed token_confidence values (a stored
+    breakdown's), used for records without `leaf_logprobs`.
+    """
+    n = len(ocsf_outputs)
+    if len(raw_inputs) != n:
+        raise ValueError(f"{len(raw_inputs)} raw inputs for {n} outputs")
+    errors = [list(e or []) for e in (validation_errors or [None] * n)]
+    warnings = [list(w or []) for w in (validation_warnings or [None] * n)]
+
+    present = np.zeros((n, len(trie.paths)), dtype=bool)
+    valued = np.zeros((n, len(trie.paths)), dtype=bool)
+    consistent = np.zeros(n, dtype=np.int64)
+    checked = np.zeros(n, dtype=np.int64)
+    for i, (raw, ocsf) in enumerate(zip(raw_inputs, ocsf_outputs)):
+        present_cols, valued_cols = trie.columns(ocsf)
+        present[i, present_cols] = True
+        valued[i, valued_cols] = True
+        values = extract_leaf_values(ocsf)
+        if values:
+            index = ValueIndex(raw)
+            consistent[i] = sum(1 for v in values if index.contains(v))
+            checked[i] = len(values)
+
+    token_score = np.full(n, np.nan)
+    uncertain: list[list[str]] = [[] for _ in range(n)]
+    for i in range(n):
+        leaves = leaf_logprobs[i] if leaf_logprobs is not None else None
+        if leaves:
+            token_score[i] = token_confidence(leaves)
+            uncertain[i] = uncertain_fields(leaves, settings.logprob_flag_threshold)
+        elif token_scores is not None and token_scores[i] is not None:
+            token_score[i] = token_scores[i]
+
+    return ScoringFeatures(
+        trie, present, valued, consistent, checked, errors, warnings,
+        np.array(repaired if repaired is not None else [False] * n, dtype=bool),
+        token_score, uncertain,
+    )
+
+
+def score_features(f: ScoringFeatures) -> BatchScores:
+    counts = _tier_counts(f)
+
+    schema_total = f.trie.sizes["schema"]
+    base = counts["schema"] / schema_total if schema_total > 0 else np.zeros(len(f))
+    n_errors = np.array([len(e) for e in f.errors], dtype=np.float64)
+    n_warnings = np.array([len(w) for w in f.warnings], dtype=np.float64)
+    schema = np.maximum(0.0, base - np.minimum(n_errors * 0.05, 0.4)
+                        - np.minimum(n_warnings * 0.02, 0.2))
+
+    coverage = np.zeros(len(f))
+    for tier in _COVERAGE_TIERS:
+        size = f.trie.sizes[tier]
+        tier_score = counts[tier] / size if size else np.full(len(f), 0.5)
+        coverage = coverage + COVERAGE_WEIGHTS[tier] * tier_score
+
+    consistency = np.full(len(f), 0.5)
+    np.divide(f.consistent, f.checked, out=consistency, where=f.checked > 0)
+
+    score = 0.40 * schema + 0.30 * coverage + 0.30 * consistency
+    weight = settings.logprob_weight
+    blended = (1 - weight) * score + weight * np.nan_to_num(f.token_score)
+    score = np.where(np.isnan(f.token_score), score, blended)
+    score = np.where(f.repaired, np.maximum(0.0, score - _REPAIR_PENALTY), score)
+
+    decision = np.where(score >= settings.accept_threshold, "accept",
+                        np.where(score >= settings.review_threshold, "review", "reject"))
+    return BatchScores(f, score, schema, coverage, consistency, decision)
+
+
+def score_batch(raw_inputs: list[dict], ocsf_outputs: list[dict], **kwargs: Any) -> BatchScores:
+    return score_features(features(raw_inputs, ocsf_outputs, **kwargs))
+
+
+def _tier_counts(f: ScoringFeatures) -> dict[str, np.ndarray]:
+    """Per tier, how many of its paths each record has (matrix x membership)."""
+    column = {path: i for i, path in enumerate(f.trie.paths)}
+    counts = {}
+    for name, paths in f.trie.tiers.items():
+        membership = np.zeros(len(f.trie.paths), dtype=np.int64)
+        for path in paths:
+            membership[column[path]] += 1
+        matrix = f.present if name in f.trie.keep_none else f.valued
+        counts[name] = matrix.astype(np.int64) @ membership
+    return counts
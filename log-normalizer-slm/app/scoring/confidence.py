@@ -1,6 +1,8 @@
-import json
 import logging
 from app.config import settings
+from app.scoring.field_trie import FieldTrie
+from app.scoring.token_confidence import token_confidence, uncertain_fields
+from app.scoring.value_index import ValueIndex
 from app.ocsf.ocsf_constants import (
     DETECTION_FINDING_RECOMMENDED, DETECTION_FINDING_REQUIRED,
     DETECTION_FINDING_RICHNESS, COVERAGE_WEIGHTS,
@@ -19,6 +21,28 @@ _REQUIRED_NESTED = {
     "metadata.product": ["name", "vendor_name"],
 }
 
+# Every path tier scoring checks, counted in one walk of the output.
+# schema_validity only asks whether the key is there; coverage needs a value.
+_TIERS = FieldTrie(
+    {
+        "required": DETECTION_FINDING_REQUIRED,
+        "recommended": DETECTION_FINDING_RECOMMENDED,
+        "richness": DETECTION_FINDING_RICHNESS,
+        "schema": _REQUIRED_TOP + [
+            f"{parent}.{child}" for parent, children in _REQUIRED_NESTED.items() for child in children
+        ],
+    },
+    keep_none=("schema",),
+)
+
+# Docked from the composite when the output was truncated and had to be
+# closed by the parser: whatever the model didn't get to write is missing.
+_REPAIR_PENALTY = 0.15
+
+# Notes appended to validation_errors after the errors and warnings.
+_REPAIR_NOTE = "Output was truncated; JSON repaired and may be incomplete"
+_LOW_CONFIDENCE_NOTE = "Low model confidence in: "
+
 
 class ConfidenceResult:
     def __init__(self, score: float, breakdown: dict, decision: str,
@@ -35,20 +59,26 @@ def compute_confidence(
     source: str,
     validation_errors: list[str] | None = None,
     validation_warnings: list[str] | None = None,
+    repaired: bool = False,
+    leaf_logprobs: dict[str, tuple[float, float]] | None = None,
 ) -> ConfidenceResult:
     """
     Composite score from three signals:
       schema_validity   (0.40) — required fields present + penalty for warnings/errors
       field_coverage    (0.30) — how many expected fields are populated
       value_consistency (0.30) — do output values exist in the input
+    blended with token_confidence (settings.logprob_weight) when per-value
+    token logprobs are given, minus _REPAIR_PENALTY when the JSON was
+    repaired after truncation.
     """
-    schema_score = _score_schema(ocsf_output, validation_errors or [], validation_warnings or [])
+    counts = _TIERS.count(ocsf_output)
+    schema_score = _score_schema(counts, validation_errors or [], validation_warnings or [])
 
-    coverage_score = compute_field_coverage(ocsf_output)
+    coverage_score = _coverage(counts)
 
-    raw_str = json.dumps(raw_input)
+    raw_index = ValueIndex(raw_input)
     values_to_check = extract_leaf_values(ocsf_output)
-    consistent = sum(1 for v in values_to_check if str(v) in raw_str)
+    consistent = sum(1 for v in values_to_check if raw_index.contains(v))
     consistency_score = consistent / len(values_to_check) if values_to_check else 0.5
 
     # Composite
@@ -57,6 +87,11 @@ def compute_confidence(
         0.30 * coverage_score +
         0.30 * consistency_score
     )
+    token_score = token_confidence(leaf_logprobs) if leaf_logprobs else None
+    if token_score is not None:
+        score = (1 - settings.logprob_weight) * score + settings.logprob_weight * token_score
+    if repaired:
+        score = max(0.0, score - _REPAIR_PENALTY)
 
     # Decision
     if score >= settings.accept_threshold:
@@ -75,20 +110,36 @@ def compute_confidence(
         decision,
     )
 
+    breakdown = {
+        "schema_validity": round(schema_score, 3),
+        "field_coverage": round(coverage_score, 3),
+        "value_consistency": round(consistency_score, 3),
+    }
+    notes = []
+    if token_score is not None:
+        breakdown["token_confidence"] = round(token_score, 3)
+        uncertain = uncertain_fields(leaf_logprobs, settings.logprob_flag_threshold)
+        if uncertain:
+            notes.append(_low_confidence_note(uncertain))
+    if repaired:
+        breakdown["repair_penalty"] = _REPAIR_PENALTY
+        notes.append(_REPAIR_NOTE)
+
     return ConfidenceResult(
         score=round(score, 3),
-        breakdown={
-            "schema_validity": round(schema_score, 3),
-            "field_coverage": round(coverage_score, 3),
-            "value_consistency": round(consistency_score, 3),
-        },
+        breakdown=breakdown,
         decision=decision,
-        validation_errors=(validation_errors or []) + (validation_warnings or []),
+        validation_errors=(validation_errors or []) + (validation_warnings or []) + notes,
     )
 
 
+def _low_confidence_note(uncertain: list[str]) -> str:
+    more = f" (+{len(uncertain) - 10} more)" if len(uncertain) > 10 else ""
+    return f"{_LOW_CONFIDENCE_NOTE}{', '.join(uncertain[:10])}{more}"
+
+
 def _score_schema(
-    ocsf: dict,
+    counts: dict[str, int],
     errors: list[str],
     warnings: list[str],
 ) -> float:
@@ -97,20 +148,8 @@ def _score_schema(
     Hard errors (missing required / type mismatch) dock heavily.
     Warnings (stripped extras) dock lightly.
     """
-    # Count required fields present
-    present = sum(1 for f in _REQUIRED_TOP if f in ocsf)
-    total = len(_REQUIRED_TOP)
-
-    for parent_path, children in _REQUIRED_NESTED.items():
-        parts = parent_path.split(".")
-        obj = ocsf
-        for p in parts:
-            obj = obj.get(p, {}) if isinstance(obj, dict) else {}
-        if isinstance(obj, dict):
-            present += sum(1 for f in children if f in obj)
-        total += len(children)
-
-    base = present / total if total > 0 else 0.0
+    total = _TIERS.sizes["schema"]
+    base = counts["schema"] / total if total > 0 else 0.0
 
     error_penalty = min(len(errors) * 0.05, 0.4)
     warning_penalty = min(len(warnings) * 0.02, 0.2)
@@ -120,38 +159,22 @@ def _score_schema(
 
 
 def compute_field_coverage(data: dict) -> float:
-    required_score = _tier_score(data, DETECTION_FINDING_REQUIRED)
-    recommended_score = _tier_score(data, DETECTION_FINDING_RECOMMENDED)
-    richness_score = _tier_score(data, DETECTION_FINDING_RICHNESS)
+    return _coverage(_TIERS.count(data))
+
+
+def _coverage(counts: dict[str, int]) -> float:
     return (
-        COVERAGE_WEIGHTS["required"] * required_score
-        + COVERAGE_WEIGHTS["recommended"] * recommended_score
-        + COVERAGE_WEIGHTS["richness"] * richness_score
+        COVERAGE_WEIGHTS["required"] * _tier_score(counts, "required")
+        + COVERAGE_WEIGHTS["recommended"] * _tier_score(counts, "recommended")
+        + COVERAGE_WEIGHTS["richness"] * _tier_score(counts, "richness")
     )
 
 
-def _tier_score(data: dict, fields: list[str]) -> float:
-    if not fields:
+def _tier_score(counts: dict[str, int], tier: str) -> float:
+    size = _TIERS.sizes[tier]
+    if not size:
         return 0.5
-    present = count_present_fields(data, fields)
-    return present / len(fields)
-
-
-def count_present_fields(data: dict, expected: list[str]) -> int:
-    count = 0
-    for path in expected:
-        parts = path.split(".")
-        obj = data
-        found = True
-        for part in parts:
-            if isinstance(obj, dict) and part in obj:
-                obj = obj[part]
-            else:
-                found = False
-                break
-        if found and obj is not None:
-            count += 1
-    return count
+    return counts[tier] / size
 
 
 def extract_leaf_values(data: dict, max_depth=5) -> list:
@@ -0,0 +1,102 @@
+"""
+Field-path tiers compiled into one trie, counted in a single walk.
+
+Coverage and schema scoring check fixed lists of dotted paths
+("finding_info.title", "metadata.product.name", ...). Splitting each path
+and walking it from the root repeats the shared prefixes for every path
+and every list. Here all tiers are merged into a trie at import; counting
+visits each trie node at most once per output and returns every tier's
+count together.
+
+A path counts when every parent on it is a dict holding the next key.
+The leaf must not be None, except in tiers listed in `keep_none`, where the
+key being present is enough.
+"""
+
+from typing import Any
+
+
+class _Node:
+    __slots__ = ("children", "hits", "column")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        # Tier indexes this path counts for, (index, needs_value) pairs.
+        self.hits: list[tuple[int, bool]] = []
+        # Position in FieldTrie.paths when some tier lists this path, else -1.
+        self.column = -1
+
+
+class FieldTrie:
+    def __init__(self, tiers: dict[str, list[str]], keep_none: tuple[str, ...] = ()):
+        self.names = list(tiers)
+        self.tiers = {name: list(paths) for name, paths in tiers.items()}
+        self.keep_none = tuple(keep_none)
+        self.sizes = {name: len(paths) for name, paths in tiers.items()}
+        # Every distinct path across tiers, in first-seen order.
+        self.paths: list[str] = []
+        self._root = _Node()
+        for index, (name, paths) in enumerate(tiers.items()):
+            for path in paths:
+                node = self._root
+                for part in path.split("."):
+                    node = node.children.setdefault(part, _Node())
+                node.hits.append((index, name not in keep_none))
+                if node.column < 0:
+                    node.column = len(self.paths)
+                    self.paths.append(path)
+        self._edges = _freeze(self._root)
+        self._column_edges = _freeze_columns(self._root)
+
+    def count(self, data: Any) -> dict[str, int]:
+        counts = [0] * len(self.names)
+        if type(data) is not dict:
+            return dict.fromkeys(self.names, 0)
+        stack = [(self._edges, data)]
+        pop, push = stack.pop, stack.append
+        while stack:
+            edges, obj = pop()
+            for key, hits, sub in edges:
+                if key not in obj:
+                    continue
+                value = obj[key]
+                for index, needs_value in hits:
+                    if value is not None or not needs_value:
+                        counts[index] += 1
+                if sub and type(value) is dict:
+                    push((sub, value))
+        return dict(zip(self.names, counts))
+
+    def columns(self, data: Any) -> tuple[list[int], list[int]]:
+        """
+        Which of `paths` are in data: (present, valued) column indexes, the
+        second excluding None leaves. Same walk as count(), per path.
+        """
+        present: list[int] = []
+        valued: list[int] = []
+        if type(data) is not dict:
+            return present, valued
+        stack = [(self._column_edges, data)]
+        pop, push = stack.pop, stack.append
+        while stack:
+            edges, obj = pop()
+            for key, column, sub in edges:
+                if key not in obj:
+                    continue
+                value = obj[key]
+                if column >= 0:
+                    present.append(column)
+                    if value is not None:
+                        valued.append(column)
+                if sub and type(value) is dict:
+                    push((sub, value))
+        return present, valued
+
+
+def _freeze(node: _Node) -> tuple:
+    """Children as (key, hits, child_edges) tuples: no attribute lookups in count()."""
+    return tuple((key, tuple(child.hits), _freeze(child)) for key, child in node.children.items())
+
+
+def _freeze_columns(node: _Node) -> tuple:
+    return tuple((key, child.column, _freeze_columns(child)) for key, child in node.children.items())
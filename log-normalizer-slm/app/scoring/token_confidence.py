@@ -0,0 +1,43 @@
+"""
+How sure the model was about each OCSF value, from its token logprobs.
+
+Each scalar value in the generated JSON is matched to the tokens that
+wrote it. The value gets the min and mean logprob of those tokens. The
+min is the weakest token: a hostname that is likely apart from one
+uncertain digit still gets a low min. Values in the prefilled header have
+no generated tokens and are left out.
+"""
+
+import bisect
+import math
+
+from app.utils.ocsf_parser import value_spans
+
+
+def leaf_logprobs(text: str, token_offsets: list[int], logprobs: list[float]) -> dict[str, tuple[float, float]]:
+    """path -> (min, mean) logprob of the tokens overlapping that value.
+    Token i covers text[token_offsets[i]:token_offsets[i + 1]]."""
+    if not logprobs or len(token_offsets) != len(logprobs) + 1:
+        return {}
+    ends = token_offsets[1:]
+    leaves = {}
+    for path, start, end in value_spans(text):
+        i = bisect.bisect_right(ends, start)
+        picked = []
+        while i < len(logprobs) and token_offsets[i] < end:
+            picked.append(logprobs[i])
+            i += 1
+        if picked:
+            leaves[path] = (min(picked), sum(picked) / len(picked))
+    return leaves
+
+
+def token_confidence(leaves: dict[str, tuple[float, float]]) -> float:
+    """Mean over values of the per-token geometric mean probability."""
+    return sum(math.exp(mean) for _, mean in leaves.values()) / len(leaves)
+
+
+def uncertain_fields(leaves: dict[str, tuple[float, float]], threshold: float) -> list[str]:
+    """Values whose least likely token is below `threshold` probability."""
+    cutoff = math.log(threshold) if threshold > 0 else -math.inf
+    return [path for path, (low, _) in leaves.items() if low < cutoff]
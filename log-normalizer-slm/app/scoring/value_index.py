@@ -0,0 +1,144 @@
+"""
+Per-request index of the raw alert's leaf values for value_consistency.
+
+Checking `str(v) in json.dumps(raw)` scans the whole serialized alert for
+every output value, and misses values JSON escaping changed (a Windows path
+has doubled backslashes in the dump, non-ASCII becomes \\uXXXX). Instead the
+raw leaves are indexed once, together with normalized forms:
+
+  - exact:    str(value), numbers without a trailing ".0"
+  - folded:   case-folded strings (output values are also trimmed)
+  - times:    timestamps canonicalized to "YYYY-MM-DDTHH:MM:SSZ" (ISO strings
+              with any precision or offset, epoch seconds/milliseconds)
+
+Output values are looked up in those sets. Strings that are not a whole raw
+value fall back to a substring search over the raw strings (unescaped), which
+still finds a path inside a command line. Below _MIN_SUBSTRING_LEN characters
+the match must also sit between separators, as a username cut out of
+"CORP\\user" does; otherwise "admin" would be found in any alert mentioning
+"administrator". Empty strings never match.
+"""
+
+import datetime
+import re
+from typing import Any
+
+# Epoch values in this range are taken as timestamps (2001 .. 2100).
+_EPOCH_SECONDS = (1_000_000_000, 4_102_444_800)
+_EPOCH_MILLIS = (_EPOCH_SECONDS[0] * 1000, _EPOCH_SECONDS[1] * 1000)
+
+_ISO_RE = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})[T ](\d{2}):(\d{2}):(\d{2})(?:\.\d+)?\s*(Z|[+-]\d{2}:?\d{2})?$",
+    re.IGNORECASE,
+)
+
+# Values in the folded haystack that start like a date; canonical_time decides.
+_TIME_CANDIDATE_RE = re.compile(r"\x00(\d{4}-\d{2}-\d{2}[t ][^\x00]*)")
+
+# What a value embedded in a longer raw string is delimited by.
+_TOKEN_SEPARATOR = r"[\s\x00\\/@=:,;|\"'()\[\]{}<>]"
+
+# Shorter strings only match whole values or tokens, not any substring.
+_MIN_SUBSTRING_LEN = 8
+
+
+class ValueIndex:
+    def __init__(self, raw: Any):
+        strings: list[str] = []
+        ints: list[int] = []
+        floats: list[float] = []
+        stack = [raw]
+        pop, push, extend = stack.pop, strings.append, stack.extend
+        while stack:
+            obj = pop()
+            kind = type(obj)
+            if kind is str:
+                push(obj)
+            elif kind is dict:
+                extend(obj.values())
+            elif kind is list:
+                extend(obj)
+            elif kind is int:
+                ints.append(obj)
+            elif kind is float:
+                floats.append(obj)
+
+        # Fold everything in one pass over the joined text rather than per
+        # value. \x00 also keeps substring matches from spanning values.
+        self._haystack = "\x00".join(strings).casefold()
+        self.exact: set[str] = set(strings)
+        self.exact.update(map(str, ints))
+        self.exact.update(map(_number_key, floats))
+        self.folded: set[str] = set(self._haystack.split("\x00"))
+
+        lo, hi = _EPOCH_SECONDS[0], _EPOCH_MILLIS[1]
+        candidates = [n for n in ints + floats if lo <= n < hi]
+        candidates += _TIME_CANDIDATE_RE.findall("\x00" + self._haystack)
+        self.times: set[str] = set(filter(None, map(canonical_time, candidates)))
+
+        self._fallback: dict[str, bool] = {}
+
+    def contains(self, value: Any) -> bool:
+        if isinstance(value, str):
+            folded = value.strip().casefold()
+            if not folded:
+                return False
+            if value in self.exact or folded in self.folded:
+                return True
+            ts = canonical_time(value)
+            if ts and ts in self.times:
+                return True
+            found = self._fallback.get(folded)
+            if found is None:
+                found = self._fallback[folded] = self._embedded(folded)
+            return found
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            key = _number_key(value)
+            if key in self.exact:
+                return True
+            ts = canonical_time(value)
+            return bool(ts) and ts in self.times
+        return str(value) in self.exact
+
+    def _embedded(self, folded: str) -> bool:
+        if folded not in self._haystack:
+            return False
+        if len(folded) >= _MIN_SUBSTRING_LEN:
+            return True
+        # Short: only as a whole token, between separators.
+        sep = _TOKEN_SEPARATOR
+        return re.search(f"(?:^|{sep}){re.escape(folded)}(?:{sep}|$)", self._haystack) is not None
+
+
+def canonical_time(value: Any) -> str | None:
+    """"YYYY-MM-DDTHH:MM:SSZ" for ISO-like strings and epoch numbers, else None."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if _EPOCH_MILLIS[0] <= value < _EPOCH_MILLIS[1]:
+            value = value / 1000
+        elif not _EPOCH_SECONDS[0] <= value < _EPOCH_SECONDS[1]:
+            return None
+        dt = datetime.datetime.fromtimestamp(int(value), tz=datetime.timezone.utc)
+        return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    # Cheap shape check before the regex: most strings aren't timestamps.
+    if not isinstance(value, str) or len(value) < 19 or value[4:5] != "-" or not value[:4].isdigit():
+        return None
+    m = _ISO_RE.match(value.strip())
+    if not m:
+        return None
+    year, month, day, hour, minute, second, tz = m.groups()
+    try:
+        dt = datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+    except ValueError:
+        return None
+    if tz and tz.upper() != "Z":
+        sign = 1 if tz[0] == "+" else -1
+        digits = tz[1:].replace(":", "")
+        dt -= sign * datetime.timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _number_key(value: int | float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
@@ -0,0 +1,298 @@
+"""
+Parsers for the non-JSON log formats in LogFormat, and format sniffing.
+
+Each parser turns one log into a flat dict of strings, or returns None if
+the text isn't that format. Header fields get the format's own names
+(CEF: deviceVendor, deviceProduct, ...), CEF custom fields are renamed by
+their labels (cs1Label=User cs1=alice -> User=alice), and empty values
+are dropped. Extension text that isn't a key=value pair (a "=value"
+with no key, words before the first key) is kept under "unparsed". A
+syslog message that carries CEF, LEEF or key=value pairs is parsed too;
+the syslog header then goes under "syslog." keys so it can't clash with
+the payload's own (CEF has a severity as well).
+
+Everything is regexes and str methods, no dependencies: this runs on
+every non-JSON request before the prompt is built.
+"""
+
+import csv
+import io
+import re
+from typing import Optional
+
+# -- CEF ---------
+
+_CEF_HEADER = ("cefVersion", "deviceVendor", "deviceProduct", "deviceVersion",
+               "deviceEventClassId", "name", "severity")
+# Header fields are separated by pipes not escaped with a backslash.
+_CEF_PIPE = re.compile(r"(?<!\\)\|")
+# An extension key starts after whitespace and ends at an unescaped '='.
+# An empty key marks a malformed "=value" token.
+_CEF_KEY = re.compile(r"(?<!\S)([\w.\[\]-]*)=")
+_CEF_UNESCAPE = re.compile(r"\\([\\=|nr])")
+_CEF_ESCAPES = {"\\": "\\", "=": "=", "|": "|", "n": "\n", "r": "\r"}
+_UNPARSED = "unparsed"
+
+
+def parse_cef(text: str) -> Optional[dict[str, str]]:
+    if not text.startswith("CEF:"):
+        return None
+    parts = _CEF_PIPE.split(text[4:], maxsplit=7)
+    if len(parts) < 7:
+        return None
+    fields = {}
+    for key, value in zip(_CEF_HEADER, parts):
+        _put(fields, key, _unescape(value))
+    if len(parts) == 8:
+        fields.update(_cef_extension(parts[7], fields))
+    return fields
+
+
+def _cef_extension(extension: str, header: dict[str, str]) -> dict[str, str]:
+    fields: dict[str, str] = {}
+    keys = list(_CEF_KEY.finditer(extension))
+    unparsed = [extension[:keys[0].start() if keys else None].strip()]
+    for i, match in enumerate(keys):
+        end = keys[i + 1].start() if i + 1 < len(keys) else len(extension)
+        value = _unescape(extension[match.end():end].strip())
+        if match.group(1):
+            _put(fields, match.group(1), value)
+        else:
+            unparsed.append(f"={value}")
+    if _UNPARSED not in fields:
+        _put(fields, _UNPARSED, " ".join(filter(None, unparsed)))
+    # cs1Label=User cs1=alice -> User=alice, unless that would overwrite a
+    # field already there (a label of "name" or "severity"): then both stay.
+    for label_key in [key for key in fields if key.endswith("Label")]:
+        key = label_key[:-5]
+        label = fields[label_key]
+        if key in fields and label not in fields and label not in header:
+            fields[label] = fields.pop(key)
+            del fields[label_key]
+    return fields
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _CEF_UNESCAPE.sub(lambda m: _CEF_ESCAPES[m.group(1)], value)
+
+
+# -- LEEF ---------
+
+_LEEF_HEADER = ("leefVersion", "vendor", "product", "version", "eventId")
+
+
+def parse_leef(text: str) -> Optional[dict[str, str]]:
+    if not text.startswith("LEEF:"):
+        return None
+    parts = text[5:].split("|", 5)
+    if len(parts) < 5:
+        return None
+    fields = {}
+    for key, value in zip(_LEEF_HEADER, parts):
+        _put(fields, key, value)
+    attributes = parts[5] if len(parts) == 6 else ""
+
+    delimiter = "\t"
+    if parts[0].startswith("2"):
+        # LEEF 2.0 names its attribute delimiter: a character or hex (x09, 0x5E).
+        spec, _, attributes = attributes.partition("|")
+        if len(spec) == 1:
+            delimiter = spec
+        elif spec:
+            try:
+                delimiter = chr(int(spec.lower().removeprefix("0").removeprefix("x"), 16))
+            except ValueError:
+                pass
+
+    if delimiter in attributes or "=" not in attributes:
+        unparsed = []
+        for pair in attributes.split(delimiter):
+            key, sep, value = pair.partition("=")
+            if sep and key.strip():
+                _put(fields, key.strip(), value.strip())
+            elif pair.strip():
+                unparsed.append(pair.strip())
+        if _UNPARSED not in fields:
+            _put(fields, _UNPARSED, " ".join(unparsed))
+    else:
+        # Delimiter not honoured (space-separated in the wild): read it like CEF.
+        fields.update(_cef_extension(attributes, fields))
+    return fields
+
+
+# -- syslog ---------
+
+_FACILITIES = ("kern", "user", "mail", "daemon", "auth", "syslog", "lpr", "news", "uucp", "cron",
+               "authpriv", "ftp", "ntp", "security", "console", "solaris-cron",
+               "local0", "local1", "local2", "local3", "local4", "local5", "local6", "local7")
+_SEVERITIES = ("emergency", "alert", "critical", "error", "warning", "notice", "info", "debug")
+
+# PRI is facility * 8 + severity: 0-191.
+_PRI = r"<(19[01]|1[0-8]\d|0?\d?\d)>"
+_RFC5424 = re.compile(
+    _PRI + r"\d{1,2} (\S+) (\S+) (\S+) (\S+) (\S+) (-|(?:\[(?:[^\]\\\"]|\\.|\"(?:[^\"\\]|\\.)*\")*\])+)(?: (.*))?",
+    re.DOTALL,
+)
+_SD_ELEMENT = re.compile(r"\[([^\s\]=]+)((?:[^\]\\\"]|\\.|\"(?:[^\"\\]|\\.)*\")*)\]")
+_SD_PARAM = re.compile(r"([^\s=\]\"]+)=\"((?:[^\"\\]|\\.)*)\"")
+_RFC3164 = re.compile(
+    r"(?:" + _PRI + r")?"
+    r"([A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2}|\d{4}-\d{2}-\d{2}T\S+) "
+    r"(\S+) "
+    r"(?:([^\s:\[]+)(?:\[(\d+)\])?: )?"
+    r"(.*)",
+    re.DOTALL,
+)
+_PRI_ONLY = re.compile(_PRI + r"(.*)", re.DOTALL)
+_KV_PAIR = re.compile(r"([A-Za-z_][\w.-]*)=(\"(?:[^\"\\]|\\.)*\"|\S*)")
+
+
+def parse_syslog(text: str) -> Optional[dict[str, str]]:
+    header: dict[str, str] = {}
+    match = _RFC5424.match(text)
+    if match:
+        pri, timestamp, host, app, procid, msgid, structured, message = match.groups()
+        for key, value in (("timestamp", timestamp), ("host", host), ("app", app),
+                           ("pid", procid), ("msgid", msgid)):
+            if value != "-":
+                header[key] = value
+        for sd_id, params in _SD_ELEMENT.findall(structured or ""):
+            for name, value in _SD_PARAM.findall(params):
+                _put(header, f"{sd_id}.{name}", value.replace('\\"', '"'))
+        message = (message or "").removeprefix("\ufeff")
+    elif match := _RFC3164.match(text):
+        pri, timestamp, host, app, pid, message = match.groups()
+        for key, value in (("timestamp", timestamp), ("host", host), ("app", app), ("pid", pid)):
+            _put(header, key, value)
+    elif match := _PRI_ONLY.match(text):
+        # Appliances (FortiGate, ...) that send the priority and nothing else.
+        pri, message = match.groups()
+    else:
+        return None
+
+    if pri is not None:
+        header = {"facility": _FACILITIES[int(pri) >> 3], "severity": _SEVERITIES[int(pri) & 7], **header}
+
+    payload = _parse_payload(message.strip())
+    if payload is None:
+        _put(header, "message", message.strip())
+        return header
+    return {**payload, **{f"syslog.{key}": value for key, value in header.items()}}
+
+
+def _parse_payload(message: str) -> Optional[dict[str, str]]:
+    if message.startswith("CEF:"):
+        return parse_cef(message)
+    if message.startswith("LEEF:"):
+        return parse_leef(message)
+    return _key_values(message)
+
+
+def _key_values(message: str) -> Optional[dict[str, str]]:
+    """key=value pairs, if that is all the message is (firewall logs)."""
+    fields: dict[str, str] = {}
+    pos = 0
+    for match in _KV_PAIR.finditer(message):
+        if message[pos:match.start()].strip():
+            return None
+        value = match.group(2)
+        if value.startswith('"'):
+            value = value[1:-1].replace('\\"', '"')
+        _put(fields, match.group(1), value)
+        pos = match.end()
+    if message[pos:].strip() or len(fields) < 2:
+        return None
+    return fields
+
+
+# -- CSV ---------
+
+def parse_csv(text: str) -> Optional[dict[str, str]]:
+    """A header row and one or more records; with several, keys are "i.column"."""
+    rows = [row for row in csv.reader(io.StringIO(text)) if row]
+    if len(rows) < 2 or len(rows[0]) < 2:
+        return None
+    header = [name.strip() for name in rows[0]]
+    if any(len(row) != len(header) for row in rows[1:]):
+        return None
+    fields: dict[str, str] = {}
+    for i, row in enumerate(rows[1:], start=1):
+        prefix = "" if len(rows) == 2 else f"{i}."
+        for name, value in zip(header, row):
+            _put(fields, prefix + name, value.strip())
+    return fields
+
+
+# -- Sniffing ---------
+
+_SYSLOG_START = re.compile(_PRI + r"|[A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2} \S")
+
+
+def sniff_format(text: str) -> str:
+    """The LogFormat value `text` looks like; "unknown" if none."""
+    head = text[:256]
+    if head.startswith(("{", "[")):
+        return "json"
+    if head.startswith("CEF:"):
+        return "cef"
+    if head.startswith("LEEF:"):
+        return "leef"
+    if _SYSLOG_START.match(head):
+        return "syslog"
+    if "," in head and "\n" in text.strip():
+        rows = list(csv.reader(text.strip().split("\n", 2)[:2]))
+        if len(rows[0]) >= 2 and len(rows[0]) == len(rows[1]):
+            return "csv"
+    return "unknown"
+
+
+_PARSERS = {"cef": parse_cef, "leef": parse_leef, "syslog": parse_syslog, "csv": parse_csv}
+
+
+def parse_log(text: str, format: str) -> Optional[dict[str, str]]:
+    """Fields of a `format` log, or None if it doesn't parse as one.
+    CEF and LEEF behind a syslog header are accepted for those formats."""
+    parser = _PARSERS.get(format)
+    if parser is None:
+        return None
+    fields = parser(text)
+    if fields is None and format in ("cef", "leef"):
+        fields = parse_syslog(text)
+    return fields or None
+
+
+# Rendering for the prompt. Format versions and the syslog facility carry
+# nothing the model maps; header fields get short names.
+_RENDER_SKIP = {"cefVersion", "leefVersion", "facility", "syslog.facility"}
+_RENDER_NAMES = {
+    "deviceVendor": "vendor", "deviceProduct": "product", "deviceVersion": "version",
+    "deviceEventClassId": "event_id", "eventId": "event_id", "timestamp": "time",
+}
+
+
+def render_fields(fields: dict[str, str]) -> str:
+    """
+    Compact key=value lines for the prompt: no quoting, escapes or pipes.
+    The syslog header loses its "syslog." prefix where the payload has no
+    field of that name, and is left out where it repeats one (a CEF
+    severity next to the syslog severity).
+    """
+    lines = []
+    for key, value in fields.items():
+        if key in _RENDER_SKIP:
+            continue
+        if key.startswith("syslog."):
+            name = key[7:]
+            if name in fields:
+                continue
+            key = name
+        key = _RENDER_NAMES.get(key, key)
+        lines.append(f"{key}={value}".replace("\n", "\\n"))
+    return "\n".join(lines)
+
+
+def _put(fields: dict[str, str], key: str, value: Optional[str]) -> None:
+    if value:
+        fields[key] = value
@@ -0,0 +1,59 @@
+"""
+Incremental NDJSON line splitting.
+
+Works on an async iterator of byte chunks (e.g. Request.stream()) and
+holds at most one line in memory, so a multi-gigabyte upload costs no
+more than its longest line.
+"""
+
+from typing import AsyncIterator
+
+# A single alert larger than this is rejected rather than buffered.
+MAX_LINE_BYTES = 4 * 1024 * 1024
+
+
+class LineTooLong(Exception):
+    pass
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int = MAX_LINE_BYTES
+                     ) -> AsyncIterator[tuple[int, bytes | LineTooLong]]:
+    """
+    Yield (line_number, line) for each non-blank line, 1-based.
+
+    A line over `max_line_bytes` is skipped up to its newline and yielded
+    as a LineTooLong instance in place of its content.
+    """
+    buf = bytearray()
+    line_no = 0
+    discarding = False
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end == -1:
+                if not discarding:
+                    buf += chunk[start:]
+                    if len(buf) > max_line_bytes:
+                        discarding = True
+                        buf.clear()
+                break
+
+            line_no += 1
+            if discarding:
+                discarding = False
+                yield line_no, LineTooLong(f"line exceeds {max_line_bytes} bytes")
+            else:
+                buf += chunk[start:end]
+                if len(buf) > max_line_bytes:
+                    yield line_no, LineTooLong(f"line exceeds {max_line_bytes} bytes")
+                elif buf.strip():
+                    yield line_no, bytes(buf)
+            buf.clear()
+            start = end + 1
+
+    if discarding:
+        yield line_no + 1, LineTooLong(f"line exceeds {max_line_bytes} bytes")
+    elif buf.strip():
+        yield line_no + 1, bytes(buf)
@@ -1,49 +1,216 @@
+"""
+Pull the OCSF JSON object out of raw model output.
+
+A complete object is decoded straight from its opening brace with
+JSONDecoder.raw_decode, which ignores prose or ``` fences after it and is
+never confused by braces inside strings (a `cmd_line` full of `{payload}`).
+Otherwise one pass over the text with a string- and escape-aware token
+regex finds where the object ends or where it was cut off.
+
+When generation stopped at max_new_tokens the object never closes. With
+repair on, the scanner remembers the last point where the text was a
+complete value and closes everything still open from there: a truncated
+string value is closed, a dangling partial member (half a key, a key with
+no value, a half-written number or literal) is dropped. The result is
+flagged `repaired` so scoring can dock it.
+"""
+
 import json
 import re
 from typing import Any
 
+# Leading whitespace is folded into each token so indented output doesn't
+# cost a failed match per space. Complete strings are matched whole, so quotes
+# and braces inside them never count as structure. `open_str` only matches a
+# string cut off by the end of the output; `partial` is a half-written escape
+# (`\` or `\u00`) at the cut.
+_TOKEN_RE = re.compile(r'''\s*(?:
+    (?P<open>[{\[])
+  | (?P<close>[}\]])
+  | (?P<comma>,)
+  | (?P<colon>:)
+  | (?P<str>"[^"\\]*(?:\\.[^"\\]*)*")
+  | (?P<lit>[^\s{}\[\],:"]+)
+  | (?P<open_str>"(?:[^"\\]|\\.)*?(?P<partial>\\(?:u[0-9a-fA-F]{0,3})?)?\Z)
+)''', re.VERBOSE | re.DOTALL)
+
+# Give up after this many false starts (a `{` in prose that isn't the object).
+_MAX_STARTS = 8
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+_decoder = json.JSONDecoder()
+
+# What the scanner expects next in the innermost container.
+_KEY, _COLON, _VALUE, _COMMA = range(4)
+
+
+class ParseResult:
+    def __init__(self, data: Any, repaired: bool = False):
+        self.data = data
+        self.repaired = repaired
 
 
 def extract_json(raw_output: str) -> dict[str, Any] | None:
+    """The first complete JSON object in the output, or None. No repair."""
+    result = parse_output(raw_output, repair=False)
+    return result.data if result else None
 
-    try: 
-        return json.loads(raw_output)
-    except json.JSONDecodeError as err: 
+
+def parse_output(raw_output: str, repair: bool = True) -> ParseResult | None:
+    try:
+        return ParseResult(json.loads(raw_output))
+    except json.JSONDecodeError:
         pass
 
-    candidates = []
-    # -- Strategy 1 - Fenced output --
-    strategy1_output = re.search(r"```(?:json)?\s*(.*?)\s*```", raw_output, re.DOTALL)
-    if strategy1_output: 
-        candidates.append(strategy1_output.group(1))
-
-    # -- Strategy 2 - Bracket matching -- 
-    strategy2_output = _bracket_search(raw_output)
-    if strategy2_output:
-        candidates.append(strategy2_output)
-    
-    for candidate in candidates: 
+    start = raw_output.find("{")
+    for _ in range(_MAX_STARTS):
+        if start == -1:
+            return None
+        # Common case: a complete object after some prose or a fence.
+        # raw_decode parses it in C and ignores whatever follows.
         try:
-            return json.loads(candidate)
-        except json.JSONDecodeError as err: 
-            continue
-
+            return ParseResult(_decoder.raw_decode(raw_output, start)[0])
+        except json.JSONDecodeError:
+            pass
+        candidate, repaired = _scan(raw_output, start, repair)
+        if candidate is not None:
+            try:
+                return ParseResult(json.loads(candidate), repaired=repaired)
+            except json.JSONDecodeError:
+                pass
+        start = raw_output.find("{", start + 1)
     return None
 
-    
-def _bracket_search(raw_output: str) -> str | None:
-    counter = 0
-    start = raw_output.find('{')
-    if start == -1: 
-        return None
-    for i in range(start, len(raw_output)):
-        element = raw_output[i]
-        if element == "{":
-            counter += 1 
-        elif element == "}":
-            counter -= 1
-            if counter == 0: 
-                return raw_output[start: i + 1]
-    
-    return None
 
+def _scan(text: str, start: int, repair: bool) -> tuple[str | None, bool]:
+    """
+    Scan one object starting at text[start] == "{".
+
+    Returns (candidate, repaired): the exact object text when it closes,
+    a repaired prefix when the text ends first (and repair is on), or
+    None on a structural error.
+    """
+    stack: list[str] = []
+    state = _VALUE
+    # Last point where closing the open containers yields valid JSON, and
+    # the stack depth there. Every pop moves the cut, so stack[:cut_depth]
+    # is still the stack as it was at the cut.
+    cut, cut_depth = start, 0
+
+    for m in _TOKEN_RE.finditer(text, start):
+        kind = m.lastgroup
+
+        if kind == "str":
+            if state == _KEY:
+                state = _COLON
+            elif state == _VALUE:
+                state = _COMMA
+                cut, cut_depth = m.end(), len(stack)
+            else:
+                return None, False
+
+        elif kind == "colon":
+            if state != _COLON:
+                return None, False
+            state = _VALUE
+
+        elif kind == "comma":
+            if state != _COMMA:
+                return None, False
+            state = _KEY if stack[-1] == "{" else _VALUE
+
+        elif kind == "open":
+            if state != _VALUE:
+                return None, False
+            tok = m.group(kind)
+            stack.append(tok)
+            state = _KEY if tok == "{" else _VALUE
+            cut, cut_depth = m.end(), len(stack)
+
+        elif kind == "close":
+            if not stack or _CLOSERS[stack.pop()] != m.group(kind):
+                return None, False
+            if not stack:
+                return text[start:m.end()], False
+            state = _COMMA
+            cut, cut_depth = m.end(), len(stack)
+
+        elif kind == "lit":
+            if state != _VALUE or not stack:
+                return None, False
+            if m.end() == len(text):
+                # Cut off mid-token: `12` may have been `1234`, `tr` `true`.
+                break
+            state = _COMMA
+            cut, cut_depth = m.end(), len(stack)
+
+        else:  # open_str: the output ends inside a string
+            if state == _VALUE and repair:
+                end = m.start("partial") if m.group("partial") else m.end()
+                return text[start:end] + '"' + _closing(stack), True
+            break
+
+    if not repair or not stack:
+        return None, False
+    return text[start:cut] + _closing(stack[:cut_depth]), True
+
+
+def _closing(stack: list[str]) -> str:
+    return "".join(_CLOSERS[c] for c in reversed(stack))
+
+
+def value_spans(text: str) -> list[tuple[str, int, int]]:
+    """
+    (path, start, end) of every scalar value in the first JSON object in
+    text, in order. Paths look like "finding_info.title" or
+    "evidences[2].process.pid"; string spans exclude the quotes. Stops
+    quietly at the end of a truncated object or at a structural error.
+    """
+    start = text.find("{")
+    if start == -1:
+        return []
+    spans: list[tuple[str, int, int]] = []
+    # Per open container: [is_object, path, current key or next index]
+    stack: list[list] = []
+    state = _VALUE
+    path = ""
+
+    for m in _TOKEN_RE.finditer(text, start):
+        kind = m.lastgroup
+
+        if kind == "str" and state == _KEY:
+            stack[-1][2] = json.loads(m.group(kind))
+            state = _COLON
+        elif kind == "colon" and state == _COLON:
+            state = _VALUE
+        elif kind == "comma" and state == _COMMA:
+            state = _KEY if stack[-1][0] else _VALUE
+        elif kind in ("str", "lit", "open_str", "open") and state == _VALUE:
+            if stack:
+                is_object, base, key = stack[-1]
+                if is_object:
+                    path = f"{base}.{key}" if base else key
+                else:
+                    path = f"{base}[{key}]"
+                    stack[-1][2] = key + 1
+            if kind == "open":
+                is_object = m.group(kind) == "{"
+                stack.append([is_object, path, None if is_object else 0])
+                state = _KEY if is_object else _VALUE
+                continue
+            begin = m.start(kind)
+            end = m.end(kind)
+            if kind != "lit":
+                begin += 1
+                end -= kind == "str"
+            spans.append((path, begin, end))
+            state = _COMMA
+        elif kind == "close" and stack and _CLOSERS["{" if stack[-1][0] else "["] == m.group(kind):
+            stack.pop()
+            if not stack:
+                break
+            state = _COMMA
+        else:
+            break
+    return spans
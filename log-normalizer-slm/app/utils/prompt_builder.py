@@ -1,4 +1,6 @@
+from app.config import settings
 from app.constants import SYSTEM_PROMPT
+from app.utils.raw_log import RawLog
 
 def build_prompt(raw_log, source: str, format: str,  examples: list[dict] | None = None) -> list: 
     message = []
@@ -10,6 +12,8 @@ def build_prompt(raw_log, source: str, format: str,  examples: list[dict] | None
             example = _add_example(example['raw_log'], example['ocsf'], example["source"])
             message.extend(example)
             
+    if isinstance(raw_log, RawLog):
+        raw_log = raw_log.prompt_text if settings.structured_prompts else raw_log.text
     message.append(_make_log_prompt(source, raw_log))
 
     return message
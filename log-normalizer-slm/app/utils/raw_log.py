@@ -0,0 +1,54 @@
+"""
+A raw alert, parsed and serialized at most once per request.
+
+The backend posts raw_log as a JSON object. The request model turns it into
+the string the prompt uses (json.dumps) and keeps the object it came from,
+so scoring doesn't json.loads the string back. String input is parsed
+lazily, once, the first time the prompt or scoring needs it.
+
+CEF, LEEF, syslog and CSV logs (declared, or sniffed when the format is
+"unknown") are parsed into flat fields (app.utils.log_formats). Scoring
+gets the fields as the alert dict, and the prompt can show them as
+key=value lines instead of the raw text.
+"""
+
+import json
+from typing import Any, Optional
+
+from app.utils.log_formats import parse_log, render_fields, sniff_format
+
+
+class RawLog:
+    def __init__(self, text: str, data: Optional[dict[str, Any]] = None, format: str = "unknown"):
+        # The log as sent.
+        self.text = text
+        # Sniffing looks at the first few hundred characters; parsing waits.
+        self.format = sniff_format(text) if format == "unknown" else format
+        self._data = data
+        # Fields parsed from a non-JSON format, if it parsed.
+        self._fields: Optional[dict[str, str]] = None
+
+    @property
+    def data(self) -> dict[str, Any]:
+        """The alert as a dict; logs that don't parse become {"raw": text}."""
+        if self._data is None:
+            self._parse()
+        return self._data
+
+    @property
+    def prompt_text(self) -> str:
+        """Parsed fields as key=value lines, or the text as sent."""
+        if self._data is None:
+            self._parse()
+        return render_fields(self._fields) if self._fields else self.text
+
+    def _parse(self) -> None:
+        if self.format in ("json", "unknown"):
+            try:
+                parsed = json.loads(self.text)
+            except (json.JSONDecodeError, ValueError):
+                parsed = None
+            self._data = parsed if isinstance(parsed, dict) else {"raw": self.text}
+            return
+        self._fields = parse_log(self.text, self.format)
+        self._data = self._fields or {"raw": self.text}
@@ -0,0 +1,101 @@
+"""
+Fast wire formats for normalize traffic.
+
+Responses: orjson by default, msgpack when the client sends
+`Accept: application/msgpack`. Endpoints return these Response objects
+directly, which skips FastAPI's response_model pass (re-validating the
+whole `ocsf` tree the validator already cleaned, then jsonable_encoder,
+then json.dumps).
+
+Requests: NegotiatedRoute lets a route accept msgpack bodies
+(`Content-Type: application/msgpack`) alongside JSON.
+"""
+
+from typing import Any, Callable
+
+import msgpack
+import orjson
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+MSGPACK_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class ORJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default)
+
+
+class MsgpackResponse(Response):
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, default=_default)
+
+
+def wants_msgpack(accept: str | None) -> bool:
+    return bool(accept) and any(t in accept for t in MSGPACK_TYPES)
+
+
+def negotiated_response(content: Any, accept: str | None, status_code: int = 200) -> Response:
+    response_class = MsgpackResponse if wants_msgpack(accept) else ORJSONResponse
+    return response_class(content=content, status_code=status_code)
+
+
+def shallow_dump(model: BaseModel) -> dict:
+    """Top-level fields as-is. Nested dicts (ocsf) are handed to the encoder
+    untouched instead of being copied by model_dump()."""
+    return {name: _shallow(getattr(model, name)) for name in type(model).model_fields}
+
+
+def _shallow(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return shallow_dump(value)
+    if isinstance(value, list):
+        return [_shallow(v) for v in value]
+    return value
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return shallow_dump(obj)
+    raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+
+class NegotiatedRoute(APIRoute):
+    """APIRoute that decodes msgpack request bodies.
+
+    FastAPI only parses bodies whose content type is JSON, so the decoded
+    payload is pre-seeded as the request's cached JSON and the content type
+    rewritten; body validation then runs exactly as for a JSON request.
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            content_type = request.headers.get("content-type", "")
+            if content_type.split(";")[0].strip() in MSGPACK_TYPES:
+                try:
+                    request = await _as_json_request(request)
+                except ValueError as err:
+                    return ORJSONResponse(status_code=400, content={"error": f"Invalid msgpack body: {err or type(err).__name__}"})
+            return await handler(request)
+
+        return route_handler
+
+
+async def _as_json_request(request: Request) -> Request:
+    body = await request.body()
+    scope = dict(request.scope)
+    scope["headers"] = [
+        (k, b"application/json" if k == b"content-type" else v)
+        for k, v in request.scope["headers"]
+    ]
+    decoded = Request(scope, request.receive)
+    decoded._body = body
+    decoded._json = msgpack.unpackb(body) if body else None
+    return decoded
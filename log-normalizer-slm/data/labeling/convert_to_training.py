@@ -12,7 +12,7 @@ import json
 import sys
 from pathlib import Path
 
-from app.constants import SYSTEM_PROMPT
+from app.constants import SYSTEM_PROMPT, OCSF_HEADER, ASSISTANT_PREFIX
 
 def build_user_message(source: str, raw_log: dict) -> str:
     """Build the user prompt with vendor context + raw log."""
@@ -21,8 +21,13 @@ def build_user_message(source: str, raw_log: dict) -> str:
 
 
 def build_assistant_message(ocsf: dict) -> str:
-    """Build the assistant response — pure JSON, no wrapping."""
-    return json.dumps(ocsf, indent=2, ensure_ascii=False)
+    """Build the assistant response — pure JSON, no wrapping.
+
+    The OCSF header keys go first, in serving order, so every response
+    starts with ASSISTANT_PREFIX; train.py moves that prefix into the prompt
+    the same way the server prefills it.
+    """
+    return json.dumps({**OCSF_HEADER, **ocsf}, indent=2, ensure_ascii=False)
 
 
 def convert_label(label: dict) -> dict:
@@ -66,6 +71,7 @@ def main():
 
     # Stats
     sys_tokens = len(SYSTEM_PROMPT) // 4
+    prefix_tokens = len(ASSISTANT_PREFIX) // 4
     user_tokens = []
     asst_tokens = []
     total_tokens = []
@@ -84,6 +90,8 @@ def main():
     print(f"  System prompt: ~{sys_tokens} tokens (fixed per example)")
     print(f"  User (raw log): avg ~{sum(user_tokens)//len(user_tokens)}, max ~{max(user_tokens)}")
     print(f"  Assistant (OCSF): avg ~{sum(asst_tokens)//len(asst_tokens)}, max ~{max(asst_tokens)}")
+    print(f"  Prefilled header: ~{prefix_tokens} tokens per example not generated "
+          f"(~{100 * prefix_tokens / (sum(asst_tokens) / len(asst_tokens)):.1f}% of avg output)")
     print(f"  Total per example: avg ~{sum(total_tokens)//len(total_tokens)}, max ~{max(total_tokens)}")
     print(f"\n  Foundation-Sec context: 64K tokens — all examples fit ✓")
 
@@ -99,11 +107,14 @@ def main():
         try:
             parsed = json.loads(msgs[2]["content"])
             assert parsed.get("class_uid") == 2004, f"Row {i}: class_uid != 2004"
+            assert msgs[2]["content"].startswith(ASSISTANT_PREFIX), \
+                f"Row {i}: OCSF header differs from ASSISTANT_PREFIX, prefill would not match"
         except json.JSONDecodeError:
             print(f"  ❌ Row {i}: assistant content is not valid JSON!")
     print(f"  ✓ All {len(chat_data)} rows pass structure validation")
     print(f"  ✓ All assistant responses parse as valid JSON")
     print(f"  ✓ All class_uid == 2004")
+    print(f"  ✓ All assistant responses start with the prefilled OCSF header")
 
     # Show first example
     print(f"\n{'='*60}")
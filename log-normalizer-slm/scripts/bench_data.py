@@ -0,0 +1,161 @@
+"""
+Synthetic alerts for the benchmark scripts.
+
+Shaped like the largest vendor outputs we see (Microsoft Defender and
+Sentinel incidents with many evidences), so benchmarks can run without
+the labeled corpus. Each generator returns (raw_alert, ocsf) with values
+in the OCSF output drawn from the raw alert, as the model would produce.
+"""
+
+import random
+
+_TACTICS = [("TA0002", "Execution"), ("TA0003", "Persistence"), ("TA0005", "Defense Evasion"),
+            ("TA0006", "Credential Access"), ("TA0008", "Lateral Movement")]
+_TECHNIQUES = [("T1059.001", "PowerShell"), ("T1003", "OS Credential Dumping"),
+               ("T1021.002", "SMB/Windows Admin Shares"), ("T1547.001", "Registry Run Keys")]
+
+
+def _sha256(rng: random.Random) -> str:
+    return "".join(rng.choice("0123456789abcdef") for _ in range(64))
+
+
+def _ip(rng: random.Random) -> str:
+    return f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+
+
+def defender_alert(n_evidences: int = 40, seed: int = 0) -> tuple[dict, dict]:
+    rng = random.Random(seed)
+    host = f"WKS-{rng.randint(1000, 9999)}"
+    user = f"corp\\user{rng.randint(1, 500)}"
+    processes = []
+    for i in range(n_evidences):
+        processes.append({
+            "processId": 4000 + i,
+            "fileName": f"proc{i}.exe",
+            "filePath": f"C:\\Windows\\Temp\\stage{i}",
+            "processCommandLine": f"powershell.exe -nop -w hidden -enc {_sha256(rng)[:48]} {{payload-{i}}}",
+            "sha256": _sha256(rng),
+            "accountName": user,
+            "remoteIp": _ip(rng),
+            "remotePort": rng.choice([443, 445, 3389, 8080]),
+        })
+    raw = {
+        "alertId": f"da{rng.getrandbits(64):016x}",
+        "title": "Suspicious PowerShell command line",
+        "description": "A process executed a suspicious encoded PowerShell command. " * 4,
+        "severity": "High",
+        "status": "New",
+        "category": "Execution",
+        "computerDnsName": host,
+        "machineId": f"{rng.getrandbits(160):040x}",
+        "createdDateTime": "2024-05-01T12:00:00.1234567Z",
+        "mitreTechniques": [t for t, _ in _TECHNIQUES],
+        "evidence": processes,
+    }
+    ocsf = _base_ocsf(raw["title"], raw["alertId"], raw["description"], 4, "High",
+                      "Microsoft Defender for Endpoint", "Microsoft")
+    ocsf["device"] = {"hostname": host, "uid": raw["machineId"], "type_id": 2}
+    ocsf["evidences"] = [
+        {
+            "process": {
+                "pid": p["processId"], "name": p["fileName"], "cmd_line": p["processCommandLine"],
+                "file": {"name": p["fileName"], "path": p["filePath"],
+                         "hashes": [{"algorithm": "SHA-256", "algorithm_id": 3, "value": p["sha256"]}]},
+                "user": {"name": p["accountName"]},
+            },
+            "dst_endpoint": {"ip": p["remoteIp"], "port": p["remotePort"]},
+        }
+        for p in processes
+    ]
+    ocsf["observables"] = _observables(host, processes)
+    return raw, ocsf
+
+
+def sentinel_incident(n_entities: int = 60, seed: int = 1) -> tuple[dict, dict]:
+    rng = random.Random(seed)
+    entities = []
+    for i in range(n_entities):
+        entities.append({
+            "kind": rng.choice(["Ip", "Account", "Host"]),
+            "address": _ip(rng),
+            "accountName": f"svc_account_{i}",
+            "hostName": f"SRV-{i:03d}",
+            "upn": f"user{i}@contoso.com",
+        })
+    raw = {
+        "name": f"{rng.getrandbits(128):032x}",
+        "properties": {
+            "title": "Multi-stage incident involving Credential Access & Lateral Movement",
+            "description": "Correlated alerts across identity, endpoint and network sources. " * 6,
+            "severity": "Medium",
+            "status": "Active",
+            "incidentNumber": rng.randint(10000, 99999),
+            "createdTimeUtc": "2024-05-02T08:30:00Z",
+            "incidentUrl": "https://portal.azure.com/#asset/Microsoft_Azure_Security_Insights/Incident/x",
+            "relatedEntities": entities,
+        },
+    }
+    props = raw["properties"]
+    ocsf = _base_ocsf(props["title"], raw["name"], props["description"], 3, "Medium",
+                      "Microsoft Sentinel", "Microsoft")
+    ocsf["finding_info"]["src_url"] = props["incidentUrl"]
+    ocsf["evidences"] = [
+        {
+            "src_endpoint": {"ip": e["address"], "hostname": e["hostName"]},
+            "actor": {"user": {"name": e["accountName"], "email_addr": e["upn"]}},
+        }
+        for e in entities
+    ]
+    ocsf["observables"] = [
+        {"name": "src_endpoint.ip", "type": "IP Address", "type_id": 2, "value": e["address"]}
+        for e in entities
+    ]
+    ocsf["unmapped"] = {"incidentNumber": props["incidentNumber"]}
+    return raw, ocsf
+
+
+def corpus(n: int = 50) -> list[tuple[str, dict, dict]]:
+    """(source, raw, ocsf) triples alternating vendors and sizes."""
+    items = []
+    for i in range(n):
+        if i % 2:
+            items.append(("sentinel", *sentinel_incident(10 + (i * 7) % 80, seed=i)))
+        else:
+            items.append(("microsoft", *defender_alert(5 + (i * 5) % 60, seed=i)))
+    return items
+
+
+def _base_ocsf(title, uid, desc, severity_id, severity, product, vendor) -> dict:
+    return {
+        "activity_id": 1,
+        "activity_name": "Create",
+        "category_uid": 2,
+        "category_name": "Findings",
+        "class_uid": 2004,
+        "class_name": "Detection Finding",
+        "type_uid": 200401,
+        "time": "2024-05-01T12:00:00Z",
+        "severity_id": severity_id,
+        "severity": severity,
+        "status": "New",
+        "is_alert": True,
+        "finding_info": {
+            "title": title,
+            "uid": uid,
+            "desc": desc,
+            "created_time": "2024-05-01T12:00:00Z",
+            "attacks": [
+                {"tactic": {"uid": ta, "name": tn}, "technique": {"uid": te, "name": tq}}
+                for (ta, tn), (te, tq) in zip(_TACTICS, _TECHNIQUES)
+            ],
+        },
+        "metadata": {"version": "1.7.0", "product": {"name": product, "vendor_name": vendor}},
+    }
+
+
+def _observables(host: str, processes: list[dict]) -> list[dict]:
+    obs = [{"name": "device.hostname", "type": "Hostname", "type_id": 1, "value": host}]
+    for p in processes:
+        obs.append({"name": "file.hash", "type": "Hash", "type_id": 8, "value": p["sha256"]})
+        obs.append({"name": "dst_endpoint.ip", "type": "IP Address", "type_id": 2, "value": p["remoteIp"]})
+    return obs
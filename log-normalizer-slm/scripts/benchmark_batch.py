@@ -0,0 +1,96 @@
+"""
+Benchmark /api/normalize/batch against N sequential /api/normalize calls.
+
+Runs against a live service so it measures what the backend would see:
+HTTP, validation, scheduling and generation.
+
+Usage:
+    python scripts/benchmark_batch.py --url http://localhost:8000 --input alerts.jsonl -n 16
+    python scripts/benchmark_batch.py -n 8            # synthetic alerts
+
+Input lines are {"raw_log": ..., "source": ..., "format": ...}.
+"""
+
+import argparse
+import json
+import time
+
+import httpx
+
+
+def load_alerts(path: str | None, n: int) -> list[dict]:
+    if path:
+        alerts = []
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    alerts.append(json.loads(line))
+                if len(alerts) >= n:
+                    break
+        return alerts
+
+    return [
+        {
+            "raw_log": {
+                "id": f"alert-{i}",
+                "display_name": "Suspicious PowerShell execution",
+                "severity": 40 + i,
+                "hostname": f"WS-{i:04d}",
+                "cmdline": "powershell.exe -enc " + "A" * (50 * (i % 5 + 1)),
+                "created_timestamp": "2024-05-01T12:00:00Z",
+            },
+            "source": "crowdstrike",
+            "format": "json",
+        }
+        for i in range(n)
+    ]
+
+
+def run_sequential(client: httpx.Client, alerts: list[dict]) -> tuple[float, list[dict]]:
+    start = time.perf_counter()
+    results = []
+    for alert in alerts:
+        res = client.post("/api/normalize", json=alert)
+        res.raise_for_status()
+        results.append(res.json())
+    return time.perf_counter() - start, results
+
+
+def run_batch(client: httpx.Client, alerts: list[dict]) -> tuple[float, list[dict]]:
+    start = time.perf_counter()
+    res = client.post("/api/normalize/batch", json=alerts)
+    res.raise_for_status()
+    return time.perf_counter() - start, res.json()["results"]
+
+
+def summarize(name: str, elapsed: float, results: list[dict]) -> None:
+    errors = sum(1 for r in results if r.get("error"))
+    decisions = {}
+    for r in results:
+        decisions[r["decision"]] = decisions.get(r["decision"], 0) + 1
+    print(f"  {name:<12} total {elapsed:8.2f}s   per alert {elapsed / len(results):6.2f}s   "
+          f"errors {errors}   decisions {decisions}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--input", help="JSONL of normalize request bodies")
+    parser.add_argument("-n", type=int, default=8, help="number of alerts")
+    args = parser.parse_args()
+
+    alerts = load_alerts(args.input, args.n)
+    print(f"Benchmarking {len(alerts)} alerts against {args.url}\n")
+
+    with httpx.Client(base_url=args.url, timeout=None) as client:
+        seq_time, seq_results = run_sequential(client, alerts)
+        batch_time, batch_results = run_batch(client, alerts)
+
+    summarize("sequential", seq_time, seq_results)
+    summarize("batch", batch_time, batch_results)
+    print(f"\n  speedup: {seq_time / batch_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark field coverage and schema presence scoring.
+
+Compares the previous per-path walk (split every dotted path, walk it from
+the root, once per tier) against the compiled FieldTrie that counts all
+tiers in one traversal. Checks that both give the same scores on every
+output.
+
+Usage:
+    python scripts/benchmark_coverage.py [-n 200] [--repeat 5]
+    python scripts/benchmark_coverage.py --labels data/labeled/labeled_output_training.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ocsf.ocsf_constants import (
+    COVERAGE_WEIGHTS, DETECTION_FINDING_RECOMMENDED, DETECTION_FINDING_REQUIRED,
+    DETECTION_FINDING_RICHNESS,
+)
+from app.scoring.confidence import _REQUIRED_NESTED, _REQUIRED_TOP, _TIERS, _coverage
+from bench_data import corpus
+
+
+def legacy_count(data: dict, expected: list[str]) -> int:
+    count = 0
+    for path in expected:
+        obj = data
+        found = True
+        for part in path.split("."):
+            if isinstance(obj, dict) and part in obj:
+                obj = obj[part]
+            else:
+                found = False
+                break
+        if found and obj is not None:
+            count += 1
+    return count
+
+
+def legacy_schema_presence(ocsf: dict) -> int:
+    present = sum(1 for f in _REQUIRED_TOP if f in ocsf)
+    for parent_path, children in _REQUIRED_NESTED.items():
+        obj = ocsf
+        for p in parent_path.split("."):
+            obj = obj.get(p, {}) if isinstance(obj, dict) else {}
+        if isinstance(obj, dict):
+            present += sum(1 for f in children if f in obj)
+    return present
+
+
+def legacy(ocsf: dict) -> tuple[float, int]:
+    coverage = sum(
+        COVERAGE_WEIGHTS[tier] * legacy_count(ocsf, fields) / len(fields)
+        for tier, fields in (("required", DETECTION_FINDING_REQUIRED),
+                             ("recommended", DETECTION_FINDING_RECOMMENDED),
+                             ("richness", DETECTION_FINDING_RICHNESS))
+    )
+    return coverage, legacy_schema_presence(ocsf)
+
+
+def trie(ocsf: dict) -> tuple[float, int]:
+    counts = _TIERS.count(ocsf)
+    return _coverage(counts), counts["schema"]
+
+
+def load_outputs(path: str | None, n: int) -> list[dict]:
+    if path:
+        with open(path) as f:
+            return [json.loads(line)["ocsf"] for line in f if line.strip()]
+    return [ocsf for _, _, ocsf in corpus(n)]
+
+
+def best_of(fn, items: list[dict], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--labels", help="labeled JSONL with an `ocsf` field per line")
+    parser.add_argument("-n", type=int, default=200, help="synthetic alerts when --labels is not given")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    outputs = load_outputs(args.labels, args.n)
+    mismatches = sum(1 for o in outputs if abs(legacy(o)[0] - trie(o)[0]) > 1e-12 or legacy(o)[1] != trie(o)[1])
+
+    legacy_t = best_of(legacy, outputs, args.repeat)
+    trie_t = best_of(trie, outputs, args.repeat)
+    print(f"{len(outputs)} outputs, best of {args.repeat}")
+    print(f"  per-path walk: {legacy_t / len(outputs) * 1e6:8.2f} us/output")
+    print(f"  field trie:    {trie_t / len(outputs) * 1e6:8.2f} us/output   ({legacy_t / trie_t:.2f}x)")
+    print(f"  outputs scored differently: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Import-time check for the API process.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter
+and fails (exit 1) if
+  - any ML module (torch, transformers, peft, ...) is imported, or
+  - the cumulative import time of app.main exceeds the budget.
+
+Usage:
+    python scripts/benchmark_import_time.py [--budget-ms 1500] [--top 15]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must only be imported by the background model load.
+FORBIDDEN = ("torch", "transformers", "peft", "bitsandbytes", "accelerate")
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str = "app.main") -> dict[str, tuple[int, int]]:
+    """Module name -> (self_us, cumulative_us) from -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    timings = {}
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            timings[m.group(4)] = (int(m.group(1)), int(m.group(2)))
+    return timings
+
+
+def check(budget_ms: float, module: str = "app.main") -> list[str]:
+    timings = measure(module)
+    problems = []
+
+    heavy = sorted({name.split(".")[0] for name in timings} & set(FORBIDDEN))
+    if heavy:
+        problems.append(f"{module} imports ML modules at startup: {', '.join(heavy)}")
+
+    total_ms = timings[module][1] / 1000
+    if total_ms > budget_ms:
+        problems.append(f"{module} import took {total_ms:.0f}ms, budget is {budget_ms:.0f}ms")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=1500)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--module", default="app.main")
+    args = parser.parse_args()
+
+    timings = measure(args.module)
+    total_ms = timings[args.module][1] / 1000
+    print(f"{args.module}: {total_ms:.0f}ms cumulative (budget {args.budget_ms:.0f}ms)\n")
+    print(f"  {'self ms':>8}  {'cumul ms':>8}  module")
+    for name, (self_us, cum_us) in sorted(timings.items(), key=lambda kv: -kv[1][0])[:args.top]:
+        print(f"  {self_us / 1000:8.1f}  {cum_us / 1000:8.1f}  {name}")
+
+    problems = check(args.budget_ms, args.module)
+    if problems:
+        print()
+        for p in problems:
+            print(f"FAIL: {p}")
+        sys.exit(1)
+    print("\nOK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark JSON extraction from raw model output.
+
+Compares the previous regex + bracket-counting extractor against
+parse_output() on large synthetic outputs in the shapes the model
+produces: bare JSON, JSON wrapped in prose and ``` fences, and output
+cut off at max_new_tokens. Reports time per call and how many outputs
+each approach recovers.
+
+Usage:
+    python scripts/benchmark_json_extract.py [--evidences 200] [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.ocsf_parser import parse_output
+from bench_data import defender_alert, sentinel_incident
+
+
+def legacy_extract(raw_output: str):
+    """The extractor parse_output replaced: fence regex, then brace counting
+    that ignores string literals."""
+    try:
+        return json.loads(raw_output)
+    except json.JSONDecodeError:
+        pass
+    candidates = []
+    fenced = re.search(r"```(?:json)?\s*(.*?)\s*```", raw_output, re.DOTALL)
+    if fenced:
+        candidates.append(fenced.group(1))
+    counter, start = 0, raw_output.find("{")
+    if start != -1:
+        for i in range(start, len(raw_output)):
+            if raw_output[i] == "{":
+                counter += 1
+            elif raw_output[i] == "}":
+                counter -= 1
+                if counter == 0:
+                    candidates.append(raw_output[start:i + 1])
+                    break
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def new_extract(raw_output: str):
+    result = parse_output(raw_output)
+    return result.data if result else None
+
+
+def cases(n_evidences: int) -> dict[str, str]:
+    defender = json.dumps(defender_alert(n_evidences)[1], indent=2)
+    sentinel = json.dumps(sentinel_incident(n_evidences)[1], indent=2)
+    return {
+        "bare": defender,
+        "prose + fence": f"Here is the OCSF output:\n```json\n{sentinel}\n```\nLet me know if {{anything}} else.",
+        # Cut inside the last third, as happens at max_new_tokens.
+        "truncated": defender[:int(len(defender) * 0.8)],
+        "prose + truncated": "Sure: " + sentinel[:int(len(sentinel) * 0.7)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--evidences", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{args.evidences} evidences per output\n")
+    print(f"  {'case':<18} {'KiB':>6}   {'legacy us':>10} {'ok':>3}   {'new us':>10} {'ok':>3} {'repaired':>8}")
+    for name, text in cases(args.evidences).items():
+        legacy_ok = legacy_extract(text) is not None
+        result = parse_output(text)
+        legacy_t = timeit.timeit(lambda: legacy_extract(text), number=args.repeat) / args.repeat
+        new_t = timeit.timeit(lambda: new_extract(text), number=args.repeat) / args.repeat
+        print(f"  {name:<18} {len(text) / 1024:6.1f}   {legacy_t * 1e6:10.1f} {'y' if legacy_ok else 'n':>3}   "
+              f"{new_t * 1e6:10.1f} {'y' if result else 'n':>3} {'y' if result and result.repaired else '-':>8}")
+
+
+if __name__ == "__main__":
+    main()
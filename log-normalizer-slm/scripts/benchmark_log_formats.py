@@ -0,0 +1,95 @@
+"""
+Benchmark sniffing and parsing non-JSON logs, and what it does to the prompt.
+
+Generates a batch of syslog lines in the shapes we receive (RFC 3164 with
+a plain message, RFC 5424 with structured data, CEF and LEEF behind a
+syslog header, bare key=value firewall logs) and times RawLog on each:
+sniff, parse, and render the key=value lines the prompt shows. Also
+reports how many characters the prompt gains or loses compared with the
+raw text; prompt tokens are what the scheduler and the GPU pay for.
+
+Usage:
+    python scripts/benchmark_log_formats.py [--lines 20000] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.raw_log import RawLog
+
+
+def _ip(rng: random.Random) -> str:
+    return f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+
+
+def syslog_line(rng: random.Random) -> str:
+    pri = rng.choice([4, 10, 13, 34, 86, 134, 165, 189])
+    host = f"host{rng.randint(1, 99):02d}"
+    src, dst = _ip(rng), _ip(rng)
+    kind = rng.randrange(5)
+    if kind == 0:
+        return (f"<{pri}>Oct 11 22:14:{rng.randint(10, 59)} {host} sshd[{rng.randint(100, 9999)}]: "
+                f"Failed password for invalid user admin from {src} port {rng.randint(1024, 65535)} ssh2")
+    if kind == 1:
+        return (f'<{pri}>1 2024-05-01T12:00:00.{rng.randint(0, 999):03d}Z {host} auditd {rng.randint(100, 9999)} '
+                f'ID47 [origin ip="{src}" software="auditd"][meta sequenceId="{rng.randint(1, 10**6)}"] '
+                f'user root executed /usr/bin/curl {dst}')
+    if kind == 2:
+        return (f"<{pri}>May  1 12:00:00 fw01 CEF:0|Palo Alto Networks|PAN-OS|10.1|THREAT|virus|8|"
+                f"src={src} dst={dst} spt={rng.randint(1024, 65535)} dpt=443 act=blocked "
+                f"suser=corp\\\\user{rng.randint(1, 500)} cs1Label=Rule cs1=block-malware "
+                f"msg=Eicar test file detected in HTTP download")
+    if kind == 3:
+        return (f"<{pri}>May  1 12:00:00 qradar LEEF:1.0|Microsoft|MSExchange|4.0 SP1|15345|"
+                f"src={src}\tdst={dst}\tsev={rng.randint(1, 10)}\tusrName=user{rng.randint(1, 500)}")
+    return (f'<{pri}>date=2024-05-01 time=12:00:00 devname="FG-{rng.randint(100, 999)}" '
+            f'type=traffic subtype=forward level=notice srcip={src} dstip={dst} '
+            f'dstport=443 action=deny policyid={rng.randint(1, 200)} service="HTTPS"')
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lines = [syslog_line(rng) for _ in range(args.lines)]
+    total_bytes = sum(len(line.encode()) for line in lines)
+
+    start = time.perf_counter()
+    logs = [RawLog(line) for line in lines]
+    t_sniff = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for log in logs:
+        log.data
+    t_parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    prompts = [log.prompt_text for log in logs]
+    t_render = time.perf_counter() - start
+
+    parsed = sum(1 for log in logs if "raw" not in log.data)
+    formats = Counter(log.format for log in logs)
+    raw_chars = sum(len(line) for line in lines)
+    prompt_chars = sum(len(prompt) for prompt in prompts)
+    elapsed = t_sniff + t_parse + t_render
+
+    print(f"{args.lines} lines, {total_bytes / 2**20:.1f} MiB ({dict(formats)})")
+    print(f"parsed into fields: {parsed}/{args.lines}\n")
+    for name, seconds in (("sniff", t_sniff), ("parse", t_parse), ("render", t_render), ("total", elapsed)):
+        print(f"  {name:<7} {seconds * 1e6 / args.lines:7.1f} us/line")
+    print(f"\n  {args.lines / elapsed:,.0f} lines/s, {total_bytes / 2**20 / elapsed:.1f} MiB/s")
+    print(f"  prompt text: {prompt_chars / raw_chars:.2f}x the raw characters "
+          f"({raw_chars / args.lines:.0f} -> {prompt_chars / args.lines:.0f} per line)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Sweep quantization x compute dtype x attention implementation.
+
+For each combination the model (and adapter, if present) is loaded fresh
+and run over the same fixed alert set. Reports per combination:
+load time, mean latency per alert, decode tokens/sec, peak GPU memory
+(peak process RSS while the combination runs, on CPU) and the share of
+outputs extract_json could parse. Prompts are built from NormalizeRequest
+as the server builds them.
+
+Usage:
+    python scripts/benchmark_precision.py -n 8
+    python scripts/benchmark_precision.py --quantization none,4bit-nf4 --dtype bfloat16 \\
+        --attn sdpa,flash_attention_2 --input alerts.jsonl --json results.json
+
+Input lines are {"raw_log": ..., "source": ..., "format": ...}; without
+--input a fixed synthetic set from bench_data is used.
+"""
+
+import argparse
+import gc
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import psutil
+
+from app.config import settings, QUANTIZATION_MODES
+from app.models.model_loader import ModelManager
+from app.schemas.request import NormalizeRequest
+from app.utils.ocsf_parser import extract_json
+from app.utils.prompt_builder import build_prompt
+from bench_data import corpus
+
+
+def csv_list(value: str) -> list[str]:
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+def request_prompt(req: NormalizeRequest) -> list[dict]:
+    return build_prompt(req.raw, req.source, req.format, examples=None)
+
+
+def load_prompts(path: str | None, n: int, max_evidences: int) -> list[list[dict]]:
+    if path:
+        prompts = []
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                prompts.append(request_prompt(NormalizeRequest(**{"source": "unknown", **json.loads(line)})))
+                if len(prompts) >= n:
+                    break
+        return prompts
+
+    prompts = []
+    for source, raw, _ in corpus(n):
+        if "evidence" in raw:
+            raw["evidence"] = raw["evidence"][:max_evidences]
+        if "properties" in raw:
+            raw["properties"]["relatedEntities"] = raw["properties"]["relatedEntities"][:max_evidences]
+        prompts.append(request_prompt(NormalizeRequest(raw_log=raw, source=source)))
+    return prompts
+
+
+class RssPeak:
+    """Samples process RSS in a thread; ru_maxrss would carry the peak of
+    earlier combinations over into later ones."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def _sample(self) -> None:
+        process = psutil.Process()
+        while True:
+            self.peak = max(self.peak, process.memory_info().rss)
+            if self._stop.wait(self.interval):
+                return
+
+    def stop(self) -> int:
+        self._stop.set()
+        self._thread.join()
+        return self.peak
+
+
+def peak_memory_mb(rss: RssPeak) -> float:
+    import torch
+
+    peak_rss = rss.stop()
+    if torch.cuda.is_available():
+        return torch.cuda.max_memory_allocated() / 2**20
+    return peak_rss / 2**20
+
+
+def reset_memory() -> None:
+    import torch
+
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+        torch.cuda.reset_peak_memory_stats()
+
+
+def run_combination(prompts: list[list[dict]], quantization: str, dtype: str,
+                    attn: str | None) -> dict:
+    from app.models.inference import run_inference
+
+    settings.quantization = quantization
+    settings.compute_dtype = dtype
+    settings.attn_implementation = attn
+    settings.static_cache = False
+
+    row = {"quantization": quantization, "compute_dtype": dtype, "attn": attn or "default"}
+    reset_memory()
+    rss = RssPeak()
+    manager = ModelManager()
+    start = time.perf_counter()
+    manager.load()
+    row["load_seconds"] = time.perf_counter() - start
+    if not manager.is_ready:
+        rss.stop()
+        row["error"] = manager.load_error
+        return row
+
+    latencies, tokens, decode_seconds, parsed = [], 0, 0.0, 0
+    for prompt in prompts:
+        start = time.perf_counter()
+        result = run_inference(manager.model, manager.tokenizer, prompt, settings)
+        latencies.append(time.perf_counter() - start)
+        tokens += result.output_tokens
+        decode_seconds += result.elapsed_seconds
+        if extract_json(result.text) is not None:
+            parsed += 1
+
+    row.update({
+        "mean_latency_seconds": sum(latencies) / len(latencies),
+        "tokens_per_second": tokens / decode_seconds if decode_seconds else 0.0,
+        "peak_memory_mb": peak_memory_mb(rss),
+        "json_parse_rate": parsed / len(prompts),
+    })
+
+    del manager
+    reset_memory()
+    return row
+
+
+def print_table(rows: list[dict]) -> None:
+    print(f"\n  {'quant':<9} {'dtype':<9} {'attn':<18} {'load s':>7} {'lat s':>7} "
+          f"{'tok/s':>7} {'peak MB':>9} {'parsed':>7}")
+    for r in rows:
+        head = f"  {r['quantization']:<9} {r['compute_dtype']:<9} {r['attn']:<18} {r['load_seconds']:7.1f}"
+        if "error" in r:
+            print(f"{head}   failed: {r['error']}")
+            continue
+        print(f"{head} {r['mean_latency_seconds']:7.2f} {r['tokens_per_second']:7.1f} "
+              f"{r['peak_memory_mb']:9.0f} {r['json_parse_rate']:7.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", type=int, default=8, help="number of alerts")
+    parser.add_argument("--input", help="JSONL of normalize request bodies")
+    parser.add_argument("--max-evidences", type=int, default=10,
+                        help="cap evidences per synthetic alert")
+    parser.add_argument("--quantization", type=csv_list, default=list(QUANTIZATION_MODES))
+    parser.add_argument("--dtype", type=csv_list, default=["bfloat16", "float16"])
+    parser.add_argument("--attn", type=csv_list, default=["sdpa", "eager"],
+                        help="attention implementations; 'default' leaves it to transformers")
+    parser.add_argument("--max-new-tokens", type=int, default=None)
+    parser.add_argument("--json", help="also write the rows to this file")
+    args = parser.parse_args()
+
+    if args.max_new_tokens:
+        settings.max_new_tokens = args.max_new_tokens
+
+    prompts = load_prompts(args.input, args.n, args.max_evidences)
+    combos = list(itertools.product(args.quantization, args.dtype, args.attn))
+    print(f"{len(combos)} combinations x {len(prompts)} alerts")
+
+    rows = []
+    for quantization, dtype, attn in combos:
+        print(f"  -> {quantization} / {dtype} / {attn}", flush=True)
+        rows.append(run_combination(prompts, quantization, dtype, None if attn == "default" else attn))
+
+    print_table(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
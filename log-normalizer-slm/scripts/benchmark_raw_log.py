@@ -0,0 +1,73 @@
+"""
+Benchmark the raw-alert serialization passes per normalize request.
+
+Before: the request validator json.dumps'd the raw_log object, the
+normalizer json.loads'd that string back into a dict, and
+compute_confidence json.dumps'd the dict again. Now the request keeps the
+object next to the string (RawLog), so the alert is serialized once and
+scoring works from the dict.
+
+Both paths below do request validation plus the raw-alert work scoring
+needed at the time.
+
+Usage:
+    python scripts/benchmark_raw_log.py [--kib 100] [--repeat 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.schemas.request import NormalizeRequest
+from bench_data import defender_alert
+
+
+def alert_of_size(kib: int) -> dict:
+    n = 1
+    while True:
+        raw, _ = defender_alert(n)
+        if len(json.dumps(raw)) >= kib * 1024:
+            return raw
+        n += 5
+
+
+def before(body: dict) -> tuple[dict, str]:
+    req = NormalizeRequest(**body)
+    try:
+        raw_dict = json.loads(req.raw_log)
+        if not isinstance(raw_dict, dict):
+            raw_dict = {"raw": req.raw_log}
+    except (json.JSONDecodeError, ValueError):
+        raw_dict = {"raw": req.raw_log}
+    return raw_dict, json.dumps(raw_dict)
+
+
+def after(body: dict) -> tuple[dict, str]:
+    req = NormalizeRequest(**body)
+    return req.raw.data, req.raw_log
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kib", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    raw = alert_of_size(args.kib)
+    body = {"raw_log": raw, "source": "microsoft", "format": "json"}
+    assert before(body) == after(body)
+
+    print(f"raw_log object: {len(json.dumps(raw)) / 1024:.0f} KiB\n")
+    t_before = timeit.timeit(lambda: before(body), number=args.repeat) / args.repeat
+    t_after = timeit.timeit(lambda: after(body), number=args.repeat) / args.repeat
+    print(f"  dumps + loads + dumps  {t_before * 1e3:8.3f} ms")
+    print(f"  dumps once (RawLog)    {t_after * 1e3:8.3f} ms")
+    print(f"\n  saved {(t_before - t_after) * 1e3:.3f} ms per request ({t_before / t_after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
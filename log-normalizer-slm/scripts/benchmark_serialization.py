@@ -0,0 +1,78 @@
+"""
+Benchmark response serialization for large normalize outputs.
+
+Compares what FastAPI does with response_model=NormalizeResponse
+(re-validate the model, jsonable_encoder, json.dumps) against the
+orjson and msgpack responses returned by the normalize endpoints.
+
+Usage:
+    python scripts/benchmark_serialization.py [--evidences 200] [--repeat 200]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+
+from app.ocsf.validator import validate_ocsf
+from app.schemas.response import NormalizeResponse
+from app.utils.serialization import ORJSONResponse, MsgpackResponse, shallow_dump
+from bench_data import defender_alert, sentinel_incident
+
+
+def build_response(ocsf: dict) -> NormalizeResponse:
+    cleaned = validate_ocsf(ocsf).cleaned
+    return NormalizeResponse(
+        ocsf=cleaned, decision="accept", confidence=0.91, processing_time_ms=1234,
+        breakdown={"schema_validity": 1.0, "field_coverage": 0.8, "value_consistency": 0.9},
+    )
+
+
+def fastapi_default(resp: NormalizeResponse) -> bytes:
+    # serialize_response(): validate against response_model, then jsonable_encoder,
+    # then JSONResponse.render()
+    validated = NormalizeResponse.model_validate(resp.model_dump())
+    content = jsonable_encoder(validated)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def orjson_path(resp: NormalizeResponse) -> bytes:
+    return ORJSONResponse(content=shallow_dump(resp)).body
+
+
+def msgpack_path(resp: NormalizeResponse) -> bytes:
+    return MsgpackResponse(content=shallow_dump(resp)).body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--evidences", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    cases = {
+        "defender": defender_alert(args.evidences)[1],
+        "sentinel": sentinel_incident(args.evidences)[1],
+    }
+    paths = {"fastapi default": fastapi_default, "orjson": orjson_path, "msgpack": msgpack_path}
+
+    for name, ocsf in cases.items():
+        resp = build_response(ocsf)
+        print(f"\n{name} ({args.evidences} evidences)")
+        baseline = None
+        for label, fn in paths.items():
+            size = len(fn(resp))
+            per_call = timeit.timeit(lambda: fn(resp), number=args.repeat) / args.repeat
+            baseline = baseline or per_call
+            print(f"  {label:<16} {per_call * 1e6:10.1f} us   {size / 1024:8.1f} KiB   "
+                  f"{baseline / per_call:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark single-request decoding with the static cache off vs on.
+
+Loads the model in-process once, then runs the same prompts through
+run_inference with the dynamic cache (eager) and with the static cache
+pool (compiled, warmed up per bucket). Reports decode tokens/sec for both.
+Prompts are built from NormalizeRequest as the server builds them.
+
+Usage:
+    python scripts/benchmark_static_cache.py [-n 6] [--evidences 20] [--max-new-tokens 512]
+    python scripts/benchmark_static_cache.py --buckets 1024,2048 --compile-mode default
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.models.model_loader import model_manager
+from app.schemas.request import NormalizeRequest
+from app.utils.prompt_builder import build_prompt
+from bench_data import corpus
+
+
+def parse_buckets(value: str) -> list[int]:
+    return [int(part) for part in value.split(",")]
+
+
+def run(prompts: list[list[dict]], cache_pool) -> tuple[float, int, int]:
+    from app.models.inference import run_inference
+
+    elapsed, tokens, fallbacks = 0.0, 0, 0
+    for prompt in prompts:
+        result = run_inference(model_manager.model, model_manager.tokenizer, prompt, settings,
+                               cache_pool=cache_pool)
+        elapsed += result.elapsed_seconds
+        tokens += result.output_tokens
+        if cache_pool is not None and cache_pool.bucket_for(result.prompt_tokens, settings.max_new_tokens) is None:
+            fallbacks += 1
+    return elapsed, tokens, fallbacks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=6, help="number of alerts")
+    parser.add_argument("--evidences", type=int, default=None,
+                        help="cap evidences per synthetic alert (keeps prompts small on CPU)")
+    parser.add_argument("--max-new-tokens", type=int, default=None)
+    parser.add_argument("--buckets", type=parse_buckets, default=None, help="prompt lengths, e.g. 1024,2048")
+    parser.add_argument("--compile-mode", default=None)
+    args = parser.parse_args()
+
+    if args.max_new_tokens:
+        settings.max_new_tokens = args.max_new_tokens
+    buckets = [(p, settings.max_new_tokens) for p in args.buckets or settings.static_cache_buckets]
+
+    # Load without the pool; it is built below so both runs share one model.
+    settings.static_cache = False
+    model_manager.load()
+    if not model_manager.is_ready:
+        sys.exit(f"Model failed to load: {model_manager.load_error}")
+
+    prompts = []
+    for source, raw, _ in corpus(args.n):
+        if args.evidences is not None:
+            if "evidence" in raw:
+                raw["evidence"] = raw["evidence"][:args.evidences]
+            if "properties" in raw:
+                raw["properties"]["relatedEntities"] = raw["properties"]["relatedEntities"][:args.evidences]
+        req = NormalizeRequest(raw_log=raw, source=source)
+        prompts.append(build_prompt(req.raw, req.source, req.format, examples=None))
+
+    from app.models.static_cache import StaticCachePool
+
+    # Warm the eager path too so both sides exclude first-call overhead.
+    run(prompts[:1], None)
+    off_time, off_tokens, _ = run(prompts, None)
+
+    start = time.perf_counter()
+    pool = StaticCachePool(model_manager.model, buckets, args.compile_mode)
+    pool.warmup(model_manager.tokenizer)
+    warmup_time = time.perf_counter() - start
+    on_time, on_tokens, fallbacks = run(prompts, pool)
+
+    print(f"\n{len(prompts)} prompts on {model_manager.model.device}, buckets {pool.buckets}")
+    print(f"  warmup (compile all buckets): {warmup_time:.1f}s")
+    print(f"  static cache off  {off_tokens:6d} tokens  {off_time:8.2f}s  {off_tokens / off_time:8.1f} tok/s")
+    print(f"  static cache on   {on_tokens:6d} tokens  {on_time:8.2f}s  {on_tokens / on_time:8.1f} tok/s"
+          f"   ({fallbacks} prompts fell back to dynamic)")
+    print(f"\n  speedup: {(on_tokens / on_time) / (off_tokens / off_time):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
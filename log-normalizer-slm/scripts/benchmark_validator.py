@@ -0,0 +1,109 @@
+"""
+Benchmark validate_ocsf against the previous implementation.
+
+The previous validator built DetectionFinding(**data), dumped it with
+exclude_none and diffed the input against the dump to find stripped
+fields. The current one validates through a cached TypeAdapter and checks
+the input against precompiled field tables. Both are run over the same
+OCSF outputs; the cleaned dicts and warnings are compared for every item.
+
+The current path is also split into its three steps (validate, dump, the
+stripped-field walk) to show where the time goes.
+
+Usage:
+    python scripts/benchmark_validator.py                 # synthetic corpus
+    python scripts/benchmark_validator.py --labels data/labeled/labeled_output_training.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import ValidationError
+
+from app.ocsf.events.detection_finding import DetectionFinding
+from app.ocsf.validator import _ADAPTER, _FIELDS, _find_stripped_fields, validate_ocsf
+from bench_data import corpus
+
+
+def legacy_validate(data: dict) -> tuple[dict | None, list[str]]:
+    try:
+        model = DetectionFinding(**data)
+    except ValidationError:
+        return None, []
+    cleaned = model.model_dump(exclude_none=True)
+    return cleaned, legacy_stripped(data, cleaned)
+
+
+def legacy_stripped(original: dict, cleaned: dict, prefix: str = "") -> list[str]:
+    stripped = []
+    for key in original:
+        path = f"{prefix}.{key}" if prefix else key
+        if key not in cleaned:
+            stripped.append(path)
+        elif isinstance(original[key], dict) and isinstance(cleaned.get(key), dict):
+            stripped.extend(legacy_stripped(original[key], cleaned[key], path))
+    return stripped
+
+
+def load_outputs(path: str | None, n: int) -> list[dict]:
+    if path:
+        with open(path) as f:
+            return [json.loads(line)["ocsf"] for line in f if line.strip()]
+    return [ocsf for _, _, ocsf in corpus(n)]
+
+
+def best_of(fn, items: list[dict], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--labels", help="labeled JSONL with an `ocsf` field per line")
+    parser.add_argument("-n", type=int, default=50, help="synthetic alerts when --labels is not given")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    outputs = load_outputs(args.labels, args.n)
+
+    mismatches = 0
+    for ocsf in outputs:
+        cleaned, warnings = legacy_validate(ocsf)
+        result = validate_ocsf(ocsf)
+        if result.cleaned != cleaned or result.warnings != warnings:
+            mismatches += 1
+
+    legacy_t = best_of(legacy_validate, outputs, args.repeat)
+    new_t = best_of(validate_ocsf, outputs, args.repeat)
+    size = sum(len(json.dumps(o)) for o in outputs) / len(outputs) / 1024
+
+    print(f"{len(outputs)} outputs, mean {size:.1f} KiB, best of {args.repeat}")
+    print(f"  legacy:  {legacy_t / len(outputs) * 1e6:9.1f} us/output")
+    print(f"  current: {new_t / len(outputs) * 1e6:9.1f} us/output   ({legacy_t / new_t:.2f}x)")
+    print(f"  outputs with different cleaned dict or warnings: {mismatches}")
+
+    valid = [ocsf for ocsf in outputs if validate_ocsf(ocsf).valid]
+    models = [_ADAPTER.validate_python(ocsf) for ocsf in valid]
+    steps = {
+        "validate": best_of(_ADAPTER.validate_python, valid, args.repeat),
+        "dump": best_of(lambda m: _ADAPTER.dump_python(m, exclude_none=True), models, args.repeat),
+        "walk": best_of(lambda ocsf: _find_stripped_fields(ocsf, _FIELDS), valid, args.repeat),
+    }
+    total = sum(steps.values())
+    print("\n  current, by step:")
+    for name, seconds in steps.items():
+        print(f"    {name:<9} {seconds / len(valid) * 1e6:9.1f} us/output  ({seconds / total:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark value_consistency: substring scans vs the per-request ValueIndex.
+
+Before, every output leaf was checked with `str(v) in json.dumps(raw)`.
+Now the raw leaves are indexed once (exact, case-folded, timestamp-
+canonicalized) and looked up, with a substring fallback. Reports time per
+alert and the share of output values each approach finds in the input.
+
+Usage:
+    python scripts/benchmark_value_consistency.py [--evidences 200] [--repeat 50]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.scoring.confidence import extract_leaf_values
+from app.scoring.value_index import ValueIndex
+from bench_data import defender_alert, sentinel_incident
+
+
+def substring_scan(raw: dict, values: list) -> int:
+    raw_str = json.dumps(raw)
+    return sum(1 for v in values if str(v) in raw_str)
+
+
+def indexed(raw: dict, values: list) -> int:
+    index = ValueIndex(raw)
+    return sum(1 for v in values if index.contains(v))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--evidences", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    cases = {
+        "defender": defender_alert(args.evidences),
+        "sentinel": sentinel_incident(args.evidences),
+    }
+    print(f"{args.evidences} evidences per alert\n")
+    print(f"  {'alert':<10} {'KiB':>6} {'values':>7}   {'scan us':>9} {'found':>6}   {'index us':>9} {'found':>6}")
+    for name, (raw, ocsf) in cases.items():
+        values = extract_leaf_values(ocsf)
+        scan_t = timeit.timeit(lambda: substring_scan(raw, values), number=args.repeat) / args.repeat
+        index_t = timeit.timeit(lambda: indexed(raw, values), number=args.repeat) / args.repeat
+        print(f"  {name:<10} {len(json.dumps(raw)) / 1024:6.1f} {len(values):7d}   "
+              f"{scan_t * 1e6:9.1f} {substring_scan(raw, values):6d}   "
+              f"{index_t * 1e6:9.1f} {indexed(raw, values):6d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Output tokens saved per alert by prefilling the OCSF header.
+
+Tokenizes each OCSF answer as it appears in the training data
+(json.dumps(indent=2)) with and without ASSISTANT_PREFIX, using the
+serving tokenizer. Only the tokenizer is loaded, not the model.
+
+Usage:
+    python scripts/measure_prefill.py                       # synthetic corpus
+    python scripts/measure_prefill.py --labels data/labeled/labeled_output_training.jsonl
+    python scripts/measure_prefill.py --tokenizer fdtn-ai/Foundation-Sec-1.1-8B-Instruct
+"""
+
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.constants import ASSISTANT_PREFIX, OCSF_HEADER
+from bench_data import corpus
+
+
+def load_answers(path: str | None, n: int) -> list[str]:
+    if path:
+        with open(path) as f:
+            ocsfs = [json.loads(line)["ocsf"] for line in f if line.strip()]
+    else:
+        ocsfs = [ocsf for _, _, ocsf in corpus(n)]
+    return [json.dumps({**OCSF_HEADER, **o}, indent=2, ensure_ascii=False) for o in ocsfs]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--labels", help="labeled JSONL with an `ocsf` field per line")
+    parser.add_argument("--tokenizer", default=settings.base_model_path)
+    parser.add_argument("-n", type=int, default=50, help="synthetic alerts when --labels is not given")
+    args = parser.parse_args()
+
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    answers = load_answers(args.labels, args.n)
+
+    def count(text: str) -> int:
+        return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+    full = [count(a) for a in answers]
+    rest = [count(a[len(ASSISTANT_PREFIX):]) for a in answers if a.startswith(ASSISTANT_PREFIX)]
+    if len(rest) != len(answers):
+        print(f"warning: {len(answers) - len(rest)} answers do not start with the prefix")
+    saved = [f - r for f, r in zip(full, rest)]
+
+    mean_full = sum(full) / len(full)
+    mean_saved = sum(saved) / len(saved)
+    print(f"{len(answers)} answers, tokenizer {args.tokenizer}")
+    print(f"  prefix alone:           {count(ASSISTANT_PREFIX)} tokens")
+    print(f"  output tokens, no prefill: mean {mean_full:8.1f}   max {max(full)}")
+    print(f"  output tokens saved:       mean {mean_saved:8.1f}   ({100 * mean_saved / mean_full:.1f}% of output)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Re-score stored normalize outputs with the current scoring config.
+
+Reads JSONL records with a raw alert and its OCSF output, scores them all
+with the batch scorer and prints the decision counts and how many
+decisions changed. With -o, writes each record back with `confidence`,
+`decision` and `breakdown` replaced. Use it after changing weights,
+thresholds or ocsf_constants.
+
+Record fields:
+    raw_log (or raw_input)   the alert, as an object or a string
+    ocsf                     the normalized output
+    validation_errors, validation_warnings, repaired   optional, as stored
+    breakdown                optional, as stored
+
+/normalize responses merge errors, warnings and notes into
+validation_errors and have no validation_warnings or repaired. For those
+records the list is split back up (notes dropped, stripped-field paths
+as warnings, the rest as errors) and `repaired` is read from
+breakdown["repair_penalty"], so nothing is penalized twice. A stored
+breakdown["token_confidence"] is blended in again; the logprobs behind
+it are not stored, so the low-confidence note isn't recomputed.
+
+With --validate, validation is re-run on each output (like the normalizer
+does) instead of using the stored errors and warnings. /normalize
+returns the cleaned output, so re-validating it finds no stripped fields.
+
+Usage:
+    python scripts/rescore.py outputs.jsonl -o rescored.jsonl
+    python scripts/rescore.py data/labeled/labeled_output_training.jsonl --validate
+"""
+
+import argparse
+import collections
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ocsf.validator import validate_ocsf
+from app.scoring.batch import features, score_features
+from app.scoring.confidence import _LOW_CONFIDENCE_NOTE, _REPAIR_NOTE
+from app.utils.raw_log import RawLog
+
+
+def raw_data(record: dict) -> dict:
+    raw = record.get("raw_log", record.get("raw_input"))
+    if isinstance(raw, dict):
+        return raw
+    if raw is None:
+        return {}
+    return RawLog(raw if isinstance(raw, str) else json.dumps(raw)).data
+
+
+# validate_ocsf warnings are the paths of stripped fields; its errors are
+# "(loc): message" or sentences.
+_FIELD_PATH = re.compile(r"[^\s:()]+")
+
+
+def split_messages(record: dict) -> tuple[list[str], list[str]]:
+    """(errors, warnings) as validate_ocsf reported them."""
+    messages = record.get("validation_errors") or []
+    if "validation_warnings" in record:
+        return messages, record["validation_warnings"] or []
+    errors, warnings = [], []
+    for message in messages:
+        if message == _REPAIR_NOTE or message.startswith(_LOW_CONFIDENCE_NOTE):
+            continue
+        (warnings if _FIELD_PATH.fullmatch(message) else errors).append(message)
+    return errors, warnings
+
+
+def was_repaired(record: dict) -> bool:
+    if "repaired" in record:
+        return bool(record["repaired"])
+    return "repair_penalty" in (record.get("breakdown") or {})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("input", help="JSONL of stored outputs")
+    parser.add_argument("-o", "--output", help="write re-scored records here")
+    parser.add_argument("--validate", action="store_true",
+                        help="re-run OCSF validation instead of using stored errors/warnings")
+    args = parser.parse_args()
+
+    with open(args.input) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    outputs, errors, warnings = [], [], []
+    for record in records:
+        ocsf = record.get("ocsf") or {}
+        if args.validate:
+            validation = validate_ocsf(ocsf)
+            ocsf = validation.cleaned if validation.valid else ocsf
+            errors.append(validation.errors)
+            warnings.append(validation.warnings)
+        else:
+            record_errors, record_warnings = split_messages(record)
+            errors.append(record_errors)
+            warnings.append(record_warnings)
+        outputs.append(ocsf)
+
+    start = time.perf_counter()
+    feats = features([raw_data(r) for r in records], outputs, errors, warnings,
+                     [was_repaired(r) for r in records],
+                     token_scores=[(r.get("breakdown") or {}).get("token_confidence") for r in records])
+    scores = score_features(feats)
+    elapsed = time.perf_counter() - start
+
+    changed = collections.Counter()
+    for record, result in zip(records, scores.results()):
+        before = record.get("decision")
+        if before and before != result.decision:
+            changed[f"{before} -> {result.decision}"] += 1
+        record.update(confidence=result.score, decision=result.decision, breakdown=result.breakdown)
+
+    decisions = collections.Counter(scores.decision.tolist())
+    print(f"{len(records)} records scored in {elapsed:.2f}s")
+    print("  " + "   ".join(f"{d}: {decisions.get(d, 0)}" for d in ("accept", "review", "reject")))
+    if records:
+        print(f"  mean confidence {scores.score.mean():.3f}")
+    for change, n in changed.most_common():
+        print(f"  changed {change}: {n}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
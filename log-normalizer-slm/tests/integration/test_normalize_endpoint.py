@@ -74,4 +74,19 @@ async def test_sequential_requests_succeed(client):
         response1 = await c.post("/api/normalize", json=payload)
         response2 = await c.post("/api/normalize", json=payload)
     assert response1.status_code == 200
-    assert response2.status_code == 200
\ No newline at end of file
+    assert response2.status_code == 200
+
+@pytest.mark.asyncio
+async def test_normalize_batch_returns_results_in_input_order(client):
+    payload = [
+        {"raw_log": '{"src_ip": "10.0.1.15", "dst_ip": "8.8.8.8", "action": "allow"}', "source": "palo-alto"},
+        {"raw_log": "", "source": "palo-alto"},
+        {"raw_log": '{"user": "alice", "action": "login_failed"}', "source": "splunk"},
+    ]
+    async with client as c:
+        response = await c.post("/api/normalize/batch", json=payload)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 3
+    assert results[1]["error"].startswith("Invalid request")
+    assert results[0]["processing_time_ms"] > 0
@@ -0,0 +1,82 @@
+import copy
+
+import pytest
+
+from app.scoring.batch import score_batch
+from app.scoring.confidence import compute_confidence
+
+
+RAW = {
+    "title": "Suspicious PowerShell command line",
+    "host": "WKS-7311",
+    "created": "2024-05-01T12:00:00.000Z",
+    "pid": 4000,
+}
+
+OCSF = {
+    "activity_id": 1,
+    "class_uid": 2004,
+    "class_name": "Detection Finding",
+    "type_uid": 200401,
+    "time": "2024-05-01T12:00:00Z",
+    "severity_id": 4,
+    "severity": "High",
+    "finding_info": {"title": "Suspicious PowerShell command line", "uid": "da98b33c"},
+    "metadata": {"product": {"name": "Defender", "vendor_name": "Microsoft"}},
+    "device": {"hostname": "WKS-7311", "uid": None},
+    "evidences": [{"process": {"pid": 4000}}],
+}
+
+
+def _cases():
+    sparse = {"activity_id": 1, "finding_info": None, "metadata": {"product": "x"}}
+    made_up = copy.deepcopy(OCSF)
+    made_up["device"]["hostname"] = "NOT-IN-RAW"
+    confident = {"time": (-0.01, -0.005), "device.hostname": (-0.2, -0.1)}
+    unsure = {f"finding_info.f{i}": (-4.0, -1.0) for i in range(12)}
+    return [
+        (RAW, OCSF, None, None, False, None),
+        (RAW, OCSF, None, None, False, confident),
+        (RAW, made_up, ["e"], None, True, unsure),
+        (RAW, OCSF, ["('time',): Field required"], ["bogus"], False, None),
+        (RAW, made_up, None, ["a", "b", "c"], True, None),
+        (RAW, sparse, ["e"] * 10, None, False, None),
+        ({}, {}, None, None, True, None),
+    ]
+
+
+def test_matches_compute_confidence_exactly():
+    cases = _cases()
+    batch = score_batch(
+        [c[0] for c in cases], [c[1] for c in cases],
+        validation_errors=[c[2] for c in cases],
+        validation_warnings=[c[3] for c in cases],
+        repaired=[c[4] for c in cases],
+        leaf_logprobs=[c[5] for c in cases],
+    ).results()
+    for (raw, ocsf, errors, warnings, repaired, leaves), got in zip(cases, batch):
+        want = compute_confidence(raw, ocsf, "test", errors, warnings, repaired=repaired,
+                                  leaf_logprobs=leaves)
+        assert got.score == want.score
+        assert got.decision == want.decision
+        assert got.breakdown == want.breakdown
+        assert got.validation_errors == want.validation_errors
+
+
+def test_stored_token_score_is_blended():
+    plain = score_batch([RAW], [OCSF]).score[0]
+    blended = score_batch([RAW], [OCSF], token_scores=[0.0]).results()[0]
+    assert blended.score < round(plain, 3)
+    assert blended.breakdown["token_confidence"] == 0.0
+
+
+def test_unrounded_arrays_match():
+    scores = score_batch([RAW, RAW], [OCSF, {}])
+    assert scores.score.shape == (2,)
+    assert scores.decision.tolist()[1] == "reject"
+    assert scores.features.present.shape == (2, len(scores.features.trie.paths))
+
+
+def test_length_mismatch():
+    with pytest.raises(ValueError):
+        score_batch([RAW], [OCSF, OCSF])
@@ -0,0 +1,86 @@
+from app.config import settings
+from app.ocsf import batch_validation
+from app.ocsf.batch_validation import ValidationCache, validate_many
+from app.ocsf.validator import validate_ocsf
+
+
+def _finding(uid: str = "da98b33c") -> dict:
+    return {
+        "activity_id": 1,
+        "type_uid": 200401,
+        "time": "2024-05-01T12:00:00Z",
+        "severity_id": 4,
+        "finding_info": {"title": "Suspicious PowerShell command line", "uid": uid},
+        "metadata": {"version": "1.7.0", "product": {"name": "Defender", "vendor_name": "Microsoft"}},
+        "device": {"hostname": "WKS-7311"},
+    }
+
+
+def _fresh_cache(monkeypatch, size: int = 16) -> ValidationCache:
+    cache = ValidationCache(size)
+    monkeypatch.setattr(batch_validation, "validation_cache", cache)
+    return cache
+
+
+def test_matches_validate_ocsf(monkeypatch):
+    _fresh_cache(monkeypatch)
+    stripped = _finding()
+    stripped["bogus"] = 1
+    broken = _finding()
+    del broken["finding_info"]
+    objects = [_finding(), stripped, broken]
+
+    results = validate_many(objects)
+
+    for ocsf, result in zip(objects, results):
+        expected = validate_ocsf(ocsf)
+        assert result == {"valid": expected.valid, "errors": expected.errors, "warnings": expected.warnings}
+    assert results[1]["warnings"] == ["bogus"]
+    assert not results[2]["valid"] and results[2]["errors"]
+
+
+def test_key_order_hits_the_same_entry(monkeypatch):
+    cache = _fresh_cache(monkeypatch)
+    data = _finding()
+    reordered = dict(reversed(list(data.items())))
+
+    validate_many([data])
+    validate_many([reordered])
+
+    assert len(cache) == 1
+    assert cache.hits == 1
+
+
+def test_duplicates_in_a_batch_are_validated_once(monkeypatch):
+    cache = _fresh_cache(monkeypatch)
+    results = validate_many([_finding(), _finding(), _finding("other")])
+    assert len(results) == 3
+    assert cache.misses == 2
+    assert len(cache) == 2
+
+
+def test_cache_evicts_least_recently_used():
+    cache = ValidationCache(2)
+    cache.put(b"a", (True, (), ()))
+    cache.put(b"b", (True, (), ()))
+    cache.get(b"a")
+    cache.put(b"c", (True, (), ()))
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is not None
+
+
+def test_pool_gives_the_same_results(monkeypatch):
+    _fresh_cache(monkeypatch, size=0)
+    objects = [_finding(str(i)) for i in range(10)]
+    objects[3]["bogus"] = True
+    monkeypatch.setattr(settings, "validate_workers", 0)
+    inline = validate_many(objects)
+
+    monkeypatch.setattr(settings, "validate_workers", 2)
+    try:
+        pooled = validate_many(objects)
+    finally:
+        batch_validation.shutdown()
+
+    assert pooled == inline
+    assert pooled[3]["warnings"] == ["bogus"]
@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+
+from app import normalizer
+from app.config import settings
+
+
+class _Generation:
+    def __init__(self, text: str, state="kv", output_tokens: int = 0):
+        self.text = text
+        self.state = state
+        self.output_tokens = output_tokens
+
+
+class _FakeModel:
+    """continue_generation appends the next queued piece of output."""
+
+    def __init__(self, *pieces: str):
+        self.pieces = list(pieces)
+        self.calls = 0
+
+    def continue_generation(self, generation, deadline=None, cancel=None):
+        self.calls += 1
+        text = generation.text + self.pieces.pop(0)
+        return _Generation(text, output_tokens=generation.output_tokens + 8)
+
+
+@pytest.fixture
+def model(monkeypatch):
+    def install(*pieces):
+        fake = _FakeModel(*pieces)
+        monkeypatch.setattr(normalizer, "model_manager", fake)
+        return fake
+    monkeypatch.setattr(settings, "continuation_tokens", 64)
+    monkeypatch.setattr(settings, "max_continuations", 3)
+    return install
+
+
+def test_continues_until_the_object_is_complete(model):
+    fake = model(', "severity_id": ', '4}', ', "extra": 1}')
+    generation = normalizer._continue_truncated(_Generation('{"class_uid": 2004'), deadline=None)
+    assert generation.text == '{"class_uid": 2004, "severity_id": 4}'
+    assert fake.calls == 2
+
+
+def test_complete_output_is_left_alone(model):
+    fake = model('ignored')
+    generation = _Generation('{"class_uid": 2004}')
+    assert normalizer._continue_truncated(generation, deadline=None) is generation
+    assert fake.calls == 0
+
+
+def test_stops_at_max_continuations(model, monkeypatch):
+    monkeypatch.setattr(settings, "max_continuations", 2)
+    fake = model(', "a": 1', ', "b": 2', '}')
+    generation = normalizer._continue_truncated(_Generation('{"class_uid": 2004'), deadline=None)
+    assert fake.calls == 2
+    assert generation.text == '{"class_uid": 2004, "a": 1, "b": 2'
+
+
+def test_stops_once_the_deadline_has_passed(model):
+    fake = model('}')
+    generation = _Generation('{"class_uid": 2004')
+    assert normalizer._continue_truncated(generation, deadline=time.monotonic() - 1) is generation
+    assert fake.calls == 0
+
+
+def test_stops_without_a_cache_to_resume_from(model):
+    fake = model('}')
+    generation = _Generation('{"class_uid": 2004', state=None)
+    assert normalizer._continue_truncated(generation, deadline=None) is generation
+    assert fake.calls == 0
+
+
+def test_stops_when_cancelled(model):
+    fake = model('}')
+    cancel = threading.Event()
+    cancel.set()
+    generation = _Generation('{"class_uid": 2004')
+    assert normalizer._continue_truncated(generation, deadline=None, cancel=cancel) is generation
+    assert fake.calls == 0
@@ -0,0 +1,106 @@
+import asyncio
+import signal
+import threading
+
+import pytest
+
+from app.api import normalize as normalize_api
+from app.engine.drain import Drain, Drained, Draining
+from app.jobs import runner as runner_module
+from app.jobs.runner import JobRunner
+from app.jobs.store import QUEUED
+from app.scheduler.scheduler import InferenceScheduler
+from app.schemas.request import NormalizeRequest
+
+
+@pytest.mark.asyncio
+async def test_in_flight_work_finishes_and_new_work_is_refused():
+    drain = Drain()
+    release = asyncio.Event()
+
+    async def generate():
+        await release.wait()
+        return "done"
+
+    call = asyncio.create_task(drain.run(generate()))
+    await asyncio.sleep(0.01)
+    draining = asyncio.create_task(drain.drain(grace_seconds=5))
+    await asyncio.sleep(0.01)
+
+    assert drain.draining and drain.in_flight == 1
+    with pytest.raises(Draining):
+        drain.check()
+
+    release.set()
+    assert await call == "done"
+    await draining
+    assert drain.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_work_left_at_the_end_of_grace_is_drained_out_of_the_scheduler():
+    drain = Drain()
+    sched = InferenceScheduler()
+    gate = threading.Event()
+
+    running = asyncio.create_task(drain.run(sched.submit(lambda: gate.wait(5), cancel=gate)))
+    queued = asyncio.create_task(drain.run(sched.submit(lambda: "never")))
+    await asyncio.sleep(0.01)
+
+    await drain.drain(grace_seconds=0.05)
+    for call in (running, queued):
+        with pytest.raises(Drained):
+            await call
+    assert sched.queue_depth == 0
+    # The running generation was told to stop rather than left holding the GPU.
+    assert gate.is_set()
+
+
+@pytest.mark.asyncio
+async def test_signal_drains_then_reaches_the_previous_handler():
+    drain = Drain()
+    received = []
+    original = signal.signal(signal.SIGTERM, lambda sig, frame: received.append(drain.draining))
+    try:
+        drain.install_signal_handlers(grace_seconds=5)
+        signal.raise_signal(signal.SIGTERM)
+        for _ in range(50):
+            if received:
+                break
+            await asyncio.sleep(0.01)
+        assert received == [True]
+    finally:
+        signal.signal(signal.SIGTERM, original)
+
+
+@pytest.mark.asyncio
+async def test_drained_request_is_refused_for_retry(monkeypatch):
+    async def drained(req, deadline=None):
+        raise Drained("grace over")
+
+    monkeypatch.setattr(normalize_api.gateway, "normalize", drained)
+    req = NormalizeRequest(raw_log={"severity": "High"}, source="sentinel")
+
+    response = await normalize_api.normalize(req, x_request_timeout_ms=None, accept=None)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+@pytest.mark.asyncio
+async def test_drained_job_goes_back_to_the_store(tmp_path, monkeypatch):
+    runner = JobRunner(str(tmp_path / "jobs.sqlite3"), workers=1)
+    [job_id] = runner.defer([NormalizeRequest(raw_log={"severity": "High"}, source="sentinel")])
+
+    async def ready():
+        return {"ready": True, "load_error": None}
+
+    async def drained(req, deadline=None):
+        raise Drained("grace over")
+
+    monkeypatch.setattr(runner_module.gateway.engine, "status", ready)
+    monkeypatch.setattr(runner_module.gateway, "normalize", drained)
+
+    await runner._run(job_id)
+
+    assert runner.store.get(job_id).status == QUEUED
@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.engine.client import RemoteEngine
+from app.engine.protocol import EngineUnavailable, ProtocolError, encode_message, read_message
+from app.engine.server import EngineServer
+from app.scheduler.cost import CostModel
+from app.scheduler.scheduler import DEFAULT_SOURCE, DeadlineExceeded, InferenceScheduler, QueueFull
+
+
+class FakeEngine:
+    def __init__(self):
+        self.cancelled = asyncio.Event()
+        self.deadlines = []
+        self.sources = []
+        self.priorities = []
+        self.scheduler = {}
+
+    async def generate(self, prompt, deadline=None, source=DEFAULT_SOURCE, priority=3):
+        self.deadlines.append(deadline)
+        self.sources.append(source)
+        self.priorities.append(priority)
+        kind = prompt[0]["content"]
+        if kind == "full":
+            raise QueueFull(3.5)
+        if kind == "slow":
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                self.cancelled.set()
+                raise
+        if kind == "boom":
+            raise ValueError("CUDA error")
+        return {"text": "{}", "logprobs": [-0.5], "token_offsets": [0, 2]}
+
+    async def generate_batch(self, prompts, deadline=None, source=DEFAULT_SOURCE, priority=3):
+        self.sources.append(source)
+        return [p[0]["content"] for p in prompts]
+
+    async def status(self):
+        return {"ready": True, "reachable": True, "load_error": None, "tokens_per_second": 12.0,
+                "scheduler": self.scheduler}
+
+
+async def _pair(tmp_path):
+    fake = FakeEngine()
+    server = EngineServer(fake, str(tmp_path / "engine.sock"))
+    await server.start()
+    return fake, server, RemoteEngine(server.path)
+
+
+def _prompt(content):
+    return [{"role": "user", "content": content}]
+
+
+@pytest.mark.asyncio
+async def test_results_and_deadline_cross_the_socket(tmp_path):
+    fake, server, client = await _pair(tmp_path)
+    try:
+        deadline = time.monotonic() + 10
+        output = await client.generate(_prompt("ok"), deadline, "splunk", 5)
+        assert output == {"text": "{}", "logprobs": [-0.5], "token_offsets": [0, 2]}
+        assert abs(fake.deadlines[0] - deadline) < 1.0
+        assert await client.generate_batch([_prompt("a"), _prompt("b")]) == ["a", "b"]
+        assert fake.sources == ["splunk", DEFAULT_SOURCE]
+        assert fake.priorities == [5]
+        assert (await client.status())["ready"]
+    finally:
+        await client.stop()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_errors_map_back_to_exceptions(tmp_path):
+    _, server, client = await _pair(tmp_path)
+    try:
+        with pytest.raises(QueueFull) as err:
+            await client.generate(_prompt("full"))
+        assert err.value.retry_after == 3.5
+        with pytest.raises(RuntimeError, match="CUDA error"):
+            await client.generate(_prompt("boom"))
+    finally:
+        await client.stop()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_scheduler_snapshot_with_queued_jobs_crosses_the_socket(tmp_path):
+    fake, server, client = await _pair(tmp_path)
+    sched = InferenceScheduler()
+    cost = CostModel(default_output_tokens=400, prompt_token_cost=0.1)
+    cost.observe("splunk", 120, prompt_chars=800, prompt_tokens=200)
+    gate = threading.Event()
+    jobs = [asyncio.create_task(sched.submit(lambda: gate.wait(5)))]
+    await asyncio.sleep(0.01)
+    jobs += [asyncio.create_task(sched.submit(lambda: None, source="splunk", priority=p)) for p in (5, 1)]
+    await asyncio.sleep(0.01)
+    fake.scheduler = {**sched.snapshot(), "predicted_output_tokens": cost.snapshot()}
+    try:
+        status = await client.status()
+        assert status["reachable"] and status["scheduler"]["priorities"] == {"5": 1, "1": 1}
+        # The connection survived the reply and still serves requests.
+        assert await client.generate(_prompt("ok"))
+    finally:
+        gate.set()
+        await asyncio.gather(*jobs)
+        await client.stop()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_connection(tmp_path):
+    _, server, client = await _pair(tmp_path)
+    try:
+        outputs = await asyncio.gather(*(client.generate(_prompt("ok")) for _ in range(20)))
+        assert len(outputs) == 20
+    finally:
+        await client.stop()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_client_deadline_cancels_engine_work(tmp_path):
+    fake, server, client = await _pair(tmp_path)
+    try:
+        with pytest.raises(DeadlineExceeded):
+            # Past the deadline plus grace the client gives up and tells the engine.
+            await client.generate(_prompt("slow"), deadline=time.monotonic() - 0.9)
+        await asyncio.wait_for(fake.cancelled.wait(), 2)
+    finally:
+        await client.stop()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_unreachable_engine(tmp_path):
+    client = RemoteEngine(str(tmp_path / "missing.sock"))
+    with pytest.raises(EngineUnavailable) as err:
+        await client.generate(_prompt("ok"))
+    assert err.value.retry_after
+    status = await client.status()
+    assert status["ready"] is False and status["reachable"] is False
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("body", [
+    b"\xc1",              # reserved byte
+    b"\x93\x01",          # truncated array
+    b"\x92\x01\x02",      # array, not a map
+    b"\x81\x01\x02",      # integer map key
+])
+async def test_undecodable_message_is_a_protocol_error(body):
+    reader = asyncio.StreamReader()
+    reader.feed_data(len(body).to_bytes(4, "big") + body)
+    with pytest.raises(ProtocolError):
+        await read_message(reader)
+
+
+@pytest.mark.asyncio
+async def test_bad_reply_fails_pending_requests_cleanly(tmp_path):
+    path = str(tmp_path / "engine.sock")
+
+    async def garbage(reader, writer):
+        await read_message(reader)
+        writer.write(b"\x00\x00\x00\x01\xc1")
+        await writer.drain()
+
+    server = await asyncio.start_unix_server(garbage, path)
+    client = RemoteEngine(path)
+    try:
+        with pytest.raises(EngineUnavailable):
+            await client.generate(_prompt("ok"))
+        await client._reader_task
+        # A fresh connection is opened for the next request.
+        assert client._writer is None
+    finally:
+        await client.stop()
+        server.close()
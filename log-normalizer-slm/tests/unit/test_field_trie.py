@@ -0,0 +1,36 @@
+from app.scoring.field_trie import FieldTrie
+
+
+TRIE = FieldTrie(
+    {
+        "coverage": ["a", "a.b", "a.b.c", "d", "e.f"],
+        "presence": ["a.b", "d", "e.f"],
+    },
+    keep_none=("presence",),
+)
+
+
+def test_counts_all_tiers_in_one_walk():
+    data = {"a": {"b": {"c": 1}}, "d": "x", "e": {"f": 0}}
+    assert TRIE.count(data) == {"coverage": 5, "presence": 3}
+    assert TRIE.sizes == {"coverage": 5, "presence": 3}
+
+
+def test_none_leaf_counts_only_in_keep_none_tiers():
+    data = {"a": {"b": None}, "d": None}
+    assert TRIE.count(data) == {"coverage": 1, "presence": 2}
+
+
+def test_parents_must_be_dicts():
+    data = {"a": [{"b": 1}], "e": "f"}
+    assert TRIE.count(data) == {"coverage": 1, "presence": 0}
+
+
+def test_non_dict_and_empty_input():
+    assert TRIE.count(None) == {"coverage": 0, "presence": 0}
+    assert TRIE.count({}) == {"coverage": 0, "presence": 0}
+
+
+def test_repeated_path_counts_each_time():
+    trie = FieldTrie({"t": ["x", "x"]})
+    assert trie.count({"x": 1}) == {"t": 2}
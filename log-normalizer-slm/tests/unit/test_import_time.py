@@ -0,0 +1,54 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient, ASGITransport
+
+SCRIPT = Path(__file__).parents[2] / "scripts" / "benchmark_import_time.py"
+
+
+def test_api_starts_without_ml_stack():
+    """Fails if app.main pulls in torch/transformers/peft or blows the budget.
+    The budget is loose here so slow CI boxes don't flake; the script's
+    default is the real target."""
+    proc = subprocess.run(
+        [sys.executable, str(SCRIPT), "--budget-ms", "5000"],
+        capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+
+
+@pytest.mark.asyncio
+async def test_health_answers_before_model_load(monkeypatch):
+    from app.engine.drain import drain
+    from app.main import app
+    from app.models.model_loader import model_manager
+
+    # Other tests load (or fail to load) the shared model manager.
+    monkeypatch.setattr(model_manager, "is_ready", False)
+    monkeypatch.setattr(model_manager, "load_error", None)
+    monkeypatch.setattr(drain, "draining", False)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as c:
+        response = await c.get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "loading"
+
+
+def test_health_does_not_import_ml_stack():
+    """In a fresh interpreter: other tests may have imported torch here."""
+    code = (
+        "import asyncio, sys\n"
+        "from httpx import AsyncClient, ASGITransport\n"
+        "from app.main import app\n"
+        "async def main():\n"
+        "    async with AsyncClient(transport=ASGITransport(app=app), base_url='http://test') as c:\n"
+        "        assert (await c.get('/health')).status_code == 200\n"
+        "asyncio.run(main())\n"
+        "loaded = [m for m in ('torch', 'transformers', 'peft') if m in sys.modules]\n"
+        "assert not loaded, loaded\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                          cwd=Path(__file__).parents[2])
+    assert proc.returncode == 0, proc.stdout + proc.stderr
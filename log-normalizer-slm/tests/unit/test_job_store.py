@@ -0,0 +1,87 @@
+import asyncio
+import time
+
+import pytest
+
+from app.jobs.runner import JobRunner
+from app.jobs.store import JobStore, QUEUED, RUNNING, DONE
+from app.schemas.request import JobSubmitRequest
+
+
+def _store(tmp_path):
+    return JobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_created_jobs_start_queued(tmp_path):
+    store = _store(tmp_path)
+    ids = store.create_many([{"raw_log": "a", "source": "splunk"}, {"raw_log": "b", "source": "splunk"}])
+    assert len(ids) == 2
+    record = store.get(ids[0])
+    assert record.status == QUEUED
+    assert record.request == {"raw_log": "a", "source": "splunk"}
+
+
+def test_complete_stores_result(tmp_path):
+    store = _store(tmp_path)
+    [job_id] = store.create_many([{"raw_log": "a", "source": "splunk"}])
+    store.mark_running(job_id)
+    store.complete(job_id, {"decision": "accept"})
+    record = store.get(job_id)
+    assert record.status == DONE
+    assert record.finished
+    assert record.result == {"decision": "accept"}
+
+
+def test_unfinished_jobs_survive_reopen(tmp_path):
+    store = _store(tmp_path)
+    queued, running, done = store.create_many([{"n": 1}, {"n": 2}, {"n": 3}])
+    store.mark_running(running)
+    store.complete(done, {})
+    store.close()
+
+    reopened = _store(tmp_path)
+    assert reopened.unfinished() == [queued, running]
+    assert reopened.get(running).status == RUNNING
+
+
+def test_unnotified_only_lists_finished_jobs_with_callback(tmp_path):
+    store = _store(tmp_path)
+    a, b = store.create_many([{"n": 1}, {"n": 2}], callback_url="http://hook")
+    [c] = store.create_many([{"n": 3}])
+    store.complete(a, {})
+    store.complete(c, {})
+    assert [r.id for r in store.unnotified()] == [a]
+
+    store.mark_notified([a])
+    assert store.unnotified() == []
+
+
+def test_job_request_accepts_single_alert():
+    req = JobSubmitRequest(**{"raw_log": "x", "source": "splunk", "callback_url": "http://hook/done"})
+    assert len(req.items) == 1
+    assert req.items[0].source == "splunk"
+    assert str(req.callback_url) == "http://hook/done"
+
+
+@pytest.mark.asyncio
+async def test_wait_sees_a_job_finished_by_another_worker(tmp_path):
+    runner = JobRunner(str(tmp_path / "jobs.sqlite3"), workers=1)
+    [job_id] = runner.store.create_many([{"raw_log": "a", "source": "splunk"}])
+    other_worker = JobStore(str(tmp_path / "jobs.sqlite3"))
+
+    async def finish_elsewhere():
+        await asyncio.sleep(0.1)
+        other_worker.complete(job_id, {"decision": "accept"})
+
+    start = time.monotonic()
+    _, record = await asyncio.gather(finish_elsewhere(), runner.wait(job_id, timeout=10))
+    assert record.status == DONE
+    assert time.monotonic() - start < 2
+
+
+@pytest.mark.asyncio
+async def test_wait_returns_the_unfinished_job_at_timeout(tmp_path):
+    runner = JobRunner(str(tmp_path / "jobs.sqlite3"), workers=1)
+    [job_id] = runner.store.create_many([{"raw_log": "a", "source": "splunk"}])
+    record = await runner.wait(job_id, timeout=0.2)
+    assert record.status == QUEUED
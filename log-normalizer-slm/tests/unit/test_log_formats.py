@@ -0,0 +1,130 @@
+import pytest
+
+from app.utils.log_formats import (
+    parse_cef, parse_csv, parse_leef, parse_log, parse_syslog, render_fields, sniff_format,
+)
+
+
+def test_cef_header_extension_and_labels():
+    fields = parse_cef(
+        r"CEF:0|Security|threat\|manager|1.0|100|worm stopped|10|"
+        r"src=10.0.0.1 msg=Detected a threat. No action needed cs1Label=User cs1=alice act=blocked\=yes"
+    )
+    assert fields == {
+        "cefVersion": "0", "deviceVendor": "Security", "deviceProduct": "threat|manager",
+        "deviceVersion": "1.0", "deviceEventClassId": "100", "name": "worm stopped", "severity": "10",
+        "src": "10.0.0.1", "msg": "Detected a threat. No action needed", "act": "blocked=yes",
+        "User": "alice",
+    }
+
+
+def test_cef_label_never_overwrites_a_field():
+    fields = parse_cef("CEF:0|V|P|1|100|worm|5|cs1Label=name cs1=other cs2Label=Rule cs2=r1")
+    assert fields["name"] == "worm"
+    assert fields["cs1Label"] == "name" and fields["cs1"] == "other"
+    assert fields["Rule"] == "r1"
+
+
+def test_cef_keeps_malformed_extension_tokens():
+    fields = parse_cef("CEF:0|V|P|1|100|worm|5|stray words src=1.2.3.4 =novalue dst=5.6.7.8")
+    assert fields["src"] == "1.2.3.4" and fields["dst"] == "5.6.7.8"
+    assert fields["unparsed"] == "stray words =novalue"
+    assert "unparsed" not in parse_cef("CEF:0|V|P|1|100|worm|5|src=1.2.3.4")
+
+
+def test_cef_needs_a_full_header():
+    assert parse_cef("CEF:0|Vendor|Product") is None
+    assert parse_cef("LEEF:1.0|a|b|c|d|") is None
+
+
+def test_leef_delimiters():
+    assert parse_leef("LEEF:1.0|Microsoft|MSExchange|4.0 SP1|15345|src=10.50.1.1\tdst=2.10.20.20") == {
+        "leefVersion": "1.0", "vendor": "Microsoft", "product": "MSExchange", "version": "4.0 SP1",
+        "eventId": "15345", "src": "10.50.1.1", "dst": "2.10.20.20",
+    }
+    assert parse_leef("LEEF:2.0|Lancope|StealthWatch|1.0|41|^|src=10.0.1.8^sev=5")["sev"] == "5"
+    assert parse_leef("LEEF:2.0|Lancope|StealthWatch|1.0|41|x7C|src=10.0.1.8|sev=5")["sev"] == "5"
+    fields = parse_leef("LEEF:1.0|V|P|1|E|src=10.0.0.1\t=novalue\tstray\tdst=2.10.20.20")
+    assert fields["dst"] == "2.10.20.20" and fields["unparsed"] == "=novalue stray"
+    assert "" not in fields
+    # Space-separated despite the spec.
+    assert parse_leef("LEEF:1.0|V|P|1|E|src=10.0.0.1 usrName=bob smith")["usrName"] == "bob smith"
+
+
+def test_rfc5424_with_structured_data():
+    fields = parse_syslog('<165>1 2003-10-11T22:14:15.003Z host.example.com evntslog - ID47 '
+                          '[exampleSDID@32473 iut="3" eventSource="App\\"lication"] An event')
+    assert fields == {
+        "facility": "local4", "severity": "notice", "timestamp": "2003-10-11T22:14:15.003Z",
+        "host": "host.example.com", "app": "evntslog", "msgid": "ID47",
+        "exampleSDID@32473.iut": "3", "exampleSDID@32473.eventSource": 'App"lication',
+        "message": "An event",
+    }
+
+
+def test_rfc3164():
+    fields = parse_syslog("<34>Oct 11 22:14:15 mymachine su[230]: 'su root' failed on /dev/pts/8")
+    assert fields == {
+        "facility": "auth", "severity": "critical", "timestamp": "Oct 11 22:14:15", "host": "mymachine",
+        "app": "su", "pid": "230", "message": "'su root' failed on /dev/pts/8",
+    }
+
+
+def test_syslog_priority_above_191_is_not_syslog():
+    assert parse_syslog("<191>x")["facility"] == "local7"
+    for text in ("<999>garbage", "<192>x", "<1000>Oct 11 22:14:15 mymachine su: hi"):
+        assert parse_syslog(text) is None
+        assert sniff_format(text) == "unknown"
+
+
+def test_syslog_payloads_keep_the_header_apart():
+    cef = parse_syslog(r"<134>Jun  1 12:00:00 fw01 CEF:0|PAN|PAN-OS|10.1|THREAT|virus|8|suser=corp\\bob")
+    assert cef["severity"] == "8"
+    assert cef["syslog.severity"] == "info"
+    assert cef["syslog.host"] == "fw01"
+    assert cef["suser"] == "corp\\bob"
+
+    kv = parse_syslog('<189>devname="FG 100" srcip=10.0.0.5 action=deny')
+    assert kv == {"devname": "FG 100", "srcip": "10.0.0.5", "action": "deny",
+                  "syslog.facility": "local7", "syslog.severity": "notice"}
+
+
+def test_csv_with_header():
+    assert parse_csv('time,src_ip,action\n2024-05-01,10.0.0.5,"blocked, twice"\n') == {
+        "time": "2024-05-01", "src_ip": "10.0.0.5", "action": "blocked, twice",
+    }
+    assert parse_csv("a,b\n1,2\n3,4") == {"1.a": "1", "1.b": "2", "2.a": "3", "2.b": "4"}
+    assert parse_csv("a,b\n1,2,3") is None
+    assert parse_csv("just one line, no header") is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"id": 1}', "json"),
+    ("CEF:0|a|b|c|d|e|f|", "cef"),
+    ("LEEF:1.0|a|b|c|d|", "leef"),
+    ("<13>Oct 11 22:14:15 host app: hello", "syslog"),
+    ("Oct 11 22:14:15 host app: hello", "syslog"),
+    ('a,b,c\n1,"2,5",3', "csv"),
+    ("failed login, admin\nagain", "unknown"),
+    ("plain text", "unknown"),
+])
+def test_sniff_format(text, expected):
+    assert sniff_format(text) == expected
+
+
+def test_declared_cef_behind_syslog_header():
+    fields = parse_log("<134>Jun  1 12:00:00 fw01 CEF:0|V|P|1|100|name|5|src=1.2.3.4", "cef")
+    assert fields["src"] == "1.2.3.4"
+    assert parse_log("hello", "cef") is None
+
+
+def test_render_fields_one_pair_per_line():
+    assert render_fields({"src": "10.0.0.1", "msg": "two\nlines"}) == "src=10.0.0.1\nmsg=two\\nlines"
+
+
+def test_render_fields_is_compact():
+    fields = parse_syslog("<134>Jun  1 12:00:00 fw01 CEF:0|PAN|PAN-OS|10.1|THREAT|virus|8|src=1.2.3.4")
+    assert render_fields(fields).splitlines() == [
+        "vendor=PAN", "product=PAN-OS", "version=10.1", "event_id=THREAT", "name=virus",
+        "severity=8", "src=1.2.3.4", "time=Jun  1 12:00:00", "host=fw01",
+    ]
@@ -0,0 +1,33 @@
+import asyncio
+
+from app.utils.ndjson import iter_lines, LineTooLong
+
+
+def _collect(chunks, **kwargs):
+    async def gen():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        return [item async for item in iter_lines(gen(), **kwargs)]
+
+    return asyncio.run(run())
+
+
+def test_lines_split_across_chunks():
+    assert _collect([b'{"a": 1}\n{"b"', b': 2}\n']) == [(1, b'{"a": 1}'), (2, b'{"b": 2}')]
+
+
+def test_blank_lines_skipped_but_counted():
+    assert _collect([b"one\n\n  \nfour\n"]) == [(1, b"one"), (4, b"four")]
+
+
+def test_last_line_without_newline():
+    assert _collect([b"one\ntwo"]) == [(1, b"one"), (2, b"two")]
+
+
+def test_oversized_line_is_reported_and_skipped():
+    result = _collect([b"x" * 6, b"x" * 6, b"\nok\n"], max_line_bytes=8)
+    assert isinstance(result[0][1], LineTooLong)
+    assert result[0][0] == 1
+    assert result[1] == (2, b"ok")
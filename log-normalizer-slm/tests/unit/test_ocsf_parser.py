@@ -1,4 +1,4 @@
-from app.utils.ocsf_parser import extract_json
+from app.utils.ocsf_parser import extract_json, parse_output
 
 def test_extract_json_clean():
     result = extract_json('{"key": "value"}')
@@ -34,4 +34,41 @@ def test_extract_json_no_json():
 
 def test_extract_deeply_nested_json():
     result = extract_json('{"level1": {"level2": {"level3": "value"}}}')
-    assert result == {"level1": {"level2": {"level3": "value"}}}
\ No newline at end of file
+    assert result == {"level1": {"level2": {"level3": "value"}}}
+def test_extract_json_brace_inside_string():
+    result = extract_json('Output: {"cmd_line": "powershell {payload}}", "pid": 4} done')
+    assert result == {"cmd_line": "powershell {payload}}", "pid": 4}
+
+def test_extract_json_escaped_quote_inside_string():
+    result = extract_json('{"cmd_line": "echo \\"}\\" > x"} trailing')
+    assert result == {"cmd_line": 'echo "}" > x'}
+
+def test_extract_json_skips_brace_in_prose():
+    result = extract_json('Mapped {all} fields: {"key": "value"}')
+    assert result == {"key": "value"}
+
+def test_parse_output_complete_is_not_repaired():
+    result = parse_output('```json\n{"key": "value"}\n```')
+    assert result.data == {"key": "value"}
+    assert result.repaired is False
+
+def test_parse_output_closes_truncated_string():
+    result = parse_output('{"finding_info": {"title": "Suspicious Power')
+    assert result.data == {"finding_info": {"title": "Suspicious Power"}}
+    assert result.repaired is True
+
+def test_parse_output_drops_dangling_member():
+    result = parse_output('{"a": "x", "evidences": [{"pid": 1}, {"pid": 2, "na')
+    assert result.data == {"a": "x", "evidences": [{"pid": 1}, {"pid": 2}]}
+    assert result.repaired is True
+
+def test_parse_output_drops_partial_number():
+    result = parse_output('{"a": "x", "severity_id": 4')
+    assert result.data == {"a": "x"}
+
+def test_parse_output_drops_half_written_escape():
+    result = parse_output('{"path": "C:\\\\Windows\\')
+    assert result.data == {"path": "C:\\Windows"}
+
+def test_parse_output_no_json():
+    assert parse_output("no json here") is None
@@ -0,0 +1,49 @@
+import pytest
+
+from app.config import settings
+from app.scheduler.priority import UNKNOWN_PRIORITY, estimate_severity, request_priority
+from app.schemas.request import NormalizeRequest
+
+
+@pytest.mark.parametrize("source, raw, expected", [
+    ("crowdstrike", {"severity": 90}, 5),
+    ("crowdstrike", {"alert": {"severity": 30}}, 2),
+    ("splunk", {"urgency": "critical", "severity": "low"}, 5),
+    ("palo-alto", {"severity": "HIGH"}, 4),
+    ("microsoft", {"severity": "informational"}, 1),
+    ("sentinel", {"properties": {"severity": "Medium"}}, 3),
+    ("trend-micro", {"severity": "critical"}, 5),
+    ("expel", {"attributes": {"analyst_severity": "LOW"}}, 2),
+    ("logrhythm", {"alarmDetails": {"rbpMax": 70}}, 4),
+    ("some-new-vendor", {"priority": "high"}, 4),
+    ("splunk", {"urgency": "whatever"}, 0),
+    ("sentinel", {"properties": "not a dict"}, 0),
+])
+def test_estimate_severity(source, raw, expected):
+    assert estimate_severity(raw, source) == expected
+
+
+def test_request_priority():
+    critical = NormalizeRequest(raw_log={"severity": 95}, source="crowdstrike")
+    assert request_priority(critical) == 5
+
+    unknown = NormalizeRequest(raw_log="sshd: failed login for root", source="linux")
+    assert request_priority(unknown) == UNKNOWN_PRIORITY
+
+    # Parsed syslog: the PRI severity (info) is the message's own.
+    syslog = NormalizeRequest(raw_log="<134>Jun  1 12:00:00 host sshd: failed login", source="linux")
+    assert request_priority(syslog) == 1
+
+    pinned = NormalizeRequest(raw_log={"severity": 95}, source="crowdstrike", priority=1)
+    assert request_priority(pinned) == 1
+
+
+def test_priority_off_ignores_severity(monkeypatch):
+    monkeypatch.setattr(settings, "severity_priority", False)
+    req = NormalizeRequest(raw_log={"severity": 95}, source="crowdstrike")
+    assert request_priority(req) == UNKNOWN_PRIORITY
+
+
+def test_pinned_priority_is_validated():
+    with pytest.raises(ValueError):
+        NormalizeRequest(raw_log="x", source="expel", priority=9)
@@ -1,3 +1,6 @@
+import json
+
+from app.constants import ASSISTANT_PREFIX, OCSF_HEADER
 from app.utils.prompt_builder import build_prompt
 
 
@@ -28,3 +31,10 @@ def test_prompt_with_examples_contains_all_examples():
     assert len(result) == 6
     
 
+
+
+def test_assistant_prefix_matches_dumped_label():
+    ocsf = {**OCSF_HEADER, "severity_id": 4, "metadata": {"version": "1.7.0"}}
+    dumped = json.dumps(ocsf, indent=2)
+    assert dumped.startswith(ASSISTANT_PREFIX)
+    assert json.loads(ASSISTANT_PREFIX + dumped[len(ASSISTANT_PREFIX):]) == ocsf
@@ -0,0 +1,34 @@
+import json
+
+from app.schemas.request import NormalizeRequest
+
+
+def test_object_raw_log_is_serialized_once_and_kept():
+    alert = {"id": "a-1", "cmd_line": "powershell -enc AAAA"}
+    req = NormalizeRequest(raw_log=alert, source="crowdstrike")
+    assert req.raw_log == json.dumps(alert)
+    assert req.raw.data is alert
+
+
+def test_string_raw_log_is_parsed_lazily():
+    req = NormalizeRequest(raw_log='{"id":"a-1"}', source="crowdstrike")
+    assert req.raw.data == {"id": "a-1"}
+
+
+def test_unparsed_raw_log_is_wrapped():
+    req = NormalizeRequest(raw_log="failed login for admin from 10.0.0.5", source="linux")
+    assert req.raw.data == {"raw": "failed login for admin from 10.0.0.5"}
+    assert req.raw.prompt_text == req.raw_log
+
+
+def test_sniffed_cef_is_parsed_for_scoring_and_prompt():
+    req = NormalizeRequest(raw_log="CEF:0|Vendor|Product|1.0|100|name|5|src=10.0.0.1", source="arcsight")
+    assert req.raw.format == "cef"
+    assert req.raw.data["src"] == "10.0.0.1"
+    assert "src=10.0.0.1" in req.raw.prompt_text.splitlines()
+
+
+def test_declared_format_that_does_not_parse_falls_back_to_text():
+    req = NormalizeRequest(raw_log="not really csv", source="splunk", format="csv")
+    assert req.raw.data == {"raw": "not really csv"}
+    assert req.raw.prompt_text == "not really csv"
@@ -0,0 +1,358 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.scheduler.scheduler import InferenceScheduler, DeadlineExceeded, QueueFull
+from app.scheduler.capacity import retry_after_seconds
+from app.scheduler.cost import CostModel
+
+
+def _blocking(gate: threading.Event, value):
+    def fn():
+        gate.wait(timeout=5)
+        return value
+    return fn
+
+
+@pytest.mark.asyncio
+async def test_submit_returns_result():
+    sched = InferenceScheduler()
+    result = await sched.submit(lambda: 42)
+    assert result == 42
+    assert sched.stats["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_queued_jobs_run_earliest_deadline_first():
+    sched = InferenceScheduler()
+    gate = threading.Event()
+    order = []
+
+    def record(name):
+        def fn():
+            order.append(name)
+            return name
+        return fn
+
+    now = time.monotonic()
+    blocker = asyncio.create_task(sched.submit(_blocking(gate, "blocker")))
+    await asyncio.sleep(0.01)
+
+    late = asyncio.create_task(sched.submit(record("late"), deadline=now + 10))
+    none = asyncio.create_task(sched.submit(record("none")))
+    early = asyncio.create_task(sched.submit(record("early"), deadline=now + 5))
+    await asyncio.sleep(0.01)
+
+    gate.set()
+    await asyncio.gather(blocker, late, none, early)
+    assert order == ["early", "late", "none"]
+
+
+@pytest.mark.asyncio
+async def test_expired_job_never_runs():
+    sched = InferenceScheduler()
+    gate = threading.Event()
+    ran = []
+
+    blocker = asyncio.create_task(sched.submit(_blocking(gate, "blocker")))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(DeadlineExceeded):
+        await sched.submit(lambda: ran.append(True), deadline=time.monotonic() + 0.05)
+
+    gate.set()
+    await blocker
+    await asyncio.sleep(0.01)
+    assert ran == []
+    assert sched.stats["expired"] == 1
+    assert sched.queue_depth == 0
+
+
+@pytest.mark.asyncio
+async def test_past_deadline_is_dropped_at_dispatch():
+    sched = InferenceScheduler()
+    with pytest.raises(DeadlineExceeded):
+        await sched.submit(lambda: 1, deadline=time.monotonic() - 1)
+    assert sched.stats["expired"] == 1
+    assert sched.stats["completed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_stops_the_running_job():
+    sched = InferenceScheduler()
+    cancel = threading.Event()
+    queued_cancel = threading.Event()
+
+    running = asyncio.create_task(sched.submit(lambda: cancel.wait(5), cancel=cancel))
+    queued = asyncio.create_task(sched.submit(lambda: None, cancel=queued_cancel))
+    await asyncio.sleep(0.01)
+
+    running.cancel()
+    queued.cancel()
+    await asyncio.gather(running, queued, return_exceptions=True)
+    assert cancel.is_set()
+    # A job that never started is just skipped.
+    assert not queued_cancel.is_set()
+    await asyncio.sleep(0.01)
+    assert sched.running == 0
+
+
+@pytest.mark.asyncio
+async def test_job_exception_propagates():
+    sched = InferenceScheduler()
+
+    def boom():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        await sched.submit(boom)
+    assert sched.stats["failed"] == 1
+    assert sched.running == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_with_retry_estimate():
+    sched = InferenceScheduler(max_queue_depth=1)
+    sched.service_time.observe(2.0)
+    gate = threading.Event()
+
+    running = asyncio.create_task(sched.submit(_blocking(gate, "running")))
+    queued = asyncio.create_task(sched.submit(_blocking(gate, "queued")))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(QueueFull) as exc:
+        await sched.submit(lambda: "rejected")
+    # one running + one queued, 2s each, one slot
+    assert exc.value.retry_after == pytest.approx(4.0)
+    assert sched.stats["rejected"] == 1
+
+    gate.set()
+    assert await asyncio.gather(running, queued) == ["running", "queued"]
+
+
+@pytest.mark.asyncio
+async def test_sources_share_the_gpu_by_weight():
+    sched = InferenceScheduler(weights={"splunk": 1, "crowdstrike": 2}, max_queue_depth=64)
+    gate = threading.Event()
+    order = []
+
+    def record(source):
+        def fn():
+            order.append(source)
+        return fn
+
+    blocker = asyncio.create_task(sched.submit(_blocking(gate, "blocker")))
+    await asyncio.sleep(0.01)
+
+    # The storm arrives first; crowdstrike still gets two turns for each of splunk's.
+    jobs = [asyncio.create_task(sched.submit(record("splunk"), source="splunk")) for _ in range(10)]
+    jobs += [asyncio.create_task(sched.submit(record("crowdstrike"), source="crowdstrike")) for _ in range(4)]
+    await asyncio.sleep(0.01)
+    assert sched.snapshot()["sources"]["splunk"]["queue_depth"] == 10
+
+    gate.set()
+    await asyncio.gather(blocker, *jobs)
+    assert order[:6].count("crowdstrike") == 4
+    assert order[6:] == ["splunk"] * 8
+
+    sources = sched.snapshot()["sources"]
+    assert sources["splunk"]["dispatched"] == 10
+    assert sources["crowdstrike"]["avg_wait_seconds"] is not None
+
+
+@pytest.mark.asyncio
+async def test_idle_source_does_not_bank_turns():
+    sched = InferenceScheduler()
+    for _ in range(5):
+        await sched.submit(lambda: None, source="expel")
+
+    gate = threading.Event()
+    order = []
+    blocker = asyncio.create_task(sched.submit(_blocking(gate, "blocker"), source="expel"))
+    await asyncio.sleep(0.01)
+    jobs = [asyncio.create_task(sched.submit(lambda s=s: order.append(s), source=s))
+            for s in ["splunk", "splunk", "splunk", "expel"]]
+    await asyncio.sleep(0.01)
+
+    gate.set()
+    await asyncio.gather(blocker, *jobs)
+    # splunk was idle while expel ran alone, and gets no extra turns for it:
+    # it is one turn ahead (expel just had the blocker), not six.
+    assert order == ["splunk", "splunk", "expel", "splunk"]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_displaces_the_flooding_source():
+    sched = InferenceScheduler(max_queue_depth=3)
+    gate = threading.Event()
+
+    blocker = asyncio.create_task(sched.submit(_blocking(gate, "blocker"), source="splunk"))
+    await asyncio.sleep(0.01)
+    storm = [asyncio.create_task(sched.submit(lambda i=i: i, source="splunk")) for i in range(3)]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(QueueFull):
+        await sched.submit(lambda: "more", source="splunk")
+
+    other = asyncio.create_task(sched.submit(lambda: "expel", source="expel"))
+    await asyncio.sleep(0.01)
+    gate.set()
+
+    results = await asyncio.gather(*storm, return_exceptions=True)
+    assert results[:2] == [0, 1]
+    assert isinstance(results[2], QueueFull)
+    assert await other == "expel"
+    await blocker
+    assert sched.stats["displaced"] == 1
+    assert sched.stats["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_short_jobs_go_first():
+    sched = InferenceScheduler()
+    gate = threading.Event()
+    order = []
+
+    blocker = asyncio.create_task(sched.submit(_blocking(gate, "blocker")))
+    await asyncio.sleep(0.01)
+    jobs = [asyncio.create_task(sched.submit(lambda c=cost: order.append(c), cost=cost))
+            for cost in [4000, 300, 1500, 800]]
+    await asyncio.sleep(0.01)
+
+    gate.set()
+    await asyncio.gather(blocker, *jobs)
+    assert order == [300, 800, 1500, 4000]
+
+
+@pytest.mark.asyncio
+async def test_aging_stops_long_jobs_starving():
+    sched = InferenceScheduler(aging_factor=1.0)
+    sched.seconds_per_cost.observe(0.001)
+    gate = threading.Event()
+    order = []
+
+    blocker = asyncio.create_task(sched.submit(_blocking(gate, "blocker")))
+    await asyncio.sleep(0.01)
+    # Due 0.1s after arrival.
+    long = asyncio.create_task(sched.submit(lambda: order.append("long"), cost=100))
+    await asyncio.sleep(0.15)
+    # Shorter, but arrived after the long job was already due.
+    short = asyncio.create_task(sched.submit(lambda: order.append("short"), cost=10))
+    await asyncio.sleep(0.01)
+
+    gate.set()
+    await asyncio.gather(blocker, long, short)
+    assert order == ["long", "short"]
+
+
+@pytest.mark.asyncio
+async def test_oversized_lane_has_its_own_bound():
+    sched = InferenceScheduler(max_queue_depth=1, max_oversized_depth=1)
+    gate = threading.Event()
+
+    blocker = asyncio.create_task(sched.submit(_blocking(gate, "blocker")))
+    await asyncio.sleep(0.01)
+    huge = asyncio.create_task(sched.submit(lambda: "huge", cost=20000, oversized=True))
+    small = asyncio.create_task(sched.submit(lambda: "small", cost=500))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(QueueFull):
+        await sched.submit(lambda: "huge again", cost=20000, oversized=True)
+    assert sched.snapshot()["sources"]["(oversized)"]["queue_depth"] == 1
+
+    gate.set()
+    assert await asyncio.gather(blocker, huge, small) == ["blocker", "huge", "small"]
+
+
+@pytest.mark.asyncio
+async def test_measured_cost_calibrates_estimates():
+    sched = InferenceScheduler()
+    await sched.submit(lambda: time.sleep(0.05), cost=100)
+    assert sched.seconds_per_cost.value == pytest.approx(0.0005, rel=0.5)
+    assert sched.estimate_seconds(1000) == pytest.approx(1000 * sched.seconds_per_cost.value)
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_runs_first_within_a_source():
+    sched = InferenceScheduler()
+    gate = threading.Event()
+    order = []
+
+    blocker = asyncio.create_task(sched.submit(_blocking(gate, "blocker")))
+    await asyncio.sleep(0.01)
+    jobs = [
+        asyncio.create_task(sched.submit(lambda: order.append("info"), source="splunk", cost=10, priority=1)),
+        asyncio.create_task(sched.submit(lambda: order.append("high"), source="splunk", cost=10, priority=4)),
+        asyncio.create_task(sched.submit(lambda: order.append("critical"), source="splunk",
+                                         cost=5000, priority=5)),
+    ]
+    await asyncio.sleep(0.01)
+    assert sched.snapshot()["priorities"] == {"5": 1, "4": 1, "1": 1}
+
+    gate.set()
+    await asyncio.gather(blocker, *jobs)
+    assert order == ["critical", "high", "info"]
+
+
+@pytest.mark.asyncio
+async def test_high_priority_flood_does_not_take_another_sources_share():
+    sched = InferenceScheduler()
+    gate = threading.Event()
+    order = []
+
+    blocker = asyncio.create_task(sched.submit(_blocking(gate, "blocker")))
+    await asyncio.sleep(0.01)
+    jobs = [asyncio.create_task(sched.submit(lambda: order.append("splunk"), source="splunk",
+                                             cost=100, priority=5)) for _ in range(4)]
+    jobs.append(asyncio.create_task(sched.submit(lambda: order.append("expel"), source="expel",
+                                                 cost=100, priority=1)))
+    await asyncio.sleep(0.01)
+
+    gate.set()
+    await asyncio.gather(blocker, *jobs)
+    assert order.index("expel") <= 1
+
+
+@pytest.mark.asyncio
+async def test_full_queue_does_not_displace_higher_priority():
+    sched = InferenceScheduler(max_queue_depth=2)
+    gate = threading.Event()
+
+    blocker = asyncio.create_task(sched.submit(_blocking(gate, "blocker"), source="splunk"))
+    await asyncio.sleep(0.01)
+    critical = [asyncio.create_task(sched.submit(lambda: "critical", source="splunk", priority=5))
+                for _ in range(2)]
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(QueueFull):
+        await sched.submit(lambda: "info", source="expel", priority=1)
+
+    gate.set()
+    assert await asyncio.gather(*critical) == ["critical", "critical"]
+    await blocker
+
+
+def test_cost_model_predicts_output_per_source():
+    model = CostModel(default_output_tokens=1000, prompt_token_cost=0.1)
+    prompt = [{"role": "user", "content": "x" * 4000}]
+    assert model.prompt_tokens(prompt) == 1000
+    assert model.estimate(1000, "expel") == pytest.approx(1100)
+
+    model.observe("expel", 300)
+    assert model.estimate(1000, "expel") == pytest.approx(400)
+    assert model.estimate(1000, "trend-micro") == pytest.approx(1100)
+    assert model.snapshot() == {"expel": 300.0}
+
+
+def test_cost_model_calibrates_chars_per_token():
+    model = CostModel(default_output_tokens=1000, prompt_token_cost=0.1)
+    prompt = [{"role": "user", "content": "x" * 4000}]
+    model.observe("expel", 300, prompt_chars=4000, prompt_tokens=2000)
+    assert model.prompt_tokens(prompt) == 2000
+
+
+def test_retry_after_is_at_least_one_second():
+    assert retry_after_seconds(0.0) == 1
+    assert retry_after_seconds(4.2) == 5
@@ -0,0 +1,82 @@
+import msgpack
+import orjson
+import pytest
+
+from app.ocsf.enums import SeverityId
+from app.schemas.response import NormalizeResponse, BatchNormalizeResponse
+from app.utils.serialization import negotiated_response, shallow_dump
+
+
+def _response():
+    return NormalizeResponse(
+        ocsf={"severity_id": SeverityId.HIGH, "finding_info": {"title": "x"}},
+        decision="accept", confidence=0.9, processing_time_ms=5,
+    )
+
+
+def test_json_is_default():
+    res = negotiated_response(shallow_dump(_response()), accept="*/*")
+    assert res.media_type == "application/json"
+    assert orjson.loads(res.body)["ocsf"]["severity_id"] == 4
+
+
+def test_msgpack_selected_by_accept():
+    res = negotiated_response(shallow_dump(_response()), accept="application/msgpack")
+    assert res.media_type == "application/msgpack"
+    assert msgpack.unpackb(res.body)["decision"] == "accept"
+
+
+def test_shallow_dump_keeps_ocsf_by_reference():
+    resp = _response()
+    assert shallow_dump(resp)["ocsf"] is resp.ocsf
+
+
+def test_shallow_dump_nested_models():
+    batch = BatchNormalizeResponse(results=[_response(), _response()])
+    dumped = shallow_dump(batch)
+    assert [r["confidence"] for r in dumped["results"]] == [0.9, 0.9]
+
+
+def _echo_client():
+    from fastapi import APIRouter, FastAPI
+    from httpx import ASGITransport, AsyncClient
+
+    from app.schemas.request import NormalizeRequest
+    from app.utils.serialization import NegotiatedRoute
+
+    router = APIRouter(route_class=NegotiatedRoute)
+
+    @router.post("/echo")
+    async def echo(req: NormalizeRequest):
+        return {"raw_log": req.raw_log, "source": req.source, "priority": req.priority}
+
+    app = FastAPI()
+    app.include_router(router)
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_msgpack_request_body_is_decoded():
+    body = msgpack.packb({"raw_log": "Failed password for root", "source": "sshd", "priority": 4})
+    async with _echo_client() as client:
+        res = await client.post("/echo", content=body, headers={"Content-Type": "application/msgpack"})
+    assert res.status_code == 200
+    assert res.json() == {"raw_log": "Failed password for root", "source": "sshd", "priority": 4}
+
+
+@pytest.mark.asyncio
+async def test_msgpack_request_body_is_validated_like_json():
+    body = msgpack.packb({"raw_log": "Failed password for root"})
+    async with _echo_client() as client:
+        res = await client.post("/echo", content=body, headers={"Content-Type": "application/x-msgpack"})
+    assert res.status_code == 422
+    assert any(err["loc"][-1] == "source" for err in res.json()["detail"])
+
+
+@pytest.mark.asyncio
+async def test_invalid_msgpack_body_is_rejected():
+    body = msgpack.packb({"raw_log": "x", "source": "sshd"})[:-3]
+    async with _echo_client() as client:
+        res = await client.post("/echo", content=body, headers={"Content-Type": "application/msgpack"})
+    assert res.status_code == 400
+    assert res.json()["error"].startswith("Invalid msgpack body")
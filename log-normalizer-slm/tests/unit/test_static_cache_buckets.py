@@ -0,0 +1,27 @@
+from app.config import settings
+from app.models.buckets import Bucket, select_bucket
+
+DEFAULT_BUCKETS = [Bucket(p, o) for p, o in [(2048, 1536), (4096, 2048), (8192, 4700)]]
+
+
+def test_smallest_bucket_holding_prompt_and_output():
+    assert repr(select_bucket(DEFAULT_BUCKETS, 500, 1024)) == "Bucket(2048+1536)"
+    assert repr(select_bucket(DEFAULT_BUCKETS, 3000, 1024)) == "Bucket(4096+2048)"
+    assert repr(select_bucket(DEFAULT_BUCKETS, 2048, 1536)) == "Bucket(2048+1536)"
+
+
+def test_output_budget_is_never_cut_to_fit_a_bucket():
+    # A short prompt asking for 4700 tokens skips the small buckets.
+    assert repr(select_bucket(DEFAULT_BUCKETS, 500, 4700)) == "Bucket(8192+4700)"
+
+
+def test_no_fitting_bucket_falls_back_to_the_dynamic_cache():
+    assert select_bucket(DEFAULT_BUCKETS, 9000, 1024) is None
+    assert select_bucket(DEFAULT_BUCKETS, 500, 5000) is None
+    assert select_bucket([], 10, 10) is None
+
+
+def test_default_buckets_hold_the_full_output_budget():
+    buckets = [Bucket(p, settings.max_new_tokens) for p in settings.static_cache_buckets]
+    for prompt_len in settings.static_cache_buckets:
+        assert select_bucket(buckets, prompt_len, settings.max_new_tokens).prompt_len == prompt_len
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import pytest
+
+from app.api import stream
+from app.schemas.response import NormalizeResponse
+
+
+class _Upload:
+    """Stands in for a Request: stream() yields the body in chunks."""
+
+    def __init__(self, *chunks: bytes):
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def _line(raw_log: str) -> bytes:
+    return json.dumps({"raw_log": raw_log, "source": "fw"}).encode() + b"\n"
+
+
+def _fake_normalize(delays: dict[str, float]):
+    async def normalize(req):
+        await asyncio.sleep(delays.get(req.raw_log, 0))
+        if req.raw_log == "boom":
+            raise RuntimeError("generation failed")
+        return NormalizeResponse(ocsf={"message": req.raw_log}, decision="accept",
+                                 confidence=0.9, processing_time_ms=1)
+    return normalize
+
+
+async def _collect(upload, max_in_flight=4) -> list[dict]:
+    return [json.loads(out) async for out in stream._stream_results(upload, max_in_flight)]
+
+
+@pytest.mark.asyncio
+async def test_results_come_back_in_completion_order(monkeypatch):
+    monkeypatch.setattr(stream.gateway, "normalize", _fake_normalize({"slow": 0.05}))
+    upload = _Upload(_line("slow") + _line("fast"), _line("faster"))
+
+    results = await _collect(upload)
+
+    assert [r["line"] for r in results] == [2, 3, 1]
+    assert results[-1]["result"]["ocsf"] == {"message": "slow"}
+
+
+@pytest.mark.asyncio
+async def test_every_line_is_answered_once_with_a_small_window(monkeypatch):
+    monkeypatch.setattr(stream.gateway, "normalize", _fake_normalize({}))
+    upload = _Upload(b"".join(_line(f"log {i}") for i in range(20)))
+
+    results = await _collect(upload, max_in_flight=2)
+
+    assert sorted(r["line"] for r in results) == list(range(1, 21))
+
+
+@pytest.mark.asyncio
+async def test_bad_lines_are_reported_without_ending_the_stream(monkeypatch):
+    monkeypatch.setattr(stream.gateway, "normalize", _fake_normalize({}))
+    upload = _Upload(b"{not json\n", b'{"source": "fw"}\n', _line("boom"), _line("ok"))
+
+    results = {r["line"]: r for r in await _collect(upload)}
+
+    assert set(results) == {1, 2, 3, 4}
+    assert "result" not in results[1] and results[1]["error"]
+    assert "raw_log" in results[2]["error"]
+    assert results[3]["error"] == "generation failed"
+    assert results[4]["result"]["decision"] == "accept"
+
+
+@pytest.mark.asyncio
+async def test_disconnect_cancels_lines_still_running(monkeypatch):
+    started = []
+    cancelled = []
+
+    async def normalize(req):
+        started.append(req.raw_log)
+        if req.raw_log == "quick":
+            return NormalizeResponse(decision="accept", confidence=0.9, processing_time_ms=1)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(req.raw_log)
+            raise
+
+    monkeypatch.setattr(stream.gateway, "normalize", normalize)
+    upload = _Upload(_line("stuck 1") + _line("quick") + _line("stuck 2"))
+
+    results = stream._stream_results(upload, 4)
+    first = json.loads(await results.__anext__())
+    await results.aclose()
+    await asyncio.sleep(0)
+
+    assert first["line"] == 2
+    assert sorted(cancelled) == ["stuck 1", "stuck 2"]
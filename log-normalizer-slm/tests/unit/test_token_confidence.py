@@ -0,0 +1,63 @@
+import math
+
+from app.config import settings
+from app.scoring.confidence import compute_confidence
+from app.scoring.token_confidence import leaf_logprobs, token_confidence, uncertain_fields
+from app.utils.ocsf_parser import value_spans
+
+
+def test_value_spans_paths_and_offsets():
+    text = 'Here: {"a": 1, "b": {"c": "x\\"y", "d": [true, {"e": null}]}, "f": "cut'
+    spans = [(path, text[start:end]) for path, start, end in value_spans(text)]
+    assert spans == [
+        ("a", "1"),
+        ("b.c", 'x\\"y'),
+        ("b.d[0]", "true"),
+        ("b.d[1].e", "null"),
+        ("f", "cut"),
+    ]
+
+
+def _tokens(pieces, logprobs, prefill=""):
+    offsets = [len(prefill)]
+    for piece in pieces:
+        offsets.append(offsets[-1] + len(piece))
+    return prefill + "".join(pieces), offsets, logprobs
+
+
+def test_leaf_logprobs_min_and_mean():
+    text, offsets, logprobs = _tokens(
+        ['{"', 'host', '": "', 'WKS', '-73', '11', '", "', 'pid', '": ', '4000', '}'],
+        [0.0, 0.0, 0.0, -0.1, -2.0, -0.3, 0.0, 0.0, 0.0, -0.05, 0.0],
+    )
+    leaves = leaf_logprobs(text, offsets, logprobs)
+    assert set(leaves) == {"host", "pid"}
+    low, mean = leaves["host"]
+    assert low == -2.0
+    assert math.isclose(mean, (-0.1 - 2.0 - 0.3) / 3)
+    assert leaves["pid"] == (-0.05, -0.05)
+    assert uncertain_fields(leaves, 0.5) == ["host"]
+
+
+def test_prefilled_values_have_no_tokens():
+    text, offsets, logprobs = _tokens(['"b": ', '"x"', '}'], [-0.1, -0.2, 0.0], prefill='{"a": 1, ')
+    assert set(leaf_logprobs(text, offsets, logprobs)) == {"b"}
+
+
+def test_mismatched_lengths_are_ignored():
+    assert leaf_logprobs('{"a": 1}', [0, 8], [-0.1, -0.2]) == {}
+
+
+def test_blended_into_composite():
+    raw = {"host": "WKS-7311"}
+    ocsf = {"device": {"hostname": "WKS-7311"}}
+    plain = compute_confidence(raw, ocsf, "test")
+    leaves = {"device.hostname": (-1.0, -0.5)}
+    blended = compute_confidence(raw, ocsf, "test", leaf_logprobs=leaves)
+    w = settings.logprob_weight
+    expected = (1 - w) * (0.30 * plain.breakdown["field_coverage"] + 0.30 + 0.40 * plain.breakdown["schema_validity"]) \
+        + w * math.exp(-0.5)
+    assert math.isclose(blended.score, round(expected, 3), abs_tol=1e-3)
+    assert blended.breakdown["token_confidence"] == round(token_confidence(leaves), 3)
+    assert any("device.hostname" in note for note in blended.validation_errors)
+    assert "token_confidence" not in plain.breakdown
@@ -0,0 +1,57 @@
+from app.ocsf.validator import validate_ocsf
+
+
+def _finding() -> dict:
+    return {
+        "activity_id": 1,
+        "type_uid": 200401,
+        "time": "2024-05-01T12:00:00Z",
+        "severity_id": 4,
+        "finding_info": {"title": "Suspicious PowerShell command line", "uid": "da98b33c"},
+        "metadata": {"version": "1.7.0", "product": {"name": "Defender", "vendor_name": "Microsoft"}},
+        "device": {"hostname": "WKS-7311"},
+        "evidences": [{"process": {"pid": 4000, "cmd_line": "powershell.exe -nop"}}],
+    }
+
+
+def test_valid_finding_is_cleaned():
+    result = validate_ocsf(_finding())
+    assert result.valid
+    assert result.errors == []
+    assert result.cleaned["class_uid"] == 2004
+    assert not hasattr(result, "model")
+
+
+def test_reports_unknown_keys_and_nulls():
+    data = _finding()
+    data["bogus"] = 1
+    data["severity"] = None
+    data["metadata"]["not_a_field"] = "x"
+    result = validate_ocsf(data)
+    assert result.valid
+    assert set(result.warnings) == {"bogus", "severity", "metadata.not_a_field"}
+    assert "bogus" not in result.cleaned
+    assert "not_a_field" not in result.cleaned["metadata"]
+
+
+def test_free_form_dicts_are_not_reported():
+    data = _finding()
+    data["unmapped"] = {"anything": {"goes": None}}
+    result = validate_ocsf(data)
+    assert result.warnings == []
+    assert result.cleaned["unmapped"] == {"anything": {"goes": None}}
+
+
+def test_missing_required_field_is_an_error():
+    data = _finding()
+    del data["finding_info"]
+    result = validate_ocsf(data)
+    assert not result.valid
+    assert result.cleaned is None
+    assert any("finding_info" in e for e in result.errors)
+
+
+def test_non_dict_input():
+    result = validate_ocsf(["not", "a", "dict"])
+    assert not result.valid
+    assert result.errors == ["Expected dict, got list"]
@@ -0,0 +1,62 @@
+from app.scoring.value_index import ValueIndex, canonical_time
+
+
+RAW = {
+    "created": "2024-05-01T12:00:00.1234567Z",
+    "epoch_ms": 1714564800000,
+    "account": "CORP\\User1",
+    "path": "C:\\Windows\\Temp\\stage1",
+    "cmd": "powershell.exe -nop -enc AAAA",
+    "nested": [{"pid": 4000, "score": 7.0, "label": "  High  "}],
+}
+
+
+def test_exact_values_and_numbers():
+    index = ValueIndex(RAW)
+    assert index.contains("powershell.exe -nop -enc AAAA")
+    assert index.contains(4000)
+    assert index.contains(7)
+    assert not index.contains(4001)
+
+
+def test_escaped_values_match_unescaped():
+    # json.dumps doubles the backslashes, so a substring check on the dump missed this.
+    assert ValueIndex(RAW).contains("C:\\Windows\\Temp\\stage1")
+
+
+def test_case_and_whitespace_are_normalized():
+    index = ValueIndex(RAW)
+    assert index.contains("corp\\user1")
+    assert index.contains("high")
+
+
+def test_timestamps_match_across_precision_and_epoch():
+    index = ValueIndex(RAW)
+    assert index.contains("2024-05-01T12:00:00Z")
+    assert index.contains("2024-05-01T14:00:00+02:00")
+    assert not index.contains("2024-05-01T12:00:01Z")
+
+
+def test_substring_fallback():
+    index = ValueIndex(RAW)
+    assert index.contains("User1")
+    assert index.contains("stage1")
+    assert index.contains("-enc AAAA")
+    assert not index.contains("mimikatz")
+
+
+def test_short_and_empty_strings_need_a_whole_value_or_token():
+    index = ValueIndex({"user": "CORP\\administrator", "cmd": "net user admin2 /add", "note": ""})
+    assert index.contains("administrator")
+    assert index.contains("admin2")
+    assert not index.contains("admin")
+    assert not index.contains("a")
+    assert not index.contains("")
+    assert not index.contains("   ")
+
+
+def test_canonical_time():
+    assert canonical_time("2024-05-01 12:00:00") == "2024-05-01T12:00:00Z"
+    assert canonical_time(1714564800) == "2024-05-01T12:00:00Z"
+    assert canonical_time("not a time") is None
+    assert canonical_time(42) is None
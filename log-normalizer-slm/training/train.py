@@ -1,3 +1,4 @@
+import sys
 import yaml 
 import torch 
 from pathlib import Path
@@ -8,6 +9,10 @@ from peft import LoraConfig, get_peft_model, TaskType, prepare_model_for_kbit_tr
 
 # ------- Load Config
 parent_dir = Path(__file__).parent
+sys.path.insert(0, str(parent_dir.parent))
+
+from app.constants import ASSISTANT_PREFIX
+
 config_path = parent_dir / 'config' / 'training_config.yaml'
 splits_path = parent_dir / 'splits' 
 
@@ -53,6 +58,11 @@ def format_to_prompt_completion(example):
         parts = full_text.split(split_marker, 1)  # split only on first occurrence
         prompt = parts[0] + split_marker           # everything up to and including marker
         completion = parts[1]                       # the OCSF JSON response
+        # The server prefills the constant OCSF header, so it belongs to the
+        # prompt here too: no loss on tokens the model never generates.
+        if completion.startswith(ASSISTANT_PREFIX):
+            prompt += ASSISTANT_PREFIX
+            completion = completion[len(ASSISTANT_PREFIX):]
     else:
         # Fallback: treat everything as text (no masking)
         prompt = ""